@@ -1,15 +1,28 @@
-from dash import Dash, html, dcc, callback, Output, Input, State, ALL
+import time
+startup_begin = time.perf_counter()
+
+from dash import Dash, html, dcc, callback, Output, Input, State, ALL, no_update
 from dash.exceptions import PreventUpdate
+import dash_ag_grid  # noqa: F401 the grids are built in the callbacks, but Dash must know the library before serving the page
 
-import pandas as pd
+from flask import jsonify, request, Response
 import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import urllib.parse
+from collections import OrderedDict
 
-from space_packets_pkg.CatalogDataReader import CatalogDataReader
-from space_packets_pkg.DataConverter import DataConverter
-from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
 from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.DecodedDataCache import DecodedDataCache
+from space_packets_pkg.DecodeJobQueue import DecodeJobQueue, DecodeJob
+
+# pandas, numpy, plotly and the decoders are most of the startup time: they are imported by the callbacks and by the
+# get_* functions below, which build the shared objects on first use (or in the background right after startup)
 
-from app_components_pkg.DashboardComponents import DashboardComponents as mission_dash_components
+imports_done = time.perf_counter()
 
 CATALOG_FOLDER = "SPORT_documents"
 TELEMETRY_DUMP_FOLDER = "decoded_satcs_dump"
@@ -18,16 +31,71 @@ catalog_repo = FileRepository(CATALOG_FOLDER)
 telemetry_repo = FileRepository(TELEMETRY_DUMP_FOLDER)
 
 MAIN_SPORT_DOCUMENT_FILE_NAME = 'sport_ttc_20220814.ods'
+CATALOG_BY_PACKET_TIME = 'by-packet-time'  # catalog selection: each packet decoded with the version in force at its time
+SHOW_STARTUP_TIMES = os.environ.get('SHOW_STARTUP_TIMES') == '1'  # prints the startup and warm up times, read at import
+MAX_CATALOG_SEARCH_INDEXES = 8  # catalog versions whose search index is kept, the least recently used is dropped
+
+decoded_data_cache = DecodedDataCache()
+decode_jobs = DecodeJobQueue()
+services = {}  # name -> shared object (catalog cache, readers, exporter...), built on first use by get_service
+services_lock = threading.RLock()
+catalog_search_indexes = OrderedDict()  # (catalog file name, source signature) -> CatalogSearchIndex, least recently used first
+catalog_search_indexes_lock = threading.Lock()
+live_ingest = None  # LiveTelemetryIngest, only imported and created by start_live_ingest
+live_latest_values = None  # LatestValueIndex of the live telemetry (the last values of dumps are kept per dump selection)
+
+def get_service(name: str, build_service):
+    """The shared object 'name', built by build_service the first time it is asked for."""
+    with services_lock:
+        if name not in services:
+            services[name] = build_service()
+        return services[name]
+
+def get_telemetry_reader() -> 'TelemetryDataReader':
+    from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+    return get_service('telemetry_reader', TelemetryDataReader)
+
+def get_catalog_cache() -> 'CatalogCache':
+    from space_packets_pkg.CatalogCache import CatalogCache
+    from space_packets_pkg.CatalogDataReader import CatalogDataReader
+    return get_service('catalog_cache', lambda: CatalogCache(CatalogDataReader()))
+
+def get_catalog_versions() -> 'CatalogVersionRegistry':
+    from space_packets_pkg.CatalogVersionRegistry import CatalogVersionRegistry
+    return get_service('catalog_versions', lambda: CatalogVersionRegistry(CATALOG_FOLDER))
+
+def get_limit_checker() -> 'LimitChecker':
+    from space_packets_pkg.LimitChecker import LimitChecker
+    return get_service('limit_checker', LimitChecker)
+
+def get_derived_parameters() -> 'DerivedParameterEngine':
+    from space_packets_pkg.DerivedParameterEngine import DerivedParameterEngine
+    return get_service('derived_parameters', DerivedParameterEngine)
 
-telemetry_reader = TelemetryDataReader()
-catalog_data = CatalogDataReader()
-data_converter = DataConverter()
+def get_telemetry_exporter() -> 'TelemetryExporter':
+    from space_packets_pkg.TelemetryExporter import TelemetryExporter
+    return get_service('telemetry_exporter', lambda: TelemetryExporter(get_telemetry_reader()))
+
+def warm_up_services() -> None:
+    """Imports the decoders and loads the main catalog right after startup, in the background, so the first
+    callbacks do not wait for them."""
+    warm_up_begin = time.perf_counter()
+    catalog_cache_fresh = get_catalog_cache().warm_in_background(MAIN_SPORT_DOCUMENT_FILE_NAME)
+    get_catalog_versions()
+    from app_components_pkg.DashboardComponents import DashboardComponents  # noqa: F401 imports plotly and pandas
+    if SHOW_STARTUP_TIMES:
+        print(f"Warm up: {(time.perf_counter() - warm_up_begin)*1000:.0f} ms, "
+              f"catalog cache {'loaded' if catalog_cache_fresh else 'missing or outdated, parsing the document in background'}")
+
+def get_catalog_file_names() -> list[str]:
+    return [k for k in catalog_repo.list_files() if '.pdf' not in k]
 
 app = Dash(
     __name__,
     assets_folder='assets',
     title = "CEI Mission Dashboard"
 )
+server = app.server  # WSGI entry point: gunicorn app:server / waitress-serve app:server
 
 header_layout = html.Div(
     className='header-container',
@@ -50,14 +118,15 @@ upper_inputs_layout = html.Div([
         dcc.Store(id = "space-packets-data"),
         dcc.Store(id = "fields-apid-data"),
         dcc.Store(id = "fields-apid-data-teste"),
+        dcc.Store(id = "field-search-selection"),
         html.Div([
             html.Div("Catalog File", className="single-input-label"),
             dcc.Dropdown(
                 id='catalog-selection', 
-                value = MAIN_SPORT_DOCUMENT_FILE_NAME,
-                options = [k for k in catalog_repo.list_files() if '.pdf' not in k],
+                value = CATALOG_BY_PACKET_TIME,
+                options = [{'label': "Version in force at each packet time", 'value': CATALOG_BY_PACKET_TIME}] + get_catalog_file_names(),
                 searchable=True, 
-                disabled=True
+                clearable=False
             ),
         ], className="single-input-div"),
         html.Div([
@@ -65,6 +134,7 @@ upper_inputs_layout = html.Div([
             dcc.Dropdown(
                 id='dump-file-selection', 
                 options = telemetry_repo.list_files(),
+                multi=True,
             ),
         ], className="single-input-div"),
         html.Div([
@@ -74,6 +144,31 @@ upper_inputs_layout = html.Div([
                 multi=True,
             ),
         ], className="single-input-div"),
+        html.Div([
+            html.Div("Jump to Segment", className="single-input-label"),
+            dcc.Dropdown(
+                id='segment-selection',
+                placeholder="All valid times",
+            ),
+        ], className="single-input-div"),
+        html.Div([
+            html.Div("Search Fields of All APIDs", className="single-input-label"),
+            dcc.Input(
+                id='field-search',
+                type='search',
+                placeholder="Name, unit or observation (e.g. 12V current)",
+                className="field-search-input"
+            ),
+        ], className="single-input-div"),
+        html.Div([
+            html.Div("Derived Parameters (one 'name = expression' per line, fields in brackets)", className="single-input-label"),
+            dcc.Textarea(
+                id='derived-parameters',
+                placeholder="Battery power (W) = [Output voltage of VBAT bus (V)] * [Output current of VBAT bus (A)]",
+                className="derived-parameters-textarea",
+                persistence=True
+            ),
+        ], className="single-input-div"),
     ], 
     className="upper-dashboard-inputs"
 )
@@ -83,12 +178,42 @@ lower_inputs_layout = html.Div(
     className="lower-dashboard-inputs"
 )
 
+field_search_layout = html.Div([
+    dcc.Checklist(id='field-search-results', options=[], value=[], className="field-search-results"),
+    html.Button("Show Selected Fields", id="field-search-apply", className="field-search-apply"),
+], id="field-search-div", className="field-search-div", style={'display': 'none'})
+
 inputs_layout = html.Div([
     header_layout,
     upper_inputs_layout,
+    field_search_layout,
     lower_inputs_layout
 ], className="dashboard-inputs")
 
+live_telemetry_interval = dcc.Interval(id='live-telemetry-interval', interval=1000, disabled=True)
+
+decode_job_layout = html.Div([
+    dcc.Store(id = "decode-job-data"),
+    dcc.Store(id = "decoded-dump-ready"),
+    dcc.Interval(id='decode-job-interval', interval=500, disabled=True),
+    html.Div(id="decode-job-progress", className="single-input-label"),
+    html.Button("Cancel", id="decode-job-cancel", className="decode-job-cancel", style={'display': 'none'}),
+], className="decode-job-div")
+
+export_layout = html.Div([
+    html.Div("Export", className="single-input-label"),
+    dcc.Dropdown(
+        id='export-format',
+        value='csv',
+        options=['csv'],  # the formats the server can write are set when the page loads
+        clearable=False,
+        className="export-format-dropdown"
+    ),
+    dcc.Input(id='export-start', type='text', placeholder='From (e.g. 2024-01-01 00:00)', debounce=True, className="export-time-input"),
+    dcc.Input(id='export-end', type='text', placeholder='To', debounce=True, className="export-time-input"),
+    html.A("Download", id='export-download', className="export-download", target="_blank", style={'display': 'none'}),
+], className="export-div")
+
 main_layout = html.Div([
     html.Div(className="background-overlay"),
     html.Div([
@@ -97,13 +222,23 @@ main_layout = html.Div([
                 overlay_style={"visibility":"visible", "opacity": .1, "backgroundColor": "grey"},
                 className='gif-loading'
             ),
+        decode_job_layout,
+        export_layout,
         html.Div(id="main-dashboard-plots", className="main-content-div-plots"),
         html.Div(id="main-dashboard-tables", className="main-content-div-tables"),
+        html.Div(id="time-segments-div", className="main-content-div-tables"),
+        html.Div(id="live-telemetry-div", className="main-content-div-tables"),
+        live_telemetry_interval,
     ], className = "inputs-and-content-div"),
 ], className="dashboard-div")
 
 app.layout = main_layout
 
+if SHOW_STARTUP_TIMES:
+    print(f"Startup: imports {(imports_done - startup_begin)*1000:.0f} ms, "
+          f"app and layout {(time.perf_counter() - imports_done)*1000:.0f} ms")
+threading.Thread(target=warm_up_services, daemon=True).start()
+
 @callback(
     Output('main-telemetry-data', 'data'),
     Input('catalog-selection', 'value'),
@@ -112,37 +247,265 @@ def update_stored_data(catalog_file_name):
     if catalog_file_name is None:
         raise PreventUpdate
 
-    main_tm_df = catalog_data.get_all_tms_on_the_document(catalog_file_name)
-    main_dd_df = catalog_data.get_all_dds_from_document(catalog_file_name)
+    main_tm_df, main_dd_df = get_catalog_cache().get_catalog(get_fields_catalog_file_name(catalog_file_name))
 
     telemetry_data_dict = {
         "main_tm_df": main_tm_df.to_json(orient='split', date_format='iso'),
         "main_dd_df": main_dd_df.to_json(orient='split', date_format='iso')
     }
+    get_catalog_search_index(catalog_file_name)
     print("Updating telemetry data")
     return telemetry_data_dict
 
+def get_fields_catalog_file_name(catalog_file_name: str) -> str:
+    """Document describing the fields in the dashboard (names, limits, search): the one selected, or the latest
+    version when the packets are decoded by packet time."""
+    if catalog_file_name == CATALOG_BY_PACKET_TIME:
+        return get_catalog_versions().select_version(None)
+    return catalog_file_name
+
+def get_catalog_search_index(catalog_file_name: str) -> 'CatalogSearchIndex':
+    """Search index of the catalog, built once per version of the document and kept while it is recently used."""
+    from space_packets_pkg.CatalogSearchIndex import CatalogSearchIndex
+
+    catalog_cache = get_catalog_cache()
+    catalog_file_name = get_fields_catalog_file_name(catalog_file_name)
+    index_key = (catalog_file_name, catalog_cache.source_signature(catalog_file_name))
+    with catalog_search_indexes_lock:
+        if index_key in catalog_search_indexes:
+            catalog_search_indexes.move_to_end(index_key)
+            return catalog_search_indexes[index_key]
+
+    _, main_dd_df = catalog_cache.get_catalog(catalog_file_name)
+    search_index = CatalogSearchIndex(main_dd_df, get_telemetry_reader())
+    with catalog_search_indexes_lock:
+        catalog_search_indexes[index_key] = search_index
+        if len(catalog_search_indexes) > MAX_CATALOG_SEARCH_INDEXES:
+            catalog_search_indexes.popitem(last=False)
+    return search_index
+
+@callback(
+    Output('field-search-results', 'options'),
+    Output('field-search-results', 'value'),
+    Output('field-search-div', 'style'),
+    Input('field-search', 'value'),
+    Input('apid-selection', 'options'),
+    State('catalog-selection', 'value'),
+    State('field-search-results', 'value'),
+)
+def search_fields(query, apid_options, catalog_file_name, selected_results):
+    """Fields of every apid matching the search, the ones of apids not in the loaded dumps cannot be selected."""
+    if not query or catalog_file_name is None:
+        return [], [], {'display': 'none'}
+
+    matches_df = get_catalog_search_index(catalog_file_name).search(query)
+    available_apids = {option['value'] for option in apid_options} if apid_options else set()
+    options = []
+    for apid, data_name, field in matches_df[['apid', 'data_name', 'field']].itertuples(index=False, name=None):
+        is_available = apid in available_apids
+        label = f"{data_name} ({apid}): {field}" if is_available else f"{data_name} ({apid}): {field} - not in the loaded dumps"
+        options.append({'label': label, 'value': f"{apid}|{field}", 'disabled': not is_available})
+    if len(options) == 0:
+        options = [{'label': f"No field matches '{query}'", 'value': '', 'disabled': True}]
+
+    option_values = {option['value'] for option in options}
+    selected_results = [value for value in (selected_results or []) if value in option_values]
+    return options, selected_results, {}
+
+@callback(
+    Output('apid-selection', 'value'),
+    Output('field-search-selection', 'data'),
+    Input('field-search-apply', 'n_clicks'),
+    State('field-search-results', 'value'),
+    State('apid-selection', 'value'),
+    prevent_initial_call=True
+)
+def apply_field_search(n_clicks, selected_results, apid_list):
+    """Adds the apids of the selected search results to the apid selection (only those apids are decoded into
+    fields) and remembers the fields, to select them in the field dropdowns."""
+    if not n_clicks or not selected_results:
+        raise PreventUpdate
+
+    search_selection = {}
+    for value in selected_results:
+        apid, _, field = value.partition('|')
+        search_selection.setdefault(apid, []).append(field)
+    apid_list = list(apid_list or [])
+    apid_list.extend(apid for apid in search_selection if apid not in apid_list)
+    return apid_list, search_selection
+
+def decoded_dumps_cache_key(dump_files: list[str], catalog_file_name: str, content: str = 'typed_store') -> str:
+    file_paths = [telemetry_repo.get_file_path_from_file_name(file_name) for file_name in dump_files]
+    catalog_file_names = get_catalog_versions().get_version_names() if catalog_file_name == CATALOG_BY_PACKET_TIME else [catalog_file_name]
+    catalog_paths = [catalog_repo.get_file_path_from_file_name(file_name) for file_name in catalog_file_names]
+    return decoded_data_cache.make_key(file_paths + catalog_paths, content=content, catalog=catalog_file_name)
+
+def get_time_segment_index(dump_files: list[str], catalog_file_name: str, typed_store: 'TypedTelemetryStore') -> 'TimeSegmentIndex':
+    """Segments of the decoded dumps, built once and cached next to them."""
+    from space_packets_pkg.TimeSegmentIndex import TimeSegmentIndex
+
+    return decoded_data_cache.get_or_compute(
+        decoded_dumps_cache_key(dump_files, catalog_file_name, content='time_segment_index'),
+        lambda: TimeSegmentIndex.from_apid_tables([typed_store.get_apid_table(apid) for apid in typed_store.get_apids()])
+    )
+
+def decode_dumps_to_store(dump_files: list[str], catalog_file_name: str, progress_callback=None) -> 'TypedTelemetryStore':
+    """Decodes the dumps with the catalog selected, or with the version in force at each packet time."""
+    from space_packets_pkg.TypedTelemetryStore import TypedTelemetryStore
+
+    main_tm_df, main_dd_df = get_catalog_cache().get_catalog(get_fields_catalog_file_name(catalog_file_name))
+    typed_store = TypedTelemetryStore()
+    if catalog_file_name == CATALOG_BY_PACKET_TIME:
+        typed_store.add_files(dump_files, main_tm_df=main_tm_df, progress_callback=progress_callback, catalog_versions=get_catalog_versions())
+    else:
+        typed_store.add_files(dump_files, main_dd_df, main_tm_df=main_tm_df, progress_callback=progress_callback)
+    return typed_store
+
+def decode_dumps(dump_files: list[str], catalog_file_name: str, cache_key: str, job: DecodeJob) -> str:
+    """Body of a decode job, the result is shared with the other workers through the decoded data cache. The job
+    only keeps the cache key, the finished jobs do not hold the decoded tables. While another worker decodes the same
+    dumps the job waits for it, and can still be cancelled."""
+    decoded_data_cache.get_or_compute(cache_key, lambda: decode_dumps_to_store(dump_files, catalog_file_name, job.report_progress), job.report_progress)
+    return cache_key
+
+def load_typed_store(space_packets_dict: dict) -> 'TypedTelemetryStore':
+    """Decoded dumps of the session: the browser only keeps the file names and catalog, the typed tables are read
+    from the decoded data cache (and decoded again if they were evicted)."""
+    dump_files, catalog_file_name = space_packets_dict["files"], space_packets_dict["catalog"]
+    return decoded_data_cache.get_or_compute(
+        decoded_dumps_cache_key(dump_files, catalog_file_name),
+        lambda: decode_dumps_to_store(dump_files, catalog_file_name)
+    )
+
+def get_valid_apid_df(typed_store: 'TypedTelemetryStore', time_segments: 'TimeSegmentIndex', apid: str) -> 'pd.DataFrame':
+    """Fields of the apid indexed by time, the packets with an invalid clock (satellite reset) are left out."""
+    fields_apid_df = typed_store.get_apid_df(apid)
+    return fields_apid_df[time_segments.get_valid_mask(apid)]
+
+def submit_decode_job(dump_files: list[str], catalog_file_name: str) -> dict:
+    cache_key = decoded_dumps_cache_key(dump_files, catalog_file_name)
+    job = decode_jobs.submit(
+        cache_key,
+        lambda job: decode_dumps(dump_files, catalog_file_name, cache_key, job),
+        description=', '.join(dump_files)
+    )
+    return {"job_id": job.job_id, "key": cache_key, "files": dump_files, "catalog": catalog_file_name}
+
+@callback(
+    Output('decode-job-data', 'data'),
+    Output('decode-job-interval', 'disabled'),
+    Input('dump-file-selection', 'value'),
+    State('catalog-selection', 'value'),
+    State('decode-job-data', 'data'),
+)
+def start_decode_job(dump_file_selected, catalog_file_name, previous_job_dict):
+    if not dump_file_selected or catalog_file_name is None:
+        raise PreventUpdate
+    if previous_job_dict is not None:
+        decode_jobs.cancel(previous_job_dict["job_id"])
+
+    if isinstance(dump_file_selected, str):
+        dump_file_selected = [dump_file_selected]
+    return submit_decode_job(dump_file_selected, catalog_file_name), False
+
+@callback(
+    Output('decode-job-progress', 'children'),
+    Output('decode-job-cancel', 'style'),
+    Output('decode-job-interval', 'disabled', allow_duplicate=True),
+    Output('decoded-dump-ready', 'data'),
+    Output('decode-job-data', 'data', allow_duplicate=True),
+    Input('decode-job-interval', 'n_intervals'),
+    State('decode-job-data', 'data'),
+    prevent_initial_call=True
+)
+def poll_decode_job(_, job_dict):
+    """Progress of the decode job of this user. A job unknown to this worker runs (or ran) in another worker: its
+    result is taken from the decoded data cache, and it is submitted again here if that worker is gone."""
+    if job_dict is None:
+        raise PreventUpdate
+    hidden, visible = {'display': 'none'}, {}
+
+    job = decode_jobs.get_job(job_dict["job_id"])
+    if job is None:
+        if decoded_data_cache.contains(job_dict["key"]):
+            return f"Decoded {', '.join(job_dict['files'])}", hidden, True, job_dict, no_update
+        if decoded_data_cache.is_locked(job_dict["key"]):
+            return f"Decoding {', '.join(job_dict['files'])} in another server worker...", hidden, False, no_update, no_update
+        return "Restarting decode...", hidden, False, no_update, submit_decode_job(job_dict["files"], job_dict["catalog"])
+
+    progress = job.get_progress()
+    if job.status == 'done':
+        return f"Decoded {job.description} in {progress['elapsed_seconds']:.1f} s", hidden, True, job_dict, no_update
+    elif job.status == 'failed':
+        return f"Decode of {job.description} failed: {job.error}", hidden, True, no_update, no_update
+    elif job.status == 'cancelled':
+        return f"Decode of {job.description} cancelled", hidden, True, no_update, no_update
+    elif job.status == 'queued':
+        return f"Waiting to decode {job.description}...", visible, False, no_update, no_update
+    elif progress['stage'] == 'waiting':
+        text = f"Waiting for another server worker decoding {job.description} ({progress['done']} s)"
+    elif progress['stage'] == 'framing':
+        text = f"Reading {job.description}: {progress['done']/1024:.0f} of {progress['total']/1024:.0f} kB"
+    elif progress['stage'] == 'decoding':
+        text = f"Decoding {job.description}: {progress['done']} of {progress['total']} packets ({progress['fraction']:.0%})"
+    else:
+        text = f"Decoding {job.description}..."
+    return text, visible, False, no_update, no_update
+
+@callback(
+    Output('decode-job-progress', 'children', allow_duplicate=True),
+    Output('decode-job-cancel', 'style', allow_duplicate=True),
+    Output('decode-job-interval', 'disabled', allow_duplicate=True),
+    Input('decode-job-cancel', 'n_clicks'),
+    State('decode-job-data', 'data'),
+    prevent_initial_call=True
+)
+def cancel_decode_job(n_clicks, job_dict):
+    if not n_clicks or job_dict is None:
+        raise PreventUpdate
+    if decode_jobs.cancel(job_dict["job_id"]):
+        return "Decode cancelled", {'display': 'none'}, True
+    return "Decode left (still running for other users)", {'display': 'none'}, True
+
+def format_segment_label(segment: int, start: 'pd.Timestamp', end: 'pd.Timestamp', packets: int) -> str:
+    """Dropdown label of a time segment, the end keeps its date when the segment crosses midnight."""
+    end_format = '%H:%M:%S' if end.date() == start.date() else '%Y-%m-%d %H:%M:%S'
+    return f"Segment {segment + 1}: {start:%Y-%m-%d %H:%M:%S} to {end.strftime(end_format)} ({packets} packets)"
+
 @callback(
     Output('apid-selection', 'options'),
     Output('space-packets-data', 'data'),
-    Input('dump-file-selection', 'value'),
-    State('main-telemetry-data', 'data'),
+    Output('segment-selection', 'options'),
+    Output('segment-selection', 'value'),
+    Output('time-segments-div', 'children'),
+    Input('decoded-dump-ready', 'data'),
 )
-def update_apids_available_and_space_packets_df(dump_file_selected, telemetry_data_dict):
-    if dump_file_selected is None or telemetry_data_dict is None:
+def update_apids_available_and_space_packets_df(job_dict):
+    if job_dict is None:
         raise PreventUpdate
-    main_dd_df = pd.read_json(telemetry_data_dict["main_dd_df"], orient = 'split')
-    
-    space_packets_df = telemetry_reader.get_space_packets_df_from_file(dump_file_selected, main_dd_df)
-    available_apids = space_packets_df['apid'].unique()
-    available_apids_data_names = telemetry_reader.query_main_dd_df_for_apid_data_name(available_apids, main_dd_df)
+    from app_components_pkg.DashboardComponents import DashboardComponents as mission_dash_components
+
+    typed_store = load_typed_store(job_dict)
+    _, main_dd_df = get_catalog_cache().get_catalog(get_fields_catalog_file_name(job_dict["catalog"]))
+
+    available_apids = typed_store.get_apids()
+    available_apids_data_names = get_telemetry_reader().query_main_dd_df_for_apid_data_name(available_apids, main_dd_df)
     apid_options = [{'label': data_name, 'value': apid} for apid, data_name in zip(available_apids, available_apids_data_names)]
     
     space_packets_dict = {
-        "space_packets_df": space_packets_df.to_json(orient='split', date_format='iso')
+        "files": job_dict["files"],
+        "catalog": job_dict["catalog"],
     }
-    print("Updating available_apids and space_packets_dict")
-    return apid_options, space_packets_dict
+
+    time_segments = get_time_segment_index(job_dict["files"], job_dict["catalog"], typed_store)
+    segment_options = []
+    for segment, start, end, packets in time_segments.segments[['segment', 'start', 'end', 'packets']].itertuples(index=False, name=None):
+        label = format_segment_label(segment, start, end, packets)
+        segment_options.append({'label': label, 'value': f"{start.isoformat()}|{end.isoformat()}"})
+    coverage_card = mission_dash_components.ag_grid_inputs_from_coverage_df(time_segments.get_apid_coverage())
+
+    print(f"Updating available_apids and space_packets_dict (decoded cache {decoded_data_cache.get_stats()})")
+    return apid_options, space_packets_dict, segment_options, None, coverage_card
 
 @callback(
     Output('fields-inputs', 'children'),
@@ -150,29 +513,36 @@ def update_apids_available_and_space_packets_df(dump_file_selected, telemetry_da
     Input('apid-selection', 'value'),
     State('space-packets-data', 'data'),   
     State('main-telemetry-data', 'data'),
+    State('field-search-selection', 'data'),
     prevent_initial_call=True
 )
-def update_fields_teste(apid_list, space_packets_dict ,telemetry_data_dict):
+def update_fields_teste(apid_list, space_packets_dict ,telemetry_data_dict, search_selection):
     if (apid_list is None) or (space_packets_dict is None) or (telemetry_data_dict is None):
         raise PreventUpdate
+    import pandas as pd
+    from space_packets_pkg.LatestValueIndex import LatestValueIndex
 
     main_dd_df = pd.read_json(telemetry_data_dict["main_dd_df"], orient = 'split')
-    space_packets_df = pd.read_json(space_packets_dict["space_packets_df"], orient = 'split')
+    typed_store = load_typed_store(space_packets_dict)
+    time_segments = get_time_segment_index(space_packets_dict["files"], space_packets_dict["catalog"], typed_store)
     
-    fields_apid_dict = {}
+    fields_apid_dict = dict(space_packets_dict)
     fields_inputs_children = []
+    apids_latest_values = LatestValueIndex()
     for i, apid in enumerate(apid_list):
-        fields_apid_df = telemetry_reader.get_specific_apid_df_from_telemetry_df(apid, space_packets_df, main_dd_df)
-        fields_available = [k for k in list(fields_apid_df.columns) if k != 'secondary_header']
+        fields_apid_df = get_valid_apid_df(typed_store, time_segments, apid)
+        fields_available = list(fields_apid_df.columns)
+        apids_latest_values.update_from_apid_df(apid, fields_apid_df)
 
-        fields_apid_dict[f"{apid}_fields_df"] = fields_apid_df.reset_index().to_json(orient='split', date_format='iso')
-        apid_name = telemetry_reader.query_main_dd_df_for_apid_data_name(apid, main_dd_df)
+        apid_name = get_telemetry_reader().query_main_dd_df_for_apid_data_name(apid, main_dd_df)
+        searched_fields = [field for field in (search_selection or {}).get(apid, []) if field in fields_available]
         
         inner_children = html.Div([
             html.Div(f"Select {apid_name} Fields to Display", className="single-input-label"),
             dcc.Dropdown(
                 id={"type": "fields-selection-teste", "index":i }, 
                 options = fields_available,
+                value = searched_fields if len(searched_fields) > 0 else None,
                 searchable=True, 
                 multi=True,
                 maxHeight=400,
@@ -181,22 +551,88 @@ def update_fields_teste(apid_list, space_packets_dict ,telemetry_data_dict):
         ], className="single-input-div")
         fields_inputs_children.append(inner_children)
 
+    fields_apid_dict["latest_values"] = apids_latest_values.to_records()
     return fields_inputs_children, fields_apid_dict
 
+def get_segment_mask(times: 'pd.Series | pd.Index', segment_bounds: 'list[pd.Timestamp] | None') -> 'np.ndarray':
+    """True for the times inside the selected segment (all of them when no segment is selected)."""
+    import numpy as np
+    import pandas as pd
+
+    times = pd.DatetimeIndex(times)
+    if segment_bounds is None:
+        return np.ones(len(times), dtype=bool)
+    return np.asarray((times >= segment_bounds[0]) & (times <= segment_bounds[1]))
+
+def make_derived_parameters_cards(derived_text: str, apid_frames: 'dict[str, pd.DataFrame]', segment_bounds: 'list[pd.Timestamp] | None' = None) -> 'tuple[list, pd.DataFrame]':
+    """Cards of the derived parameters evaluated on the fields of the loaded apids (a card with the error for the
+    ones that cannot be evaluated) and their values to add to the history table. The parameters are evaluated on
+    all the times and then cut to the selected segment, so the first samples still match the fields before it."""
+    import pandas as pd
+    from app_components_pkg.DashboardComponents import DashboardComponents as mission_dash_components
+
+    derived_parameters = get_derived_parameters()
+    try:
+        parameters = derived_parameters.parse_parameters(derived_text)
+    except ValueError as e:
+        return [html.Div(str(e), className="main-card-label")], pd.DataFrame()
+
+    derived_values, derived_errors = derived_parameters.evaluate_all(parameters, apid_frames)
+    derived_values = {name: series[get_segment_mask(series.index, segment_bounds)] for name, series in derived_values.items()}
+    derived_cards = []
+    for name, series in derived_values.items():
+        derived_cards.append(mission_dash_components.make_card_from_series(series.to_frame(), name))
+    for name, error in derived_errors.items():
+        derived_cards.append(html.Div(f"{name}: {error}", className="main-card-label"))
+
+    derived_df = pd.concat(list(derived_values.values()), axis=1) if len(derived_values) > 0 else pd.DataFrame()
+    return derived_cards, derived_df
+
+def merge_history_on_time(history_dfs: 'list[pd.DataFrame]') -> 'pd.DataFrame':
+    """History table of the frames given (each with a 'time' column): the rows of the different apids and of the
+    derived parameters are matched by packet time, so there is one row per time sample."""
+    import pandas as pd
+
+    if len(history_dfs) == 0:
+        return pd.DataFrame()
+
+    history_df = history_dfs[0]
+    for other_df in history_dfs[1:]:
+        history_df = history_df.merge(other_df, on='time', how='outer')
+    return history_df.sort_values('time', kind='stable', ignore_index=True)
+
 @callback(
     Output('main-dashboard-plots', 'children'),
     Output('main-dashboard-tables', 'children'),
     Input({'type':'fields-selection-teste', "index": ALL}, "value"),
+    Input('derived-parameters', 'n_blur'),
+    Input('segment-selection', 'value'),
+    State('derived-parameters', 'value'),
     State('apid-selection', 'value'),
     State('fields-apid-data', 'data'),
+    State('main-telemetry-data', 'data'),
     prevent_initial_call=True
 )
-def update_graphs_teste(fields, apid_list, fields_apid_dict):
-    if (fields is None) or (apid_list is None) or (len(fields) == 0) or (fields_apid_dict is None):
+def update_graphs_teste(fields, derived_n_blur, segment, derived_text, apid_list, fields_apid_dict, telemetry_data_dict):
+    if (fields is None) or (apid_list is None) or (len(fields) == 0) or (fields_apid_dict is None) or (telemetry_data_dict is None):
         return html.Div([]), html.Div([])
+    import pandas as pd
+    from app_components_pkg.DashboardComponents import DashboardComponents as mission_dash_components
+    from space_packets_pkg.LatestValueIndex import LatestValueIndex
+
+    limit_checker = get_limit_checker()
+    main_dd_df = pd.read_json(telemetry_data_dict["main_dd_df"], orient = 'split')
+    segment_bounds = [pd.Timestamp(bound) for bound in segment.split('|')] if segment else None
+    typed_store = load_typed_store(fields_apid_dict)
+    time_segments = get_time_segment_index(fields_apid_dict["files"], fields_apid_dict["catalog"], typed_store)
+    apid_frames = {apid: get_valid_apid_df(typed_store, time_segments, apid) for apid in apid_list}
 
     field_cards = []
-    fields_selected_df = pd.DataFrame()
+    history_dfs = []
+    segment_latest_values = LatestValueIndex()
+    limit_summary_dfs = []
+    limit_intervals_dfs = []
+    nominal_limits = {}
     for i, apid in enumerate(apid_list):
         
         field_list_for_apid = fields[i]
@@ -204,36 +640,272 @@ def update_graphs_teste(fields, apid_list, fields_apid_dict):
         if field_list_for_apid is None:
             pass
         else:
-            fields_apid_df = pd.read_json(fields_apid_dict[f"{apid}_fields_df"], orient = 'split')
-            fields_apid_df = fields_apid_df[field_list_for_apid]
-            if 'secondary_header' in fields_apid_df.columns:
-                fields_apid_df = fields_apid_df.set_index('secondary_header')
-                fields_apid_df = fields_apid_df.loc['2020-01-01':].dropna(axis=1) #This will not be needed in future, it is due to a reset problem in the Sports Satellite.
-            
-            fields_selected_df = pd.concat([fields_selected_df,fields_apid_df], axis=1)
+            fields_apid_df = apid_frames[apid]
+            fields_apid_df = fields_apid_df[get_segment_mask(fields_apid_df.index, segment_bounds)][field_list_for_apid]
 
+            limits_df = limit_checker.get_nominal_limits_df(apid, main_dd_df)
+            apid_limit_summary_df, apid_limit_intervals_df = limit_checker.check_limits(fields_apid_df, limits_df)
+            limit_summary_dfs.append(apid_limit_summary_df)
+            limit_intervals_dfs.append(apid_limit_intervals_df)
+            nominal_limits.update(limit_checker.get_limits_dict(limits_df))
+
+            history_dfs.append(fields_apid_df.rename_axis('time').reset_index())
+            if segment_bounds is not None:
+                segment_latest_values.update_from_apid_df(apid, fields_apid_df)
             for field in field_list_for_apid:
                 field_card = mission_dash_components.make_card_from_series(fields_apid_df, field)
                 field_cards.append(field_card)
+
+    if derived_text:
+        derived_cards, derived_df = make_derived_parameters_cards(derived_text, apid_frames, segment_bounds)
+        field_cards.extend(derived_cards)
+        if not derived_df.empty:
+            history_dfs.append(derived_df.rename_axis('time').reset_index())
+
+    fields_selected_df = merge_history_on_time(history_dfs)
+    history_of_apids_card = mission_dash_components.ag_grid_inputs_from_historical_df(fields_selected_df, nominal_limits)
     
-    history_of_apids_card = mission_dash_components.ag_grid_inputs_from_historical_df(fields_selected_df)
-    
-    last_fields_values_df = fields_selected_df.apply(lambda col: col.loc[col.last_valid_index()])
-    last_fields_values_df = last_fields_values_df.reset_index()
-    last_fields_values_df.columns = ['Fields','Last Value']
+    if segment_bounds is None:
+        apids_latest_values = LatestValueIndex.from_records(fields_apid_dict["latest_values"])
+    else:
+        apids_latest_values = segment_latest_values  # last values inside the segment
+    apid_fields = {apid: fields[i] for i, apid in enumerate(apid_list) if fields[i] is not None}
+    last_fields_values_df = apids_latest_values.get_snapshot_df(apid_fields)
     last_fields_ag_grid_card = mission_dash_components.ag_grid_inputs_from_last_values_df(last_fields_values_df)
-    tables_div = html.Div([last_fields_ag_grid_card,history_of_apids_card], className="main-content-div-tables-inner")
+    tables_children = [last_fields_ag_grid_card]
+    limit_summary_dfs = [df for df in limit_summary_dfs if not df.empty]
+    if len(limit_summary_dfs) > 0:
+        limit_summary_df = pd.concat(limit_summary_dfs, ignore_index=True)
+        limit_intervals_dfs = [df for df in limit_intervals_dfs if not df.empty]
+        limit_intervals_df = pd.concat(limit_intervals_dfs, ignore_index=True) if len(limit_intervals_dfs) > 0 else None
+        tables_children.append(mission_dash_components.ag_grid_inputs_from_limit_violations_df(limit_summary_df, limit_intervals_df))
+    tables_children.append(history_of_apids_card)
+    tables_div = html.Div(tables_children, className="main-content-div-tables-inner")
     return field_cards, tables_div
 
+@callback(
+    Output('live-telemetry-div', 'children'),
+    Input('live-telemetry-interval', 'n_intervals'),
+    prevent_initial_call=True
+)
+def update_live_telemetry(n_intervals):
+    if live_ingest is None:
+        raise PreventUpdate
+    from app_components_pkg.DashboardComponents import DashboardComponents as mission_dash_components
+
+    apid_fields = live_latest_values.get_apid_fields()
+    live_apid_fields = {apid: apid_fields.get(apid, []) for apid in live_ingest.get_apids()}
+    live_values_df = live_latest_values.get_snapshot_df(live_apid_fields, include_apid=True)
+    return mission_dash_components.ag_grid_inputs_from_live_values_df(live_values_df, live_ingest.get_stats())
+
+@callback(
+    Output('export-format', 'options'),
+    Input('catalog-selection', 'value'),
+)
+def update_export_formats(_):
+    """Formats the server can write (Parquet and Arrow need pyarrow), set when the page loads: the exporter is not
+    imported to build the layout."""
+    return get_telemetry_exporter().get_available_formats()
+
+@callback(
+    Output('export-download', 'href'),
+    Output('export-download', 'style'),
+    Input('dump-file-selection', 'value'),
+    Input('apid-selection', 'value'),
+    Input({'type':'fields-selection-teste', "index": ALL}, "value"),
+    Input('export-format', 'value'),
+    Input('export-start', 'value'),
+    Input('export-end', 'value'),
+    State('catalog-selection', 'value'),
+)
+def update_export_link(dump_file_selected, apid_list, fields, export_format, start, end, catalog_file_name):
+    """Link to /export with the selection, the apids without selected fields are exported with all their fields."""
+    if not dump_file_selected or not apid_list or catalog_file_name is None:
+        return None, {'display': 'none'}
+    if isinstance(dump_file_selected, str):
+        dump_file_selected = [dump_file_selected]
+
+    query = [('file', file_name) for file_name in dump_file_selected] + [('catalog', catalog_file_name), ('format', export_format)]
+    for i, apid in enumerate(apid_list):
+        apid_fields = fields[i] if i < len(fields) else None
+        if apid_fields:
+            query.extend(('field', f"{apid}:{field}") for field in apid_fields)
+        else:
+            query.append(('apid', apid))
+    query.extend((name, value) for name, value in (('start', start), ('end', end)) if value)
+
+    return f"/export?{urllib.parse.urlencode(query)}", {}
+
+def get_dumps_request_error(dump_files: list[str], catalog_file_name: str) -> str | None:
+    """Error message for dump files or a catalog that do not exist, None if they do."""
+    unknown_files = sorted(set(dump_files) - set(telemetry_repo.list_files()))
+    if len(unknown_files) > 0:
+        return f"unknown telemetry files: {unknown_files}"
+    if catalog_file_name != CATALOG_BY_PACKET_TIME and catalog_file_name not in get_catalog_file_names():
+        return f"unknown catalog: {catalog_file_name}"
+    return None
+
+@app.server.route('/export')
+def export_telemetry():
+    """Decoded fields as a file: ?file=dump&catalog=doc&format=csv|parquet|arrow|ods, the data with
+    &field=0x5:column (repeated) and/or &apid=0x5 (all the fields of the apid), optionally &start= and &end= times."""
+    import pandas as pd
+    from space_packets_pkg.TelemetryExporter import EXPORT_FORMATS, EXPORT_MIMETYPES
+
+    telemetry_exporter = get_telemetry_exporter()
+    dump_files = request.args.getlist('file')
+    catalog_file_name = request.args.get('catalog', CATALOG_BY_PACKET_TIME)
+    export_format = request.args.get('format', 'csv')
+    if len(dump_files) == 0 or export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"file and a format in {list(EXPORT_FORMATS)} are required"}), 400
+    if export_format not in telemetry_exporter.get_available_formats():
+        return jsonify({"error": f"{export_format} export needs pyarrow installed on the server"}), 400
+    request_error = get_dumps_request_error(dump_files, catalog_file_name)
+    if request_error is not None:
+        return jsonify({"error": request_error}), 400
+
+    apid_fields = {}
+    for name, value in request.args.items(multi=True):
+        if name == 'apid':
+            apid_fields[value] = None
+        elif name == 'field':
+            apid, _, field = value.partition(':')
+            if apid_fields.get(apid, []) is not None:
+                apid_fields.setdefault(apid, []).append(field)
+    try:
+        start = pd.Timestamp(request.args['start']) if request.args.get('start') else None
+        end = pd.Timestamp(request.args['end']) if request.args.get('end') else None
+    except ValueError as e:
+        return jsonify({"error": f"invalid time: {e}"}), 400
+
+    _, main_dd_df = get_catalog_cache().get_catalog(get_fields_catalog_file_name(catalog_file_name))
+    # the dumps are decoded together, as in the dashboard, so the packets repeated across them are exported once; the
+    # rows are taken from its typed columns a block at a time, the whole selection is never built as a frame
+    typed_store = load_typed_store({"files": dump_files, "catalog": catalog_file_name})
+    chunks = telemetry_exporter.iter_chunks([typed_store], main_dd_df, apid_fields, start, end)
+    fd, export_path = tempfile.mkstemp(prefix='telemetry_export_', suffix=EXPORT_FORMATS[export_format])
+    os.close(fd)
+    try:
+        rows = telemetry_exporter.export(chunks, export_path, export_format)
+    except Exception:
+        os.remove(export_path)
+        raise
+    print(f"Exported {rows} rows of {list(apid_fields)} to {export_format}")
+
+    download_name = f"{os.path.splitext(dump_files[0])[0]}{'_and_more' if len(dump_files) > 1 else ''}{EXPORT_FORMATS[export_format]}"
+    headers = {
+        "Content-Disposition": f"attachment; filename=\"{download_name}\"",
+        "Content-Length": str(os.path.getsize(export_path)),
+    }
+    return Response(read_and_remove_file(export_path), mimetype=EXPORT_MIMETYPES[export_format], headers=headers)
+
+def read_and_remove_file(file_path: str, block_size: int = 1024**2):
+    """Sends the file in blocks and removes it once the response is finished (or the download is interrupted)."""
+    try:
+        with open(file_path, 'rb') as f:
+            while block := f.read(block_size):
+                yield block
+    finally:
+        os.remove(file_path)
+
+def get_dumps_latest_values(dump_files: list[str], catalog_file_name: str) -> 'LatestValueIndex':
+    """Last values of every field of the dumps (packets with a valid clock), built once per dump selection and
+    cached next to the decoded dumps, so every session and server worker sees the same ones."""
+    def build_latest_values():
+        from space_packets_pkg.LatestValueIndex import LatestValueIndex
+
+        space_packets_dict = {"files": dump_files, "catalog": catalog_file_name}
+        typed_store = load_typed_store(space_packets_dict)
+        time_segments = get_time_segment_index(dump_files, catalog_file_name, typed_store)
+        latest_values = LatestValueIndex()
+        for apid in typed_store.get_apids():
+            latest_values.update_from_apid_df(apid, get_valid_apid_df(typed_store, time_segments, apid))
+        return latest_values
+
+    return decoded_data_cache.get_or_compute(decoded_dumps_cache_key(dump_files, catalog_file_name, content='latest_values'), build_latest_values)
+
+@app.server.route('/api/current-state')
+def current_state():
+    """Latest decoded value of every field, optionally filtered by ?apid=0x5&apid=0x6. With ?file=dump (repeated)
+    and optionally &catalog=doc the values are the ones of those dumps, otherwise the ones of the live telemetry
+    received by this server: without live telemetry (no --live-tcp-port/--live-udp-port) file is required."""
+    apids = request.args.getlist('apid') or None
+    dump_files = request.args.getlist('file')
+    if len(dump_files) == 0:
+        if live_latest_values is None:
+            return jsonify({"error": "file is required, this server does not receive live telemetry"}), 400
+        return jsonify(live_latest_values.to_current_state_dict(apids))
+
+    catalog_file_name = request.args.get('catalog', CATALOG_BY_PACKET_TIME)
+    request_error = get_dumps_request_error(dump_files, catalog_file_name)
+    if request_error is not None:
+        return jsonify({"error": request_error}), 400
+    return jsonify(get_dumps_latest_values(dump_files, catalog_file_name).to_current_state_dict(apids))
+
 def main():
-    parser = argparse.ArgumentParser(description='Run the Dash app.')
+    parser = argparse.ArgumentParser(description='Run the Dash app.', epilog='Set SHOW_STARTUP_TIMES=1 to print the startup and warm up times.')
     parser.add_argument('--host', type=str, default='127.0.0.1', help='Host address')
     parser.add_argument('--port', type=int, default=8050, help='Port number')
     parser.add_argument('--debug', action='store_true', help='Run the app in debug mode')
+    parser.add_argument('--live-tcp-port', type=int, default=None, help='Port to receive live space packets over TCP')
+    parser.add_argument('--live-udp-port', type=int, default=None, help='Port to receive live space packets over UDP')
+    parser.add_argument('--live-pipe', type=str, default=None, help='Named pipe to read live space packets from')
+    parser.add_argument('--live-derived-columns', nargs='*', choices=['norm', 'euler'], default=[],
+                        help='Add the norm of quaternion/vector fields and/or the Euler angles of quaternions to live telemetry')
+    parser.add_argument('--production', action='store_true', help='Serve with gunicorn (or waitress) instead of the dev server')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes (gunicorn) or threads (waitress) in production')
     args = parser.parse_args()
 
+    live_sources = [args.live_tcp_port, args.live_udp_port, args.live_pipe]
+    has_live_sources = any(source is not None for source in live_sources)
+    if args.production:
+        if args.debug:
+            parser.error("--debug is only for the dev server")
+        if has_live_sources and importlib.util.find_spec('waitress') is None:
+            parser.error("Live telemetry must run in the server process, it needs waitress in production")
+        if has_live_sources:
+            start_live_ingest(args.host, args.live_tcp_port, args.live_udp_port, args.live_pipe, tuple(args.live_derived_columns))
+        run_production_server(args.host, args.port, args.workers, single_process=has_live_sources)
+        return
+
+    is_reloader_parent = args.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+    if has_live_sources and not is_reloader_parent:
+        start_live_ingest(args.host, args.live_tcp_port, args.live_udp_port, args.live_pipe, tuple(args.live_derived_columns))
+
     app.run_server(host=args.host, port=args.port, debug=args.debug)
 
+def run_production_server(host: str, port: int, workers: int, single_process: bool = False):
+    """Serves app:server with gunicorn worker processes when gunicorn is installed (not on Windows), otherwise with
+    waitress threads in this process. The workers share the catalog and decoded dumps through the cache folders."""
+    if not single_process and importlib.util.find_spec('gunicorn') is not None:
+        print(f"Starting gunicorn with {workers} workers on {host}:{port}")
+        gunicorn_args = ['-m', 'gunicorn', '--workers', str(workers), '--bind', f'{host}:{port}', '--timeout', '300',
+                         '--chdir', os.path.dirname(os.path.abspath(__file__)), 'app:server']
+        os.execv(sys.executable, [sys.executable] + gunicorn_args)
+
+    if importlib.util.find_spec('waitress') is None:
+        raise RuntimeError("Production mode needs gunicorn or waitress installed!")
+
+    from waitress import serve
+    print(f"Starting waitress with {workers} threads on {host}:{port}")
+    serve(server, host=host, port=port, threads=workers)
+
+def start_live_ingest(host: str, tcp_port: int | None, udp_port: int | None, pipe_path: str | None = None, derived_columns: tuple[str, ...] = ()):
+    """Starts the live telemetry service next to the dash server and enables the live table polling."""
+    from space_packets_pkg.CatalogVersionRegistry import CatalogVersionRegistry
+    from space_packets_pkg.LatestValueIndex import LatestValueIndex
+    from space_packets_pkg.LiveTelemetryIngest import LiveTelemetryIngest
+    from space_packets_pkg.PacketDeduplicator import PacketDeduplicator
+
+    global live_ingest, live_latest_values
+    live_latest_values = LatestValueIndex()
+    main_tm_df, main_dd_df = get_catalog_cache().get_catalog(MAIN_SPORT_DOCUMENT_FILE_NAME)
+    live_ingest = LiveTelemetryIngest(main_dd_df, live_latest_values, main_tm_df=main_tm_df, deduplicator=PacketDeduplicator(),
+                                      catalog_versions=CatalogVersionRegistry(CATALOG_FOLDER, derived_columns=derived_columns),
+                                      derived_columns=derived_columns)
+    live_ingest.start_in_background(host, tcp_port, udp_port, pipe_path)
+    live_telemetry_interval.disabled = False
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
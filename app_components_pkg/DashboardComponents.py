@@ -2,7 +2,7 @@ from dash import html, dcc
 import plotly.graph_objects as go
 import pandas as pd
 
-from app_components_pkg.dash_utils import make_ag_grid
+from app_components_pkg.dash_utils import make_ag_grid, limit_cell_style
 
 class DashboardComponents:
 
@@ -20,11 +20,20 @@ class DashboardComponents:
         return card_with_title
     
     @staticmethod
-    def ag_grid_inputs_from_historical_df(df: pd.DataFrame):
+    def ag_grid_inputs_from_historical_df(df: pd.DataFrame, nominal_limits: dict | None = None):
         
+        if nominal_limits is None:
+            nominal_limits = {}
+        if 'time' in df.columns:
+            df = df.copy()
+            df['time'] = pd.to_datetime(df['time']).dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
         column_defs = []
         for column in df.columns:
-            column_defs.append({'field':column})
+            if column in nominal_limits:
+                column_defs.append({'field':column, 'cellStyle': limit_cell_style(*nominal_limits[column])})
+            else:
+                column_defs.append({'field':column})
         print(column_defs)
         main_dict = {
             "df": df,
@@ -49,6 +58,10 @@ class DashboardComponents:
     @staticmethod
     def ag_grid_inputs_from_last_values_df(df: pd.DataFrame):
         
+        if 'Time' in df.columns:
+            df = df.copy()
+            df['Time'] = pd.to_datetime(df['Time']).dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
         column_defs = []
         for column in df.columns:
             column_defs.append({'field':column})
@@ -72,6 +85,134 @@ class DashboardComponents:
 
         return ag_grid_card
 
+    @staticmethod
+    def ag_grid_inputs_from_live_values_df(df: pd.DataFrame, stats: dict):
+        
+        df = df.copy()
+        df['Time'] = pd.to_datetime(df['Time']).dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+        column_defs = []
+        for column in df.columns:
+            column_defs.append({'field':column})
+        main_dict = {
+            "df": df,
+            "col_def": column_defs,
+            "row_style": None
+        }
+        ag_grid = make_ag_grid(
+            table_id='live-values-table-cei',
+            main_dict=main_dict,
+            wrap_header=True,
+            ag_grid_paginated=True,
+            page_size=20
+        )
+
+        stats_label = f"Live Telemetry - {stats['packets_received']} packets received ({stats['packets_per_second']:.1f} packets/s)"
+        if stats.get('checksum_errors', 0) > 0:
+            stats_label += f" - {stats['checksum_errors']} bad checksums"
+        if stats.get('duplicate_packets', 0) > 0:
+            stats_label += f" - {stats['duplicate_packets']} duplicates"
+        ag_grid_card = html.Div([
+            html.Div(stats_label, className="main-card-label"),
+            html.Div([ag_grid], className="table-body")
+        ], className="table-card")
+
+        return ag_grid_card
+
+    @staticmethod
+    def ag_grid_inputs_from_limit_violations_df(df: pd.DataFrame, intervals_df: pd.DataFrame | None = None):
+        """Summary of the limit checks, with the intervals of consecutive violations of each field below it."""
+        df = df.copy()
+        for column in ['First Violation', 'Last Violation']:
+            df[column] = pd.to_datetime(df[column]).dt.strftime("%Y-%m-%d %H:%M:%S.%f").fillna('')
+
+        column_defs = []
+        for column in df.columns:
+            column_defs.append({'field':column})
+        main_dict = {
+            "df": df,
+            "col_def": column_defs,
+            "row_style": {
+                "styleConditions": [
+                    {
+                        "condition": "params.data['Violations'] > 0",
+                        "style": {"color": "orange", "font-weight": "700"},
+                    },
+                ]
+            }
+        }
+        ag_grid = make_ag_grid(
+            table_id='limit-violations-table-cei',
+            main_dict=main_dict,
+            wrap_header=True,
+            ag_grid_paginated=False
+        )
+
+        card_children = [
+            html.Div("Limit Violations", className="main-card-label"),
+            html.Div([ag_grid], className="last-table-body")
+        ]
+        if intervals_df is not None and not intervals_df.empty:
+            intervals_df = intervals_df.copy()
+            for column in ['Start', 'End']:
+                intervals_df[column] = pd.to_datetime(intervals_df[column]).dt.strftime("%Y-%m-%d %H:%M:%S.%f").fillna('')
+            intervals_ag_grid = make_ag_grid(
+                table_id='limit-violation-intervals-table-cei',
+                main_dict={
+                    "df": intervals_df,
+                    "col_def": [{'field':column} for column in intervals_df.columns],
+                    "row_style": None
+                },
+                wrap_header=True,
+                ag_grid_paginated=True,
+                page_size=10
+            )
+            card_children.extend([
+                html.Div(f"Violation Intervals ({len(intervals_df)})", className="main-card-label"),
+                html.Div([intervals_ag_grid], className="last-table-body")
+            ])
+
+        ag_grid_card = html.Div(card_children, className="last-table-card")
+
+        return ag_grid_card
+
+    @staticmethod
+    def ag_grid_inputs_from_coverage_df(df: pd.DataFrame):
+        
+        df = df.copy()
+        for column in ['first', 'last']:
+            df[column] = pd.to_datetime(df[column]).dt.strftime("%Y-%m-%d %H:%M:%S").fillna('')
+        df[['covered_s', 'median_period_s']] = df[['covered_s', 'median_period_s']].round(3)
+
+        column_defs = []
+        for column in df.columns:
+            column_defs.append({'field':column})
+        main_dict = {
+            "df": df,
+            "col_def": column_defs,
+            "row_style": {
+                "styleConditions": [
+                    {
+                        "condition": "params.data['invalid_clock'] > 0 || params.data['clock_jumps'] > 0",
+                        "style": {"color": "orange", "font-weight": "700"},
+                    },
+                ]
+            }
+        }
+        ag_grid = make_ag_grid(
+            table_id='time-coverage-table-cei',
+            main_dict=main_dict,
+            wrap_header=True,
+            ag_grid_paginated=False
+        )
+
+        ag_grid_card = html.Div([
+            html.Div("Time Coverage per APID", className="main-card-label"),
+            html.Div([ag_grid], className="last-table-body")
+        ], className="last-table-card")
+
+        return ag_grid_card
+
     @staticmethod
     def make_plotly_card(fig: go.Figure, id_card: str, class_name_str = "card-body") -> html.Div:
         dcc_graph = dcc.Graph(id = id_card, figure = fig)
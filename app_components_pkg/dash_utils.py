@@ -12,6 +12,30 @@ STATS_ROW_STYLE = {
     ] 
 } 
 
+NEGATIVE_VALUE_STYLE_CONDITION = { 
+    "condition": "params.value < 0", 
+    "style": {"color": "red", "font-weight": "700"}, 
+} 
+
+LIMIT_VIOLATION_STYLE = {"backgroundColor": "rgba(255, 140, 0, 0.45)", "color": "white", "font-weight": "700"} 
+
+def limit_cell_style(nominal_min: Optional[float], nominal_max: Optional[float]) -> dict: 
+    """ Cell style for a column with a nominal range, the cells outside of the range are highlighted and 
+    the negative values keep the default red color. """ 
+    
+    out_of_range_conditions = [] 
+    if nominal_min is not None: 
+        out_of_range_conditions.append(f"params.value < {nominal_min}") 
+    if nominal_max is not None: 
+        out_of_range_conditions.append(f"params.value > {nominal_max}") 
+    
+    style_conditions = [NEGATIVE_VALUE_STYLE_CONDITION] 
+    if len(out_of_range_conditions) > 0: 
+        condition = "params.value != null && (" + " || ".join(out_of_range_conditions) + ")" 
+        style_conditions.insert(0, {"condition": condition, "style": LIMIT_VIOLATION_STYLE}) 
+    
+    return {"styleConditions": style_conditions} 
+
 def make_ag_grid( 
     table_id: str, 
     main_dict: dict, 
@@ -42,12 +66,7 @@ def make_ag_grid(
         "wrapHeaderText": wrap_header, 
         "autoHeaderHeight": wrap_header, 
         "cellStyle": { 
-            "styleConditions": [ 
-                { 
-                    "condition": "params.value < 0", 
-                    "style": {"color": "red", "font-weight": "700"}, 
-                }, 
-            ], 
+            "styleConditions": [NEGATIVE_VALUE_STYLE_CONDITION], 
         }, 
     } 
     
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+TELEMETRY_DUMP_FOLDER = "decoded_satcs_dump"
+MAIN_SPORT_DOCUMENT_FILE_NAME = 'sport_ttc_20220814.ods'
+POLL_SECONDS = 0.5
+
+def get_callbacks(base_url: str, timeout: float) -> dict[str, dict]:
+    """Dash callback specs of the dashboard by their first input (e.g. 'dump-file-selection.value')."""
+    with urllib.request.urlopen(f"{base_url}/_dash-dependencies", timeout=timeout) as response:
+        dependencies = json.loads(response.read())
+    return {f"{spec['inputs'][0]['id']}.{spec['inputs'][0]['property']}": spec for spec in dependencies}
+
+def call_callback(base_url: str, spec: dict, input_values: list, state_values: list, timeout: float) -> dict:
+    """Sends the request the browser sends for the callback, returns the new values by output id."""
+    outputs = []
+    for output in spec['output'].strip('.').split('...'):
+        component_id, component_property = output.split('.', 1)
+        outputs.append({"id": component_id, "property": component_property})
+    payload = {
+        "output": spec['output'],
+        "outputs": outputs if len(outputs) > 1 else outputs[0],
+        "inputs": [dict(dependency, value=value) for dependency, value in zip(spec['inputs'], input_values)],
+        "state": [dict(dependency, value=value) for dependency, value in zip(spec['state'], state_values)],
+        "changedPropIds": [f"{spec['inputs'][0]['id']}.{spec['inputs'][0]['property']}"],
+    }
+    request = urllib.request.Request(
+        f"{base_url}/_dash-update-component",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        if response.status == 204:
+            return {}
+        return json.loads(response.read())['response']
+
+def open_dumps(base_url: str, callbacks: dict, dump_files: list[str], catalog_file_name: str, timeout: float) -> int:
+    """Same requests the browser sends when the user selects dumps: starts the decode job, polls it until it is
+    finished and loads the decoded packets. Returns the number of polls."""
+    response = call_callback(base_url, callbacks['dump-file-selection.value'], [dump_files], [catalog_file_name, None], timeout)
+    job_dict = response['decode-job-data']['data']
+
+    polls = 0
+    while True:
+        polls += 1
+        response = call_callback(base_url, callbacks['decode-job-interval.n_intervals'], [polls], [job_dict], timeout)
+        if 'decode-job-data' in response:
+            job_dict = response['decode-job-data']['data']
+        if 'decoded-dump-ready' in response:
+            break
+        if response.get('decode-job-interval', {}).get('disabled'):
+            raise RuntimeError(response['decode-job-progress']['children'])
+        time.sleep(POLL_SECONDS)
+
+    call_callback(base_url, callbacks['decoded-dump-ready.data'], [response['decoded-dump-ready']['data']], [], timeout)
+    return polls
+
+def run_user(base_url: str, callbacks: dict, dump_selections: list[list[str]], catalog_file_name: str, requests_per_user: int,
+             timeout: float, latencies: list, errors: list, lock: threading.Lock, seed: int):
+    user_random = random.Random(seed)
+    for _ in range(requests_per_user):
+        dump_files = user_random.choice(dump_selections)
+        start = time.perf_counter()
+        try:
+            open_dumps(base_url, callbacks, dump_files, catalog_file_name, timeout)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            continue
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent users opening dumps on a running dashboard.')
+    parser.add_argument('--url', type=str, default='http://127.0.0.1:8050', help='Dashboard address')
+    parser.add_argument('--users', type=int, default=8, help='Concurrent users')
+    parser.add_argument('--requests', type=int, default=5, help='Dump openings per user')
+    parser.add_argument('--files', nargs='*', default=None, help='Dumps to open (all the dumps of the folder if none)')
+    parser.add_argument('--catalog', type=str, default=MAIN_SPORT_DOCUMENT_FILE_NAME, help='Catalog document')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Request timeout in seconds')
+    args = parser.parse_args()
+
+    dump_files = args.files or sorted(os.listdir(TELEMETRY_DUMP_FOLDER))
+    dump_selections = [[file_name] for file_name in dump_files] + [dump_files]
+
+    callbacks = get_callbacks(args.url, args.timeout)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_user, args=(args.url, callbacks, dump_selections, args.catalog, args.requests, args.timeout, latencies, errors, lock, i))
+        for i in range(args.users)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.users} users x {args.requests} dump openings in {elapsed:.1f} s "
+          f"({len(latencies)/elapsed:.1f} requests/s, {len(errors)} errors)")
+    if latencies:
+        latencies = np.array(latencies)
+        print(f"latency p50 {np.percentile(latencies, 50)*1000:.0f} ms, p95 {np.percentile(latencies, 95)*1000:.0f} ms, "
+              f"max {latencies.max()*1000:.0f} ms")
+    for error in sorted(set(errors)):
+        print(f"error: {error}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import numpy as np
+
+from space_packets_pkg.DataConverter import DataConverter
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable
+
+DERIVED_COLUMN_KINDS = ('norm', 'euler')
+
+class ApidDecoderPlan:
+    """This class compiles the catalog layout of an apid (the data packets of its DD) once into a list of fields with
+    fixed bit offsets, and then decodes the data of many packets of that apid at once with numpy. It follows the same
+    rules as TelemetryDataReader.calculate_data_conversion and DataConverter.binary_to_value, and the formats that
+    are not vectorized here are decoded sample by sample with the DataConverter.
+
+    Quaternion, vector and matrix fields are read as big-endian float32 views of the field bytes of all the packets,
+    giving (packets, components) or (packets, rows, cols) float32 columns. Scalar columns derived from them are added
+    on request with 'derived_columns': 'norm' for the norm of each quaternion/vector and 'euler' for the roll, pitch
+    and yaw of each quaternion (scalar first).
+    """
+    apid: str
+    fields: list[dict]
+    field_metadata: dict[str, dict]
+    derived_columns: tuple[str, ...]
+    data_converter: DataConverter
+
+    def __init__(self, apid: str, apid_linked_dd: list[dict], derived_columns: tuple[str, ...] = ()) -> None:
+        assert all(kind in DERIVED_COLUMN_KINDS for kind in derived_columns), f"Derived columns must be in {DERIVED_COLUMN_KINDS}!"
+        self.apid = apid
+        self.derived_columns = tuple(derived_columns)
+        self.data_converter = DataConverter()
+        self.fields = []
+        self.field_metadata = {}
+        self.compile(apid_linked_dd)
+
+    def compile(self, apid_linked_dd: list[dict]) -> None:
+        """Walks through the catalog fields computing the bit offset of each one. 'break_bits' is the biggest field
+        length up to the field, the field only exists on packets with at least that many data bits, since
+        calculate_data_conversion stops at the first field longer than the data."""
+        column_names = TelemetryDataReader().get_field_column_names(apid_linked_dd)
+
+        pointer = 0
+        break_bits = 0
+        for column_name, single_data_field in zip(column_names, apid_linked_dd):
+            bit_length = single_data_field['lenght(bits)']
+            if (bit_length is None) or (bit_length == 'N/A'):
+                bit_length = 0
+            elif single_data_field['field'] == 'Total':
+                break
+            elif bit_length == 'Varies':
+                bit_length = None
+            else:
+                try:
+                    bit_length = int(bit_length)
+                except (TypeError, ValueError):
+                    break
+
+            if column_name is not None:
+                self.fields.append({
+                    "column_name": column_name,
+                    "offset": pointer,
+                    "length": bit_length,
+                    "break_bits": break_bits if bit_length is None else max(break_bits, bit_length),
+                    "format": single_data_field['format'],
+                    "conversion": single_data_field['conversion'],
+                })
+                self.field_metadata[column_name] = {key: value for key, value in single_data_field.items() if key != 'value'}
+
+            if bit_length is None:
+                # A variable field takes the whole data, nothing after it has a known offset.
+                break
+            break_bits = max(break_bits, bit_length)
+            pointer += bit_length
+
+    def decode_packets(self, data_list: list[bytes], times: np.ndarray) -> TypedApidTable:
+        """Decodes the data field of many packets of the apid. Packets are grouped by data length, each group is
+        decoded as a (packets x bytes) matrix and the groups are put back in the original order."""
+        data_lengths = np.fromiter((len(data) for data in data_list), dtype=np.int64, count=len(data_list))
+        unique_lengths = np.unique(data_lengths)
+
+        if len(unique_lengths) == 1:
+            columns = self.decode_data_matrix(self._to_matrix(data_list, unique_lengths[0]))
+        else:
+            group_columns = []
+            group_rows = []
+            for data_length in unique_lengths:
+                rows = np.flatnonzero(data_lengths == data_length)
+                group_rows.append(rows)
+                group_columns.append(self.decode_data_matrix(self._to_matrix([data_list[i] for i in rows], data_length)))
+            columns = self._merge_groups(group_columns, group_rows, len(data_list))
+
+        field_metadata = {column_name: self.field_metadata[column_name] for column_name in columns}
+        return TypedApidTable(self.apid, times, columns, field_metadata)
+
+    def decode_data_matrix(self, data_matrix: np.ndarray) -> dict[str, np.ndarray]:
+        """Decodes packets with the same data length, data_matrix is an uint8 array of shape (packets, bytes).
+        Fields that have no value for any packet are not returned."""
+        data_bits = data_matrix.shape[1]*8
+        bits = None
+
+        columns = {}
+        for field in self.fields:
+            length = data_bits if field['length'] is None else field['length']
+            if field['break_bits'] > data_bits or field['offset'] + length > data_bits or length == 0:
+                continue
+            if bits is None and not self._is_byte_aligned(field['offset'], length) and not self._is_byte_aligned_float_array(field, length):
+                bits = np.unpackbits(data_matrix, axis=1)
+
+            values = self.decode_field(data_matrix, bits, field, length)
+            if values is not None:
+                columns[field['column_name']] = values
+                if len(self.derived_columns) > 0:
+                    columns.update(self.get_derived_columns(field, values))
+
+        return columns
+
+    def get_derived_columns(self, field: dict, values: np.ndarray) -> dict[str, np.ndarray]:
+        """Norm and/or Euler angle columns of a decoded quaternion or vector field, named after the field (e.g.
+        'sport_adcs_att_det_quat_b_i() roll (deg)')."""
+        data_format = field['format']
+        if values.ndim != 2 or not (data_format == 'quaternion' or 'vector' in data_format):
+            return {}
+
+        field_name = field['column_name'].rsplit(' (', 1)[0]
+        derived = {}
+        if 'norm' in self.derived_columns:
+            derived[f"{field_name} norm ({self.field_metadata[field['column_name']]['unit']})"] = self.data_converter.vector_norms(values)
+        if 'euler' in self.derived_columns and data_format == 'quaternion' and values.shape[1] == 4:
+            euler_angles = self.data_converter.quaternions_to_euler_angles(values)
+            for i, angle in enumerate(['roll', 'pitch', 'yaw']):
+                derived[f"{field_name} {angle} (deg)"] = euler_angles[:, i]
+
+        for column_name in derived:
+            self.field_metadata.setdefault(column_name, {'field': column_name, 'format': 'float64', 'derived_from': field['column_name']})
+        return derived
+
+    def decode_field(self, data_matrix: np.ndarray, bits: np.ndarray | None, field: dict, length: int) -> np.ndarray | None:
+        """Decodes a single field for all the packets, following the format order of DataConverter.binary_to_value.
+        Returns None when the field has no value (unsupported format or no conversion)."""
+        data_format = field['format']
+        offset = field['offset']
+        if data_format is None:
+            return None
+
+        if 'uint' in data_format:
+            return self._read_unsigned(data_matrix, bits, offset, length) if length <= 64 else self._decode_per_sample(data_matrix, bits, field, length)
+        elif data_format in ['int16', 'int32']:
+            sign_bits = 16 if data_format == 'int16' else 32
+            if length > 63:
+                return self._decode_per_sample(data_matrix, bits, field, length)
+            raw = self._read_unsigned(data_matrix, bits, offset, length).astype(np.int64)
+            return np.where(raw >> (length - 1) == 1, raw - (1 << sign_bits), raw)
+        elif data_format == 'float':
+            if length != 32:
+                return self._decode_per_sample(data_matrix, bits, field, length)
+            return self.data_converter.float32_words_to_array(self._read_unsigned(data_matrix, bits, offset, length))
+        elif data_format == 'quaternion' or 'vector' in data_format or 'matrix' in data_format:
+            shape = self.data_converter.get_float_array_shape(data_format, length)
+            if shape is None:
+                return self._decode_per_sample(data_matrix, bits, field, length)
+            return self.data_converter.float32_fields_to_array(self._read_field_bytes(data_matrix, bits, offset, length), shape)
+        elif data_format == 'char':
+            return self._decode_per_sample(data_matrix, bits, field, length)
+        elif data_format == 'uchar':
+            return self._read_unsigned(data_matrix, bits, offset, length) if length <= 64 else self._decode_per_sample(data_matrix, bits, field, length)
+        elif data_format == 'bit':
+            return self._read_unsigned(data_matrix, bits, offset, length) if length <= 64 else self._decode_per_sample(data_matrix, bits, field, length)
+        elif data_format == 'GPS time':
+            if length != 64:
+                return self._decode_per_sample(data_matrix, bits, field, length)
+            raw = self._read_unsigned(data_matrix, bits, offset, 64)
+            return self.data_converter.gps_times_to_datetime64(raw >> np.uint64(32), raw & np.uint64(0xFFFFFFFF))
+        elif data_format in ['bitfield', 'css']:
+            return self._read_binary_strings(data_matrix, bits, offset, length)
+        elif 'ADC' in data_format:
+            if length > 64:
+                return self._decode_per_sample(data_matrix, bits, field, length)
+            raw = self._read_unsigned(data_matrix, bits, offset, length)
+            try:
+                return self.data_converter.convert_adc_array_to_values(raw, data_format, field['conversion'])
+            except (ValueError, TypeError, NameError, SyntaxError):
+                return self._decode_per_sample(data_matrix, bits, field, length)
+        else:
+            return None
+
+    def _read_unsigned(self, data_matrix: np.ndarray, bits: np.ndarray | None, offset: int, length: int) -> np.ndarray:
+        """Reads a field of up to 64 bits as unsigned integers. Byte aligned fields are read straight from the bytes,
+        the others from the unpacked bits."""
+        if self._is_byte_aligned(offset, length):
+            field_bytes = np.ascontiguousarray(data_matrix[:, (offset//8):((offset + length)//8)])
+            return field_bytes.view(f'>u{length//8}').ravel().astype(np.uint64)
+
+        weights = np.left_shift(np.uint64(1), np.arange(length - 1, -1, -1, dtype=np.uint64))
+        return bits[:, offset:(offset+length)].astype(np.uint64) @ weights
+
+    def _read_field_bytes(self, data_matrix: np.ndarray, bits: np.ndarray | None, offset: int, length: int) -> np.ndarray:
+        """Bytes of a field whose length is a multiple of 8, (packets, length/8) uint8. The fields that do not start on a
+        byte boundary are packed again from the unpacked bits."""
+        if offset % 8 == 0:
+            return data_matrix[:, (offset//8):((offset + length)//8)]
+        if bits is None:
+            bits = np.unpackbits(data_matrix, axis=1)
+        return np.packbits(bits[:, offset:(offset+length)], axis=1)
+
+    def _read_binary_strings(self, data_matrix: np.ndarray, bits: np.ndarray | None, offset: int, length: int) -> np.ndarray:
+        """Returns the bits of the field as strings of '0' and '1', the same as slicing the binary string of the data."""
+        if bits is None:
+            bits = np.unpackbits(data_matrix, axis=1)
+        characters = np.ascontiguousarray(bits[:, offset:(offset+length)] + ord('0'))
+        return characters.view(f'S{length}').ravel().astype(str).astype(object)
+
+    def _decode_per_sample(self, data_matrix: np.ndarray, bits: np.ndarray | None, field: dict, length: int) -> np.ndarray | None:
+        """Fallback for the formats that are not vectorized, each value goes through DataConverter.binary_to_value."""
+        binary_strings = self._read_binary_strings(data_matrix, bits, field['offset'], length)
+
+        values = np.empty(len(binary_strings), dtype=object)
+        for i, binary_string in enumerate(binary_strings):
+            try:
+                values[i] = self.data_converter.binary_to_value(binary_string, field['format'], field['conversion'])
+            except (ValueError, NameError):
+                values[i] = None
+
+        if all(value is None for value in values):
+            return None
+        return values
+
+    def _is_byte_aligned(self, offset: int, length: int) -> bool:
+        return offset % 8 == 0 and length in [8, 16, 32, 64]
+
+    def _is_byte_aligned_float_array(self, field: dict, length: int) -> bool:
+        """Quaternion/vector/matrix fields starting on a byte are read from the bytes, without unpacking the bits."""
+        data_format = field['format'] if isinstance(field['format'], str) else ''
+        is_float_array = data_format == 'quaternion' or 'vector' in data_format or 'matrix' in data_format
+        return is_float_array and field['offset'] % 8 == 0 and self.data_converter.get_float_array_shape(data_format, length) is not None
+
+    def _to_matrix(self, data_list: list[bytes], data_length: int) -> np.ndarray:
+        return np.frombuffer(b''.join(data_list), dtype=np.uint8).reshape(len(data_list), data_length)
+
+    def _merge_groups(self, group_columns: list[dict], group_rows: list[np.ndarray], n_packets: int) -> dict[str, np.ndarray]:
+        """Puts the columns decoded per data length group back in packet order. Columns missing in some group, or with
+        different dtypes between groups, become object arrays with None for the missing packets."""
+        column_names = list(dict.fromkeys(column_name for columns in group_columns for column_name in columns))
+        field_order = {field['column_name']: i for i, field in enumerate(self.fields)}
+        column_names.sort(key=lambda column_name: field_order.get(self.field_metadata[column_name].get('derived_from', column_name), len(field_order)))
+
+        merged_columns = {}
+        for column_name in column_names:
+            group_values = [columns.get(column_name) for columns in group_columns]
+            present = [values for values in group_values if values is not None]
+            same_type = all(values.dtype == present[0].dtype and values.shape[1:] == present[0].shape[1:] for values in present)
+
+            if len(present) == len(group_values) and same_type:
+                merged = np.empty((n_packets,) + present[0].shape[1:], dtype=present[0].dtype)
+            else:
+                merged = np.full(n_packets, None, dtype=object)
+
+            for rows, values in zip(group_rows, group_values):
+                if values is not None:
+                    merged[rows] = values if merged.dtype != object or values.ndim == 1 else list(values)
+            merged_columns[column_name] = merged
+
+        return merged_columns
@@ -0,0 +1,178 @@
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable
+
+class ApidRingBuffer:
+    """Fixed capacity buffer with the most recent decoded rows of an apid. The time column and every field are
+    preallocated numpy arrays (fixed-shape fields keep their shape), nothing is allocated on append.
+
+    Each row is written twice, at position i and i + capacity, so the rows currently held are always the contiguous
+    slice [start, start + size) of the arrays and any window of them is a view, no copy needed to plot it. When the
+    buffer is full the oldest rows are evicted and handed to the spill callback (e.g. TypedTelemetryStore.add_apid_table)
+    before being overwritten.
+    """
+    apid: str
+    capacity: int
+    time: np.ndarray
+    columns: dict[str, np.ndarray]
+    field_metadata: dict[str, dict]
+    spill_callback: Callable[[TypedApidTable], None] | None
+
+    def __init__(self, apid: str, capacity: int, spill_callback: Callable[[TypedApidTable], None] | None = None) -> None:
+        assert capacity > 0, "The capacity must be positive!"
+        self.apid = apid
+        self.capacity = capacity
+        self.spill_callback = spill_callback
+        self.time = np.full(2*capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self.columns = {}
+        self.field_metadata = {}
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, time: np.datetime64, values: dict) -> None:
+        """Appends a single decoded row, given as {field: value}."""
+        columns = {field: np.asarray([value]) for field, value in values.items()}
+        self.append_table(TypedApidTable(self.apid, np.asarray([time], dtype='datetime64[ns]'), columns, {}))
+
+    def append_table(self, apid_table: TypedApidTable) -> None:
+        """Appends all the rows of a decoded table, evicting (and spilling) the oldest rows when needed."""
+        n_rows = len(apid_table)
+        if n_rows == 0:
+            return
+
+        if n_rows > self.capacity:
+            self.evict(self.size)
+            self._spill(self._slice_table(apid_table, 0, n_rows - self.capacity))
+            apid_table = self._slice_table(apid_table, n_rows - self.capacity, n_rows)
+            n_rows = self.capacity
+
+        overflow = self.size + n_rows - self.capacity
+        if overflow > 0:
+            self.evict(overflow)
+
+        self._prepare_columns(apid_table)
+        positions = (self.start + self.size + np.arange(n_rows)) % self.capacity
+        self._write(self.time, positions, apid_table.time)
+        for field, values in self.columns.items():
+            if field in apid_table.columns:
+                self._write(values, positions, apid_table.columns[field])
+            else:
+                self._write(values, positions, self._missing_value(values.dtype))
+        self.size += n_rows
+
+    def evict(self, n_rows: int) -> None:
+        """Removes the oldest n_rows from the buffer, spilling them first."""
+        n_rows = min(n_rows, self.size)
+        if n_rows == 0:
+            return
+
+        self._spill(self._copy_window(0, n_rows))
+        self.start = (self.start + n_rows) % self.capacity
+        self.size -= n_rows
+
+    def evict_older_than(self, cutoff: np.datetime64) -> None:
+        """Removes the leading rows older than the cutoff, used to keep only the last hours of telemetry."""
+        too_old = self.get_window().time < cutoff
+        n_rows = self.size if too_old.all() else int(too_old.argmin())
+        self.evict(n_rows)
+
+    def get_window(self, start_time: np.datetime64 | None = None, end_time: np.datetime64 | None = None) -> TypedApidTable:
+        """Rows with start_time <= time <= end_time as a table of views over the buffer (no copy). The time range
+        is found with a binary search, so the rows are expected in time order, as they arrive from a downlink."""
+        first, last = 0, self.size
+        window_times = self.time[self.start:(self.start + self.size)]
+        if start_time is not None:
+            first = int(np.searchsorted(window_times, np.datetime64(start_time, 'ns'), side='left'))
+        if end_time is not None:
+            last = int(np.searchsorted(window_times, np.datetime64(end_time, 'ns'), side='right'))
+
+        return self._window(first, max(first, last))
+
+    def to_dataframe(self, fields: list[str] | None = None, start_time: np.datetime64 | None = None, end_time: np.datetime64 | None = None) -> pd.DataFrame:
+        """Rows of the buffer in the same shape as get_specific_apid_df_from_telemetry_df."""
+        return self.get_window(start_time, end_time).to_dataframe(fields)
+
+    def _window(self, first: int, last: int) -> TypedApidTable:
+        begin = self.start + first
+        end = self.start + last
+        columns = {field: values[begin:end] for field, values in self.columns.items()}
+        return TypedApidTable(self.apid, self.time[begin:end], columns, self.field_metadata)
+
+    def _copy_window(self, first: int, last: int) -> TypedApidTable:
+        window = self._window(first, last)
+        columns = {field: values.copy() for field, values in window.columns.items()}
+        return TypedApidTable(self.apid, window.time.copy(), columns, dict(self.field_metadata))
+
+    def _slice_table(self, apid_table: TypedApidTable, first: int, last: int) -> TypedApidTable:
+        columns = {field: values[first:last] for field, values in apid_table.columns.items()}
+        return TypedApidTable(apid_table.apid, apid_table.time[first:last], columns, apid_table.field_metadata)
+
+    def _spill(self, apid_table: TypedApidTable) -> None:
+        if self.spill_callback is not None and len(apid_table) > 0:
+            self.spill_callback(apid_table)
+
+    def _write(self, array: np.ndarray, positions: np.ndarray, values) -> None:
+        array[positions] = values
+        array[positions + self.capacity] = values
+
+    def _prepare_columns(self, apid_table: TypedApidTable) -> None:
+        """Allocates the arrays of fields seen for the first time and widens the dtype of a field when the new rows
+        do not fit it (e.g. missing values on an integer field)."""
+        self.field_metadata.update(apid_table.field_metadata)
+        for field, values in apid_table.columns.items():
+            if field not in self.columns:
+                dtype = values.dtype if values.dtype.kind not in 'US' else np.dtype(object)
+                dtype = dtype if self.size == 0 else self._dtype_with_missing(dtype)
+                self.columns[field] = self._allocate(dtype, values.shape[1:])
+            else:
+                self._widen_column(field, values.dtype, values.shape[1:])
+
+        for field, values in self.columns.items():
+            if field not in apid_table.columns and self._missing_value(values.dtype) is None:
+                self._widen_column(field, self._dtype_with_missing(values.dtype), values.shape[1:])
+
+    def _widen_column(self, field: str, dtype: np.dtype, shape: tuple) -> None:
+        current = self.columns[field]
+        if current.shape[1:] != shape:
+            new_dtype = np.dtype(object)
+        else:
+            try:
+                new_dtype = np.result_type(current.dtype, dtype)
+            except TypeError:
+                new_dtype = np.dtype(object)
+            if new_dtype.kind in 'US':
+                new_dtype = np.dtype(object)
+        if new_dtype == current.dtype:
+            return
+
+        if new_dtype == object and current.ndim > 1:
+            widened = np.empty(2*self.capacity, dtype=object)
+            widened[:] = list(current)
+        else:
+            widened = current.astype(new_dtype)
+        self.columns[field] = widened
+
+    def _allocate(self, dtype: np.dtype, shape: tuple) -> np.ndarray:
+        missing_value = self._missing_value(dtype)
+        if missing_value is None and dtype != object:
+            return np.zeros((2*self.capacity,) + shape, dtype=dtype)
+        return np.full((2*self.capacity,) + shape, missing_value, dtype=dtype)
+
+    def _dtype_with_missing(self, dtype: np.dtype) -> np.dtype:
+        """Integer and boolean fields become float64 so they can hold NaN for the rows without value."""
+        if dtype.kind in 'iub':
+            return np.dtype(np.float64)
+        return dtype
+
+    def _missing_value(self, dtype: np.dtype):
+        if dtype.kind in 'fc':
+            return np.nan
+        elif dtype.kind in 'mM':
+            return np.datetime64('NaT') if dtype.kind == 'M' else np.timedelta64('NaT')
+        return None
@@ -0,0 +1,137 @@
+import argparse
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from space_packets_pkg.CatalogDataReader import CatalogDataReader, DOCUMENT_FOLDER_PATH
+from space_packets_pkg.FileRepository import FileRepository
+
+CATALOG_CACHE_FOLDER = "catalog_cache"
+CATALOG_CACHE_FORMAT = 1
+
+class CatalogCache:
+    """This class keeps the parsed TM/DD sheets of the catalog documents as pickles, so a new process loads a
+    catalog in a few milliseconds instead of parsing the .ods document (several seconds).
+
+    Each pickle records the modification time and size of the document it was built from, a pickle that does not
+    match the document anymore is ignored and rebuilt. Pickles are written to a temporary file and renamed, so
+    several processes can share the cache folder. Catalogs already loaded are also kept in memory.
+    """
+    catalog_reader: CatalogDataReader
+    cache_folder: str
+    catalogs: dict[str, tuple[tuple, tuple[pd.DataFrame, pd.DataFrame]]]
+    building: dict[str, threading.Thread]
+
+    def __init__(self, catalog_reader: CatalogDataReader | None = None, cache_folder: str = CATALOG_CACHE_FOLDER) -> None:
+        self.catalog_reader = CatalogDataReader() if catalog_reader is None else catalog_reader
+        self.cache_folder = cache_folder
+        self.catalogs = {}
+        self.building = {}
+        self.lock = threading.Lock()
+        if not os.path.exists(cache_folder):
+            os.makedirs(cache_folder)
+
+    def get_catalog(self, file_name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """(main_tm_df, main_dd_df) of the document: from memory, from the cache folder or parsed from the document,
+        in this order. If the document is already being parsed in the background, waits for it."""
+        with self.lock:
+            thread = self.building.get(file_name)
+        if thread is not None:
+            thread.join()
+
+        catalog = self.load(file_name)
+        if catalog is None:
+            catalog = self.build(file_name)
+        return catalog
+
+    def load(self, file_name: str) -> tuple[pd.DataFrame, pd.DataFrame] | None:
+        """The cached catalog if it is up to date with the document, None otherwise."""
+        signature = self.source_signature(file_name)
+        if file_name in self.catalogs and self.catalogs[file_name][0] == signature:
+            return self.catalogs[file_name][1]
+
+        try:
+            with open(self.cache_path(file_name), 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if cached.get('format') != CATALOG_CACHE_FORMAT or cached.get('signature') != signature:
+            return None
+        self.catalogs[file_name] = (signature, cached['catalog'])
+        return cached['catalog']
+
+    def build(self, file_name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Parses the document and writes its cache."""
+        print(f"Building catalog cache of {file_name}")
+        signature = self.source_signature(file_name)
+        main_tm_df = self.catalog_reader.get_all_tms_on_the_document(file_name)
+        main_dd_df = self.catalog_reader.get_all_dds_from_document(file_name, main_tm_df)
+        catalog = (main_tm_df, main_dd_df)
+
+        cache_path = self.cache_path(file_name)
+        temporary_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, 'wb') as f:
+            pickle.dump({'format': CATALOG_CACHE_FORMAT, 'signature': signature, 'catalog': catalog}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+
+        self.catalogs[file_name] = (signature, catalog)
+        return catalog
+
+    def is_fresh(self, file_name: str) -> bool:
+        return self.load(file_name) is not None
+
+    def warm_in_background(self, file_name: str) -> bool:
+        """Loads the catalog in a background thread, parsing the document if the cache is not up to date.
+        Returns True if the cache was already fresh (nothing is started then)."""
+        if self.is_fresh(file_name):
+            return True
+
+        with self.lock:
+            if file_name not in self.building:
+                thread = threading.Thread(target=self._build_in_background, args=(file_name,), daemon=True)
+                self.building[file_name] = thread
+                thread.start()
+        return False
+
+    def source_signature(self, file_name: str) -> tuple:
+        file_path = self.catalog_reader.file_repo.get_file_path_from_file_name(file_name)
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def cache_path(self, file_name: str) -> str:
+        return os.path.join(self.cache_folder, f"{file_name}.pkl")
+
+    def _build_in_background(self, file_name: str) -> None:
+        try:
+            self.build(file_name)
+        finally:
+            with self.lock:
+                self.building.pop(file_name, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prebuild the catalog cache of the .ods documents.')
+    parser.add_argument('files', nargs='*', help='Documents inside the catalog folder (all the .ods documents if none)')
+    parser.add_argument('--folder', type=str, default=DOCUMENT_FOLDER_PATH, help='Catalog folder')
+    parser.add_argument('--cache-folder', type=str, default=CATALOG_CACHE_FOLDER, help='Cache folder')
+    args = parser.parse_args()
+
+    catalog_reader = CatalogDataReader()
+    catalog_reader.file_repo = FileRepository(args.folder)
+    catalog_cache = CatalogCache(catalog_reader, args.cache_folder)
+
+    file_names = args.files or [k for k in catalog_reader.file_repo.list_files() if k.endswith('.ods')]
+    for file_name in file_names:
+        start = time.perf_counter()
+        if catalog_cache.is_fresh(file_name):
+            print(f"{file_name}: cache up to date")
+            continue
+        catalog_cache.build(file_name)
+        print(f"{file_name}: cache built in {time.perf_counter() - start:.1f} s")
+
+if __name__ == '__main__':
+    main()
@@ -11,27 +11,31 @@ class CatalogDataReader:
     """
     file_repo: FileRepository
     space_packets: SpacePacketDefinitions
+    tm_lookup: dict[str, list[tuple[str, str]]]
     
     def __init__(self) -> None:
         self.file_repo = FileRepository(DOCUMENT_FOLDER_PATH)
         self.space_packets = SpacePacketDefinitions()
+        self.tm_lookup = {}
+        self.tm_lookup_source = None
     
-    def get_all_dds_from_document(self, file_name: str):
-        """Specific to read all DD sheets data in the document."""
-        main_tm_df = self.get_all_tms_on_the_document(file_name)
+    def get_all_dds_from_document(self, file_name: str, main_tm_df: pd.DataFrame | None = None):
+        """Specific to read all DD sheets data in the document. The TM sheets are read again if not given."""
+        if main_tm_df is None:
+            main_tm_df = self.get_all_tms_on_the_document(file_name)
 
-        dd_sheets = self.file_repo.get_specific_sheet_names_from_ods_document(file_name, "DD")
+        dd_sheets = self.file_repo.read_ods_sheets(file_name, starts_with="DD")
 
         all_dd_from_sheets_df = pd.DataFrame()
-        for sheet_name in dd_sheets:
-            inner_dd_df = self.read_dd_sheet_from_document(file_name, sheet_name, main_tm_df)
+        for df in dd_sheets.values():
+            inner_dd_df = self.read_dd_sheet_df(df, main_tm_df)
             all_dd_from_sheets_df = pd.concat([all_dd_from_sheets_df, inner_dd_df], ignore_index=True)
 
         return all_dd_from_sheets_df
 
     def get_all_tms_on_the_document(self, file_name: str) -> pd.DataFrame:
         """Specific to read all TM sheets in the document."""
-        tm_sheets = self.file_repo.get_specific_sheet_names_from_ods_document(file_name, "TM")
+        tm_sheets = self.file_repo.read_ods_sheets(file_name, starts_with="TM")
         columns = [
             'identification',
             'name',
@@ -48,8 +52,7 @@ class CatalogDataReader:
         ]
 
         main_tm_df = pd.DataFrame()
-        for sheet_name in tm_sheets:
-            df = self.file_repo.read_ods_document_by_sheet(file_name, sheet_name)
+        for df in tm_sheets.values():
             df = df.iloc[6:, 0:12].dropna(axis = 0, how = 'all')
 
             main_tm_df = pd.concat([main_tm_df, df], ignore_index=True)
@@ -60,8 +63,10 @@ class CatalogDataReader:
         return main_tm_df
     
     def read_dd_sheet_from_document(self, file_name: str, sheet_name: str, main_tm_df: pd.DataFrame):
-
         df = self.file_repo.read_ods_document_by_sheet(file_name, sheet_name)
+        return self.read_dd_sheet_df(df, main_tm_df)
+
+    def read_dd_sheet_df(self, df: pd.DataFrame, main_tm_df: pd.DataFrame):
         df = df.dropna(axis = 0, how = 'all').dropna(axis = 1, how = 'all')
         data_array = df.to_numpy()
 
@@ -100,9 +105,23 @@ class CatalogDataReader:
         return main_dict
 
     def find_tm_for_given_dd_name(self, dd_name: str, main_tm_df: pd.DataFrame) -> tuple[str, str]:
-        filtered_tm_df = main_tm_df.drop_duplicates().query(f"""data == '{dd_name}'""")
+        tm_rows = self.get_tm_lookup(main_tm_df).get(dd_name, [])
 
-        if filtered_tm_df.empty:
+        if len(tm_rows) == 0:
             return '', ''
+        elif len(tm_rows) > 1:
+            raise ValueError(f"More than one TM carries the data {dd_name}!")
         else:
-            return filtered_tm_df['identification'].item(), filtered_tm_df['apid'].item()
+            return tm_rows[0]
+
+    def get_tm_lookup(self, main_tm_df: pd.DataFrame) -> dict[str, list[tuple[str, str]]]:
+        """(identification, apid) of the distinct TMs of each data name, built once for each main_tm_df."""
+        if self.tm_lookup_source is not main_tm_df:
+            tm_lookup = {}
+            tm_df = main_tm_df.drop_duplicates()
+            for identification, apid, data in zip(tm_df['identification'], tm_df['apid'], tm_df['data']):
+                tm_lookup.setdefault(data, []).append((identification, apid))
+            self.tm_lookup = tm_lookup
+            self.tm_lookup_source = main_tm_df
+
+        return self.tm_lookup
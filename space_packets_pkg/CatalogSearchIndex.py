@@ -0,0 +1,94 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+
+DEFAULT_MIN_SIMILARITY = 0.5
+DEFAULT_MAX_RESULTS = 50
+OBSERVATION_WEIGHT = 0.5
+NON_WORD_PATTERN = re.compile(r'[^0-9a-z]+')
+
+class CatalogSearchIndex:
+    """This class finds the fields of every apid of the catalog by their name, unit, observation or apid/DD name,
+    instead of browsing the field dropdown of one apid at a time.
+
+    It is a trigram index built once per catalog: the words of each field are padded ('  w', ' wo', 'wor', 'ord',
+    'rd ') and each trigram points to the fields that contain it. A query is scored by the fraction of its trigrams
+    that a field has, so 'volt' finds 'voltage' (the last word of the query is a prefix, it is not padded at the end)
+    and small typos like 'curent' still match. Matches in the name, unit and apid count fully and the ones in the
+    observation count half.
+    """
+    entries: pd.DataFrame
+    name_postings: dict[str, np.ndarray]
+    observation_postings: dict[str, np.ndarray]
+
+    def __init__(self, main_dd_df: pd.DataFrame, telemetry_reader: TelemetryDataReader | None = None) -> None:
+        telemetry_reader = telemetry_reader if telemetry_reader is not None else TelemetryDataReader()
+
+        entries = []
+        for apid, data_name, apid_linked_dd in main_dd_df[['apid', 'data_name', 'data_packets']].itertuples(index=False, name=None):
+            for field_data, column_name in zip(apid_linked_dd, telemetry_reader.get_field_column_names(apid_linked_dd)):
+                if column_name is None:
+                    continue
+                observation = field_data.get('observation')
+                entries.append({
+                    'apid': apid,
+                    'data_name': data_name,
+                    'field': column_name,
+                    'observation': observation if isinstance(observation, str) else '',
+                })
+        self.entries = pd.DataFrame(entries, columns=['apid', 'data_name', 'field', 'observation'])
+
+        self.name_postings = self.build_postings([f"{field} {apid} {data_name}" for apid, data_name, field in self.entries[['apid', 'data_name', 'field']].itertuples(index=False, name=None)])
+        self.observation_postings = self.build_postings(self.entries['observation'].tolist())
+
+    def search(self, query: str, min_similarity: float = DEFAULT_MIN_SIMILARITY, max_results: int = DEFAULT_MAX_RESULTS, apids: list[str] | None = None) -> pd.DataFrame:
+        """Entries (apid, data_name, field, observation, score) matching the query, best first. apids restricts the
+        results to those apids."""
+        query_trigrams = self.get_trigrams(query, prefix_last_word=True)
+        if len(query_trigrams) == 0:
+            return self.entries.iloc[:0].assign(score=[])
+
+        name_similarity = self.get_similarity(query_trigrams, self.name_postings)
+        observation_similarity = self.get_similarity(query_trigrams, self.observation_postings)
+        whole_word_similarity = self.get_similarity(self.get_trigrams(query), self.name_postings)  # 'eps' before 'epsilon'
+        score = np.maximum(name_similarity, OBSERVATION_WEIGHT*observation_similarity) + 0.05*whole_word_similarity + 0.01*observation_similarity
+        matches = np.maximum(name_similarity, observation_similarity) >= min_similarity
+        if apids is not None:
+            matches &= self.entries['apid'].isin(apids).to_numpy()
+
+        match_ids = np.flatnonzero(matches)
+        match_ids = match_ids[np.argsort(-score[match_ids], kind='stable')][:max_results]
+        return self.entries.iloc[match_ids].assign(score=score[match_ids])
+
+    def get_similarity(self, query_trigrams: set[str], postings: dict[str, np.ndarray]) -> np.ndarray:
+        """Fraction of the query trigrams each entry has."""
+        hits = np.zeros(len(self.entries), dtype=np.int32)
+        for trigram in query_trigrams:
+            entry_ids = postings.get(trigram)
+            if entry_ids is not None:
+                hits[entry_ids] += 1
+        return hits / len(query_trigrams)
+
+    def build_postings(self, texts: list[str]) -> dict[str, np.ndarray]:
+        postings = {}
+        for entry_id, text in enumerate(texts):
+            for trigram in self.get_trigrams(text):
+                postings.setdefault(trigram, []).append(entry_id)
+        return {trigram: np.array(entry_ids, dtype=np.int32) for trigram, entry_ids in postings.items()}
+
+    def get_trigrams(self, text: str, prefix_last_word: bool = False) -> set[str]:
+        words = self.normalize(text).split()
+        trigrams = set()
+        for i, word in enumerate(words):
+            padded = f"  {word}" if (prefix_last_word and i == len(words) - 1) else f"  {word} "
+            trigrams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+        return trigrams
+
+    def normalize(self, text: str) -> str:
+        """Lower case words without accents or punctuation ('Temperature (°C)' -> 'temperature c')."""
+        text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+        return NON_WORD_PATTERN.sub(' ', text.lower())
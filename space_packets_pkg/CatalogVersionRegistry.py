@@ -0,0 +1,128 @@
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.ApidDecoderPlan import ApidDecoderPlan
+from space_packets_pkg.CatalogCache import CatalogCache
+from space_packets_pkg.CatalogDataReader import CatalogDataReader, DOCUMENT_FOLDER_PATH
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable, TypedTelemetryStore
+
+CATALOG_VERSION_PATTERN = re.compile(r'_(\d{8})\.ods$')
+DEFAULT_MAX_PLANS = 256
+
+class CatalogVersionRegistry:
+    """This class knows all the versions of the TTC document in the catalog folder, each one dated by its file name
+    (e.g. 'sport_ttc_20220814.ods' is in force from 2022-08-14 on). Packets are decoded with the version in force at
+    their time: the version of a packet is the latest one dated before it (the oldest version for older packets).
+
+    The TM/DD sheets of a version are read (through the catalog cache) only the first time they are needed, and the
+    decoder plans of each (version, apid) are compiled once and kept in a LRU cache of 'max_plans' plans, so decoding
+    historical dumps that span several versions costs the same as decoding with a single one. 'derived_columns' is
+    given to the plans (see ApidDecoderPlan).
+    """
+    folder_path: str
+    versions: list[tuple[np.datetime64, str]]
+    catalog_cache: CatalogCache
+    decoder_plans: OrderedDict
+
+    def __init__(self, folder_path: str = DOCUMENT_FOLDER_PATH, max_plans: int = DEFAULT_MAX_PLANS, derived_columns: tuple[str, ...] = ()) -> None:
+        self.folder_path = folder_path
+        self.max_plans = max_plans
+        self.derived_columns = tuple(derived_columns)
+        self.catalog_reader = CatalogDataReader()
+        self.catalog_reader.file_repo = FileRepository(folder_path)
+        self.catalog_cache = CatalogCache(self.catalog_reader)
+        self.decoder_plans = OrderedDict()
+        self.versions = self.find_versions()
+        assert len(self.versions) > 0, f"No dated catalog document (name_YYYYMMDD.ods) found in {folder_path}!"
+
+    def find_versions(self) -> list[tuple[np.datetime64, str]]:
+        """The dated .ods documents of the folder, sorted by date."""
+        versions = []
+        for file_name in os.listdir(self.folder_path):
+            match = CATALOG_VERSION_PATTERN.search(file_name)
+            if match is None:
+                continue
+            try:
+                version_date = datetime.strptime(match.group(1), '%Y%m%d')
+            except ValueError:
+                continue
+            versions.append((np.datetime64(version_date, 'ns'), file_name))
+
+        return sorted(versions)
+
+    def get_version_names(self) -> list[str]:
+        return [file_name for _, file_name in self.versions]
+
+    def select_version_indices(self, times: np.ndarray) -> np.ndarray:
+        """Index in self.versions of the version in force at each time. Times without value (NaT) use the latest version."""
+        times = np.asarray(times, dtype='datetime64[ns]')
+        version_dates = np.array([version_date for version_date, _ in self.versions], dtype='datetime64[ns]')
+        indices = np.searchsorted(version_dates, times, side='right') - 1
+        indices = np.clip(indices, 0, len(self.versions) - 1)
+        return np.where(np.isnat(times), len(self.versions) - 1, indices)
+
+    def select_version(self, time: datetime | np.datetime64 | None) -> str:
+        """File name of the version in force at the time given (the latest one if None)."""
+        time = np.datetime64('NaT', 'ns') if time is None else np.datetime64(time, 'ns')
+        return self.versions[int(self.select_version_indices(np.array([time]))[0])][1]
+
+    def get_catalog(self, version: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """(main_tm_df, main_dd_df) of a version, read the first time it is needed."""
+        return self.catalog_cache.get_catalog(version)
+
+    def get_decoder_plan(self, version: str, apid: str) -> ApidDecoderPlan | None:
+        """Compiled plan of the apid in a version, None if the apid is not in that version of the catalog."""
+        key = (version, apid)
+        if key in self.decoder_plans:
+            self.decoder_plans.move_to_end(key)
+            return self.decoder_plans[key]
+
+        _, main_dd_df = self.get_catalog(version)
+        apid_dd_df = main_dd_df.query(f"""apid == '{apid}'""")
+        decoder_plan = None if apid_dd_df.empty else ApidDecoderPlan(apid, apid_dd_df['data_packets'].item(), self.derived_columns)
+
+        self.decoder_plans[key] = decoder_plan
+        if len(self.decoder_plans) > self.max_plans:
+            self.decoder_plans.popitem(last=False)
+        return decoder_plan
+
+    def decode_packets(self, apid: str, data_list: list[bytes], times: np.ndarray) -> TypedApidTable | None:
+        """Decodes the data of packets of an apid, each with the version in force at its time. The packets of each
+        version are decoded together and put back in the original order. Packets whose version does not have the
+        apid are left out, None if no version has it."""
+        version_indices = self.select_version_indices(times)
+
+        tables = []
+        group_rows = []
+        for version_index in np.unique(version_indices):
+            decoder_plan = self.get_decoder_plan(self.versions[version_index][1], apid)
+            if decoder_plan is None:
+                continue
+            rows = np.flatnonzero(version_indices == version_index)
+            tables.append(decoder_plan.decode_packets([data_list[i] for i in rows], times[rows]))
+            group_rows.append(rows)
+
+        if len(tables) == 0:
+            return None
+        elif len(tables) == 1:
+            return tables[0]
+
+        rows = np.concatenate(group_rows)
+        return TypedApidTable.concat_tables(tables).take(np.argsort(rows, kind='stable'))
+
+    def decode_file(self, file_name: str, telemetry_folder_path: str) -> dict[str, TypedApidTable]:
+        """Decodes a whole dump with the version in force at each packet, with the checksum, duplicate and segment
+        rules of TypedTelemetryStore.add_files (framed with the TM sheets of the latest version). The tables can be
+        added to a TypedTelemetryStore with add_apid_table."""
+        typed_store = TypedTelemetryStore()
+        typed_store.telemetry_reader.file_repo = FileRepository(telemetry_folder_path)
+        main_tm_df, _ = self.get_catalog(self.select_version(None))
+        typed_store.add_files([file_name], main_tm_df=main_tm_df, catalog_versions=self)
+
+        return {apid: typed_store.get_apid_table(apid) for apid in typed_store.get_apids()}
@@ -3,6 +3,10 @@ import numpy as np
 import pandas as pd
 import struct
 
+FLOAT32_EXPONENT_MASK = 0x7F800000
+FLOAT32_MANTISSA_MASK = 0x007FFFFF
+FLOAT32_QUIET_NAN = 0x7FC00000
+
 class DataConverter:
     """This class is to centralize all the conversion methods needed."""
 
@@ -27,13 +31,15 @@ class DataConverter:
         elif data_type == 'float':
             return struct.unpack('!f', struct.pack('!I', int(binary_str, 2)))[0]
         elif data_type == 'quaternion' or 'vector' in data_type:
+            if len(binary_str) % 32 == 0:
+                return self.binary_to_float32_array(binary_str).tolist()
             return [self.binary_to_value(binary_str[i:i+32], 'float') for i in range(0, len(binary_str), 32)]
         elif data_type == 'char':
             return chr(int(binary_str, 2))
         elif data_type == 'uchar':
             return int(binary_str, 2)
         elif data_type == 'bit':
-            return int(binary_str)
+            return int(binary_str, 2)
         elif data_type == 'GPS time':
             return self.convert_64bit_binary_to_datetime(binary_str)
         elif 'matrix' in data_type:
@@ -67,6 +73,95 @@ class DataConverter:
         
         return eval(conversion_formula)
 
+    def convert_adc_array_to_values(self, raw_values: np.ndarray, data_type: str, conversion_formula_for_adc) -> np.ndarray | None:
+        """Array version of convert_binary_to_adc_value, the formula is evaluated once for all the raw 16-bit inputs."""
+        if conversion_formula_for_adc is None or conversion_formula_for_adc == 'N/A':
+                return None
+
+        if data_type == '12-bit ADC':
+            adc_values = raw_values & 0x0FFF
+        elif data_type == '10-bit ADC':
+            adc_values = raw_values & 0x03FF
+        else:
+            raise ValueError("Unsupported ADC type")
+
+        conversion_formula = conversion_formula_for_adc
+        conversion_formula = conversion_formula.replace("^", "**").replace("–", "-")
+
+        values = eval(conversion_formula, {"adc": adc_values.astype(np.int64)})
+        return np.array(np.broadcast_to(values, adc_values.shape))
+
+    def binary_to_float32_array(self, binary_str: str) -> np.ndarray:
+        """Big-endian float32 values of a binary string with a multiple of 32 bits."""
+        words = np.frombuffer(int(binary_str, 2).to_bytes(len(binary_str)//8, 'big'), dtype='>u4')
+        return self.float32_words_to_array(words)
+
+    def float32_words_to_array(self, words: np.ndarray) -> np.ndarray:
+        """Native float32 array of the IEEE 754 bit patterns in 'words' (uint32, any byte order). Any data can be
+        received in a float field, the NaN patterns are replaced by the quiet NaN: a signaling NaN raises an
+        'invalid value' floating point error when it is cast (e.g. to float64) and its payload means nothing here."""
+        words = words.astype(np.uint32)
+        nan_mask = ((words & FLOAT32_EXPONENT_MASK) == FLOAT32_EXPONENT_MASK) & ((words & FLOAT32_MANTISSA_MASK) != 0)
+        words[nan_mask] = FLOAT32_QUIET_NAN
+        return words.view(np.float32)
+
+    def float32_fields_to_array(self, field_bytes: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+        """Batched version of the quaternion/vector/matrix formats: field_bytes is an uint8 array (samples, bytes) of
+        big-endian float32 values, viewed at once and returned as a float32 array of shape (samples, *shape)."""
+        field_bytes = np.ascontiguousarray(field_bytes)
+        return self.float32_words_to_array(field_bytes.view('>u4')).reshape((len(field_bytes),) + tuple(shape))
+
+    def get_float_array_shape(self, data_format: str, bit_length: int) -> tuple[int, ...] | None:
+        """Shape of one sample of a quaternion/vector/matrix field of 32-bit floats, None if the length does not fit."""
+        if bit_length % 32 != 0 or bit_length == 0:
+            return None
+        n_values = bit_length // 32
+        if 'matrix' in data_format.lower():
+            rows, cols = self.get_row_and_columns_from_format(data_format)
+            return (rows, cols) if rows*cols == n_values else None
+        return (n_values,)
+
+    def vector_norms(self, values: np.ndarray) -> np.ndarray:
+        """Euclidean norm of each sample of a (samples, components) array."""
+        return np.linalg.norm(np.asarray(values, dtype=np.float64), axis=1)
+
+    def quaternions_to_euler_angles(self, quaternions: np.ndarray, scalar_first: bool = True) -> np.ndarray:
+        """Roll, pitch and yaw in degrees (aerospace Z-Y-X sequence) of each quaternion of a (samples, 4) array. The
+        quaternions are normalized first, scalar_first tells if the components are (w, x, y, z) or (x, y, z, w)."""
+        quaternions = np.asarray(quaternions, dtype=np.float64)
+        quaternions = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+        if scalar_first:
+            w, x, y, z = quaternions.T
+        else:
+            x, y, z, w = quaternions.T
+
+        roll = np.arctan2(2*(w*x + y*z), 1 - 2*(x*x + y*y))
+        pitch = np.arcsin(np.clip(2*(w*y - z*x), -1.0, 1.0))
+        yaw = np.arctan2(2*(w*z + x*y), 1 - 2*(y*y + z*z))
+        return np.degrees(np.column_stack([roll, pitch, yaw]))
+
+    def bytes_to_binary(self, data: bytes) -> str:
+        """Converts bytes to a binary string with 8-bit representation for each byte."""
+        if len(data) == 0:
+            return ''
+        return format(int.from_bytes(data, 'big'), f'0{len(data)*8}b')
+
+    def gps_times_to_datetime64(self, weeks: np.ndarray, ms: np.ndarray) -> np.ndarray:
+        """Array version of gps_time_to_datetime, returns a datetime64[ns] array."""
+        gps_epoch = np.datetime64('1980-01-06', 'ns')
+        elapsed_ms = weeks.astype(np.int64) * (7 * 24 * 3600 * 1000) + ms.astype(np.int64)
+        return gps_epoch + elapsed_ms.astype('timedelta64[ms]')
+
+    def secondary_headers_to_datetime64(self, secondary_headers: list[bytes]) -> np.ndarray:
+        """GPS time of each 8 byte secondary header (week and ms), NaT for the packets without one."""
+        times = np.full(len(secondary_headers), np.datetime64('NaT'), dtype='datetime64[ns]')
+        has_time = np.fromiter((len(secondary_header) == 8 for secondary_header in secondary_headers), dtype=bool, count=len(secondary_headers))
+        if has_time.any():
+            gps_words = np.frombuffer(b''.join(secondary_header for secondary_header in secondary_headers if len(secondary_header) == 8), dtype='>u4').reshape(-1, 2)
+            times[has_time] = self.gps_times_to_datetime64(gps_words[:, 0], gps_words[:, 1])
+
+        return times
+
     def hex_to_binary(self, hex_string: str) -> str:
         """
         Function to convert hex string to a binary string with 4-bit representation
@@ -110,6 +205,14 @@ class DataConverter:
 
         return result_datetime
 
+    def datetime_to_gps_time(self, date_time: datetime) -> tuple[int, int]:
+        """Inverse of gps_time_to_datetime, returns the GPS week and the milliseconds elapsed in that week."""
+        elapsed = date_time - datetime(1980, 1, 6)
+        elapsed_ms = elapsed.days*86400000 + elapsed.seconds*1000 + elapsed.microseconds//1000
+
+        week, ms = divmod(elapsed_ms, 7*86400000)
+        return week, ms
+
     def binary_string_to_matrix(self, binary_string: str, format_str: str) -> np.ndarray:
         """Transforms a binary string to matrix format provided, format is of type,for example, 'matrix3' for a 3x3 matrix
         or 'matrix43' for a 4x3 matrix."""
@@ -119,6 +222,8 @@ class DataConverter:
         assert bits_per_entry == int(bits_per_entry), "Not possible to split the binary string into equal size chunks!"
     
         bits_per_entry = int(bits_per_entry)
+        if bits_per_entry == 32:
+            return self.binary_to_float32_array(binary_string).astype(np.float64).reshape(rows, cols)
         chunks = [binary_string[i:i + bits_per_entry] for i in range(0, len(binary_string), bits_per_entry)]
         matrix_values = [self.binary_to_value(chunk, 'float') for chunk in chunks]
 
@@ -0,0 +1,151 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_KEEP_FINISHED = 32
+
+class DecodeJobCancelled(Exception):
+    """Raised inside a job (by report_progress) once it has been cancelled."""
+
+
+class DecodeJob:
+    """State of one background decode. 'done' and 'total' are bytes while framing and packets while decoding."""
+    job_id: str
+    key: str
+    description: str
+    status: str
+    stage: str
+    done: int
+    total: int
+    result: Any
+    error: str | None
+    subscribers: int
+
+    def __init__(self, key: str, description: str) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.key = key
+        self.description = description
+        self.status = 'queued'
+        self.stage = ''
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.subscribers = 1
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    def report_progress(self, stage: str, done: int, total: int) -> None:
+        """Progress callback given to the decode, it stops the decode if the job was cancelled."""
+        if self.cancel_event.is_set():
+            raise DecodeJobCancelled(self.job_id)
+        self.stage = stage
+        self.done = done
+        self.total = total
+
+    def is_finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def get_progress(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "description": self.description,
+            "status": self.status,
+            "stage": self.stage,
+            "done": self.done,
+            "total": self.total,
+            "fraction": (self.done / self.total) if self.total > 0 else 0.0,
+            "error": self.error,
+            "elapsed_seconds": (self.finished_at or time.time()) - self.submitted_at,
+        }
+
+
+class DecodeJobQueue:
+    """This class runs the long decodes in a thread pool, so the dash callbacks return at once and the users poll the
+    progress of their job.
+
+    Jobs are identified by a key (e.g. the decoded data cache key of the files and catalog): submitting a key that
+    is already queued or running returns the same job, so users asking for the same dump share one decode. Each
+    submission subscribes to the job and a cancellation only unsubscribes, the job is cancelled when nobody is
+    waiting for it anymore. The last 'keep_finished' finished jobs are kept for their status and results, so the
+    decodes should return something small (e.g. the cache key of the decoded data) rather than the data itself.
+    """
+    executor: ThreadPoolExecutor
+    jobs: OrderedDict
+    active_jobs: dict[str, DecodeJob]
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, keep_finished: int = DEFAULT_KEEP_FINISHED) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='decode-job')
+        self.keep_finished = keep_finished
+        self.jobs = OrderedDict()
+        self.active_jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key: str, decode: Callable[[DecodeJob], Any], description: str = '') -> DecodeJob:
+        """Queues decode(job) unless a job with the same key is queued or running, in that case subscribes to it."""
+        with self.lock:
+            job = self.active_jobs.get(key)
+            if job is not None and not job.cancel_event.is_set():
+                job.subscribers += 1
+                return job
+
+            job = DecodeJob(key, description)
+            self.jobs[job.job_id] = job
+            self.active_jobs[key] = job
+            self.executor.submit(self._run_job, job, decode)
+            return job
+
+    def get_job(self, job_id: str) -> DecodeJob | None:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Unsubscribes from the job, returns True if the job is cancelled (no subscriber left)."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.is_finished():
+                return False
+            job.subscribers -= 1
+            if job.subscribers > 0:
+                return False
+            job.cancel_event.set()
+            if job.status == 'queued':
+                self._finish_job(job, 'cancelled')
+            return True
+
+    def _run_job(self, job: DecodeJob, decode: Callable[[DecodeJob], Any]) -> None:
+        with self.lock:
+            if job.is_finished():
+                return
+            job.status = 'running'
+
+        try:
+            result = decode(job)
+        except DecodeJobCancelled:
+            status, result = 'cancelled', None
+        except Exception as e:
+            print(f"Decode job {job.description} failed: {e!r}")
+            job.error = repr(e)
+            status, result = 'failed', None
+        else:
+            status = 'done'
+
+        with self.lock:
+            job.result = result
+            self._finish_job(job, status)
+
+    def _finish_job(self, job: DecodeJob, status: str) -> None:
+        """Marks the job finished and forgets the oldest finished jobs, called with the lock held."""
+        job.status = status
+        job.finished_at = time.time()
+        if self.active_jobs.get(job.key) is job:
+            del self.active_jobs[job.key]
+
+        finished_ids = [job_id for job_id, other_job in self.jobs.items() if other_job.is_finished()]
+        for job_id in finished_ids[:max(0, len(finished_ids) - self.keep_finished)]:
+            del self.jobs[job_id]
@@ -0,0 +1,206 @@
+import hashlib
+import os
+import pickle
+import socket
+import threading
+import time
+from typing import Any, Callable
+
+DECODED_CACHE_FOLDER = "decoded_cache"
+DEFAULT_MAX_BYTES = 2 * 1024**3
+DEFAULT_LOCK_TIMEOUT_SECONDS = 300.0
+LOCK_POLL_SECONDS = 0.1
+
+class DecodedDataCache:
+    """This class shares decoded telemetry between the server workers through a cache folder, so a dump decoded by
+    one worker (or before a restart) is only loaded by the others.
+
+    The key of an entry is made from the path, modification time and size of the source files and from the decoding
+    options, an entry is never stale: editing a dump or the catalog gives a new key. Entries are pickles written to a
+    temporary file and renamed. While a worker computes an entry it holds a lock file, the other workers asking for
+    the same key wait for the result instead of decoding it again. The lock file holds the host and PID of its owner,
+    who touches it every lock_timeout/3 while computing: a lock is only taken over when its owner process is gone
+    or when it was not touched for lock_timeout (its worker hangs or died on another host), never because a decode
+    is long. The least recently used entries are removed when the folder grows over 'max_bytes'.
+    """
+    cache_folder: str
+    max_bytes: int
+    lock_timeout: float
+
+    def __init__(self, cache_folder: str = DECODED_CACHE_FOLDER, max_bytes: int = DEFAULT_MAX_BYTES, lock_timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS) -> None:
+        self.cache_folder = cache_folder
+        self.max_bytes = max_bytes
+        self.lock_timeout = lock_timeout
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        if not os.path.exists(cache_folder):
+            os.makedirs(cache_folder)
+
+    def make_key(self, file_paths: list[str], **options) -> str:
+        """Key of the data decoded from the files (in this order) with the options given."""
+        key_hash = hashlib.sha256()
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            key_hash.update(f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+        key_hash.update(repr(sorted(options.items())).encode())
+
+        return key_hash.hexdigest()[:32]
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], progress_callback: Callable[[str, int, int], None] = None) -> Any:
+        """The cached value of the key, computed with 'compute' (and stored) by the first worker that asks for it.
+        While another worker computes it progress_callback('waiting', seconds waited, 0) is called at every poll of
+        the lock, an exception raised by it stops the wait."""
+        value = self.load(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        while not self._acquire_lock(key):
+            self.waits += 1
+            self._wait_for_lock(key, progress_callback)
+            value = self.load(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        try:
+            value = self.load(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            stop_heartbeat = self._start_lock_heartbeat(key)
+            try:
+                value = compute()
+            finally:
+                stop_heartbeat.set()
+            self.store(key, value)
+        finally:
+            self._release_lock(key)
+
+        return value
+
+    def load(self, key: str) -> Any | None:
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        os.utime(entry_path)
+        return value
+
+    def store(self, key: str, value: Any) -> None:
+        entry_path = self.entry_path(key)
+        temporary_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, entry_path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the folder fits in max_bytes."""
+        entries = []
+        for file_name in os.listdir(self.cache_folder):
+            if not file_name.endswith('.pkl'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_folder, file_name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_name))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, file_name in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_folder, file_name))
+            except OSError:
+                pass
+            total_bytes -= size
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self.entry_path(key))
+
+    def is_locked(self, key: str) -> bool:
+        """True while a worker is computing the key."""
+        return os.path.exists(self._lock_path(key))
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_folder, f"{key}.pkl")
+
+    def get_stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "waits": self.waits}
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.cache_folder, f"{key}.lock")
+
+    def _acquire_lock(self, key: str) -> bool:
+        try:
+            fd = os.open(self._lock_path(key), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.write(fd, f"{socket.gethostname()} {os.getpid()}".encode())
+        os.close(fd)
+        return True
+
+    def _release_lock(self, key: str) -> None:
+        try:
+            os.remove(self._lock_path(key))
+        except OSError:
+            pass
+
+    def _start_lock_heartbeat(self, key: str) -> threading.Event:
+        """Touches the lock of the key every lock_timeout/3 until the returned event is set."""
+        stop_event = threading.Event()
+        lock_path = self._lock_path(key)
+
+        def heartbeat():
+            while not stop_event.wait(self.lock_timeout / 3):
+                try:
+                    os.utime(lock_path)
+                except OSError:
+                    return
+
+        threading.Thread(target=heartbeat, name=f"decoded-cache-lock-{key[:8]}", daemon=True).start()
+        return stop_event
+
+    def _is_lock_owner_alive(self, lock_path: str) -> bool:
+        """False if the lock was written by a process of this host that is not running anymore. The owners on other
+        hosts (or on systems where the PID can not be checked) are taken as alive, their heartbeat tells."""
+        try:
+            with open(lock_path) as f:
+                host_name, pid = f.read().split()
+            pid = int(pid)
+        except (OSError, ValueError):
+            return True
+        if host_name != socket.gethostname() or os.name != 'posix':
+            return True
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _wait_for_lock(self, key: str, progress_callback: Callable[[str, int, int], None] = None) -> None:
+        """Waits until the lock is released, the lock of a dead owner (or not touched for lock_timeout) is removed."""
+        lock_path = self._lock_path(key)
+        wait_start = time.time()
+        while os.path.exists(lock_path):
+            if progress_callback is not None:
+                progress_callback('waiting', int(time.time() - wait_start), 0)
+            try:
+                is_stale = time.time() - os.path.getmtime(lock_path) > self.lock_timeout
+            except OSError:
+                return
+            if is_stale or not self._is_lock_owner_alive(lock_path):
+                print(f"Removing stale decoded cache lock {lock_path}")
+                self._release_lock(key)
+                return
+            time.sleep(LOCK_POLL_SECONDS)
@@ -0,0 +1,489 @@
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.ApidDecoderPlan import ApidDecoderPlan
+from space_packets_pkg.CatalogCache import CatalogCache
+from space_packets_pkg.CatalogDataReader import CatalogDataReader
+from space_packets_pkg.DataConverter import DataConverter
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer, SECONDARY_HEADER_BYTES, CHECKSUM_BYTES
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader, TELEMETRY_FOLDER_PATH
+
+GOLDEN_FOLDER_PATH = "regression_golden"
+MANIFEST_FILE_NAME = "manifest.json"
+KNOWN_DIFFERENCES_FILE_NAME = "known_differences.json"
+MAIN_SPORT_DOCUMENT_FILE_NAME = 'sport_ttc_20220814.ods'
+DEFAULT_RTOL = 1e-6
+DEFAULT_ATOL = 1e-9
+DEFAULT_FUZZ_ITERATIONS = 20
+DEFAULT_FUZZ_PACKETS = 100
+DEFAULT_SEGMENTED_FRACTION = 0.2
+MAX_FUZZ_EXTRA_BYTES = 15  # bytes added to the packets of the apids of variable length
+FUZZ_GPS_WEEKS = (2250, 2450)  # 2023 to 2026, after the date of the catalog
+MS_PER_GPS_WEEK = 604_800_000
+MISMATCH_KINDS = ('no_golden', 'dump_changed', 'reference_error', 'engine_error', 'missing_apid', 'extra_apid', 'row_count',
+                  'missing_column', 'extra_column', 'value')
+
+Engine = Callable[[str, pd.DataFrame, pd.DataFrame], dict[str, pd.DataFrame]]
+
+def reference_engine(hex_data: str, main_tm_df: pd.DataFrame, main_dd_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """The decoder of the dashboard before the batch decode: the call chain of TelemetryDataReader.get_space_packets_df_from_file
+    as it was first written (read_through_hex_str, no TM sheets, no checksum stage) on the hex data of a dump, then
+    get_specific_apid_df_from_telemetry_df for each apid. main_tm_df is not used, it is there for the engine signature."""
+    telemetry_reader = TelemetryDataReader()
+    space_packets = telemetry_reader.read_through_hex_str(hex_data)
+    space_packets_df = telemetry_reader.create_df_from_space_packets(space_packets, main_dd_df, drop_bad_checksums=False)
+    space_packets_df = space_packets_df.drop(columns=['checksum_valid'])
+
+    return {apid: telemetry_reader.get_specific_apid_df_from_telemetry_df(apid, space_packets_df, main_dd_df)
+            for apid in space_packets_df['apid'].unique()}
+
+def plan_engine(hex_data: str, main_tm_df: pd.DataFrame, main_dd_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """The batch decoder: the packets are framed and joined as in CatalogVersionRegistry.decode_file and each apid
+    is decoded at once with its ApidDecoderPlan, all with the same catalog as the reference."""
+    data_converter = DataConverter()
+    framer = SpacePacketFramer(main_tm_df)
+
+    apid_packets = {}
+    for packet in framer.frame_bytes(bytes.fromhex(hex_data)):
+        primary_header, secondary_header, data, _ = framer.split_packet(packet)
+        apid = hex(primary_header['apid'])
+        joined = framer.join_segment(apid, primary_header['seq_flags'], secondary_header, data)
+        if joined is not None:
+            apid_packets.setdefault(apid, []).append(joined)
+
+    apid_dfs = {}
+    for apid, packets in apid_packets.items():
+        apid_dd_df = main_dd_df.query(f"""apid == '{apid}'""")
+        if apid_dd_df.empty:
+            continue
+        times = data_converter.secondary_headers_to_datetime64([secondary_header for secondary_header, _ in packets])
+        decoder_plan = ApidDecoderPlan(apid, apid_dd_df['data_packets'].item())
+        apid_dfs[apid] = decoder_plan.decode_packets([data for _, data in packets], times).to_dataframe()
+
+    return apid_dfs
+
+ENGINES = {'reference': reference_engine, 'plan': plan_engine}
+
+def load_engine(name: str) -> Engine:
+    """An engine of ENGINES by name, or any function given as 'module:function' with the same signature."""
+    if name in ENGINES:
+        return ENGINES[name]
+    module_name, separator, function_name = name.partition(':')
+    if separator == '':
+        raise ValueError(f"Engine must be one of {list(ENGINES)} or 'module:function', got {name}")
+    return getattr(importlib.import_module(module_name), function_name)
+
+class DecoderRegressionHarness:
+    """This class pins the output of the reference decoder so a faster engine can be proven to give the same fields.
+
+    An engine is a function (hex data of a dump, main_tm_df, main_dd_df) -> {apid: df of the fields of the apid}, the
+    df as get_specific_apid_df_from_telemetry_df gives it ('secondary_header' column or time index). Its output is
+    put in a canonical form (times as ISO strings, missing values as None, vectors and matrices as nested lists), which
+    is what the golden files of 'golden_folder_path' hold: one JSON per dump decoded with the reference engine, and a
+    manifest with the catalog and the SHA-256 of each dump.
+
+    compare decodes the dumps with another engine and checks it against the golden files apid by apid, column by
+    column and row by row: numbers within rtol/atol, everything else exactly. fuzz makes random but valid packet
+    streams (the apids and lengths of the catalog, random data and times, some apids in segmented messages, good
+    checksums) and compares the engine with the reference on them. Both return the mismatches as a df, empty if the
+    engine matches. The kinds of mismatch in 'ignore_kinds' are not reported.
+
+    The differences of the reference that are known and wanted in a faster engine are listed per dump in the known
+    differences file of the golden folder ({dump: [{'apid', 'column', 'kind', 'reason'}]}), compare does not report
+    a mismatch that is listed for its dump. The file is kept when the goldens are recorded again.
+    """
+    main_tm_df: pd.DataFrame
+    main_dd_df: pd.DataFrame
+    golden_folder_path: str
+    rtol: float
+    atol: float
+    ignore_kinds: tuple[str, ...]
+
+    def __init__(self, main_tm_df: pd.DataFrame, main_dd_df: pd.DataFrame, golden_folder_path: str = GOLDEN_FOLDER_PATH,
+                 telemetry_folder_path: str = TELEMETRY_FOLDER_PATH, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+                 ignore_kinds: tuple[str, ...] = ()) -> None:
+        assert all(kind in MISMATCH_KINDS for kind in ignore_kinds), f"Mismatch kinds must be in {MISMATCH_KINDS}!"
+        self.main_tm_df = main_tm_df
+        self.main_dd_df = main_dd_df
+        self.golden_folder_path = golden_folder_path
+        self.telemetry_repo = FileRepository(telemetry_folder_path)
+        self.rtol = rtol
+        self.atol = atol
+        self.ignore_kinds = tuple(ignore_kinds)
+        self.packet_checksum = PacketChecksum()
+
+    def record(self, dump_files: list[str], catalog_file_name: str, engine: Engine = reference_engine) -> dict:
+        """Decodes the dumps and writes their golden files and the manifest, returns the manifest."""
+        os.makedirs(self.golden_folder_path, exist_ok=True)
+        manifest = {
+            "catalog": catalog_file_name,
+            "recorded": datetime.now().isoformat(timespec='seconds'),
+            "dumps": {},
+        }
+        for file_name in dump_files:
+            hex_data = self.telemetry_repo.read_telemetry_dump_file(file_name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                golden = self.canonicalize(engine(hex_data, self.main_tm_df, self.main_dd_df))
+            with open(self.get_golden_path(file_name), 'w') as f:
+                json.dump(golden, f)
+            manifest["dumps"][file_name] = {
+                "sha256": self.get_dump_hash(file_name),
+                "rows": {apid: len(apid_golden['time']) for apid, apid_golden in golden.items()},
+            }
+
+        with open(os.path.join(self.golden_folder_path, MANIFEST_FILE_NAME), 'w') as f:
+            json.dump(manifest, f, indent=1)
+        return manifest
+
+    def compare(self, engine: Engine, dump_files: list[str] | None = None) -> pd.DataFrame:
+        """Mismatches of the engine against the golden files of the dumps (all the dumps of the manifest if None)."""
+        manifest = self.load_manifest()
+        known_differences = self.load_known_differences()
+        dump_files = dump_files if dump_files is not None else list(manifest["dumps"])
+
+        mismatches = []
+        for file_name in dump_files:
+            if file_name not in manifest["dumps"]:
+                mismatches.append(self.make_mismatch(file_name, None, None, 'no_golden'))
+                continue
+            if self.get_dump_hash(file_name) != manifest["dumps"][file_name]["sha256"]:
+                mismatches.append(self.make_mismatch(file_name, None, None, 'dump_changed'))
+                continue
+
+            with open(self.get_golden_path(file_name)) as f:
+                golden = json.load(f)
+            hex_data = self.telemetry_repo.read_telemetry_dump_file(file_name)
+            mismatches.extend(mismatch for mismatch in self.run_and_compare(file_name, golden, engine, hex_data)
+                              if not self.is_known_difference(mismatch, known_differences.get(file_name, [])))
+
+        return self.to_mismatches_df(mismatches)
+
+    def fuzz(self, engine: Engine, iterations: int = DEFAULT_FUZZ_ITERATIONS, packets_per_stream: int = DEFAULT_FUZZ_PACKETS,
+             seed: int = 0, segmented_fraction: float = DEFAULT_SEGMENTED_FRACTION, failures_folder_path: str | None = None) -> pd.DataFrame:
+        """Mismatches of the engine against the reference on random packet streams. Stream i is made with seed + i,
+        so a failing stream is made again with that seed and iterations=1. The streams that fail are written as
+        fuzz_<seed>.hex in failures_folder_path if given (they can be put in the dump folder and recorded)."""
+        mismatches = []
+        for i in range(iterations):
+            stream_seed = seed + i
+            hex_data = self.make_fuzz_stream(np.random.default_rng(stream_seed), packets_per_stream, segmented_fraction)
+            source = f"fuzz seed {stream_seed}"
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    expected = self.canonicalize(reference_engine(hex_data, self.main_tm_df, self.main_dd_df))
+            except Exception as e:
+                mismatches.append(self.make_mismatch(source, None, None, 'reference_error', got=repr(e)))
+                continue
+
+            stream_mismatches = [mismatch for mismatch in self.run_and_compare(source, expected, engine, hex_data) if mismatch['kind'] not in self.ignore_kinds]
+            mismatches.extend(stream_mismatches)
+            if len(stream_mismatches) > 0 and failures_folder_path is not None:
+                os.makedirs(failures_folder_path, exist_ok=True)
+                with open(os.path.join(failures_folder_path, f"fuzz_{stream_seed}.hex"), 'w') as f:
+                    f.write(hex_data)
+
+        return self.to_mismatches_df(mismatches)
+
+    def run_and_compare(self, source: str, expected: dict, engine: Engine, hex_data: str) -> list[dict]:
+        try:
+            got = self.canonicalize(engine(hex_data, self.main_tm_df, self.main_dd_df))
+        except Exception as e:
+            return [self.make_mismatch(source, None, None, 'engine_error', got=repr(e))]
+        return self.compare_outputs(source, expected, got)
+
+    def compare_outputs(self, source: str, expected: dict, got: dict) -> list[dict]:
+        """Mismatches between two canonical outputs: apids, row counts and times, columns, then the values."""
+        mismatches = []
+        for apid in expected:
+            if apid not in got:
+                mismatches.append(self.make_mismatch(source, apid, None, 'missing_apid'))
+        for apid in got:
+            if apid not in expected:
+                mismatches.append(self.make_mismatch(source, apid, None, 'extra_apid'))
+
+        for apid in [apid for apid in expected if apid in got]:
+            expected_apid, got_apid = expected[apid], got[apid]
+            if len(expected_apid['time']) != len(got_apid['time']):
+                mismatches.append(self.make_mismatch(source, apid, None, 'row_count', expected=len(expected_apid['time']), got=len(got_apid['time'])))
+                continue
+            mismatches.extend(self.compare_column(source, apid, 'time', expected_apid['time'], got_apid['time']))
+
+            for column in expected_apid['columns']:
+                if column not in got_apid['columns']:
+                    mismatches.append(self.make_mismatch(source, apid, column, 'missing_column'))
+                else:
+                    mismatches.extend(self.compare_column(source, apid, column, expected_apid['columns'][column], got_apid['columns'][column]))
+            for column in got_apid['columns']:
+                if column not in expected_apid['columns']:
+                    mismatches.append(self.make_mismatch(source, apid, column, 'extra_column'))
+
+        return mismatches
+
+    def is_known_difference(self, mismatch: dict, dump_known_differences: list[dict]) -> bool:
+        return any(mismatch['apid'] == known_difference['apid'] and mismatch['column'] == known_difference.get('column')
+                   and mismatch['kind'] == known_difference['kind'] for known_difference in dump_known_differences)
+
+    def compare_column(self, source: str, apid: str, column: str, expected: list, got: list) -> list[dict]:
+        """One mismatch for the column with the number of rows that differ and the first of them, if any."""
+        bad_rows = [row for row, (expected_value, got_value) in enumerate(zip(expected, got)) if not self.values_match(expected_value, got_value)]
+        if len(bad_rows) == 0:
+            return []
+        first_row = bad_rows[0]
+        return [self.make_mismatch(source, apid, column, 'value', rows=len(bad_rows), first_row=first_row, expected=expected[first_row], got=got[first_row])]
+
+    def values_match(self, expected, got) -> bool:
+        if expected is None or got is None:
+            return expected is None and got is None
+        elif isinstance(expected, list) or isinstance(got, list):
+            return (isinstance(expected, list) and isinstance(got, list) and len(expected) == len(got)
+                    and all(self.values_match(expected_value, got_value) for expected_value, got_value in zip(expected, got)))
+        elif isinstance(expected, bool) or isinstance(got, bool):
+            return expected == got
+        elif isinstance(expected, int) and isinstance(got, int):
+            return expected == got
+        elif isinstance(expected, (int, float)) and isinstance(got, (int, float)):
+            return expected == got or math.isclose(expected, got, rel_tol=self.rtol, abs_tol=self.atol)
+        return expected == got
+
+    def canonicalize(self, apid_dfs: dict[str, pd.DataFrame]) -> dict:
+        """{apid: {'time': [...], 'columns': {column: [...]}}} with plain JSON values, apids sorted."""
+        canonical = {}
+        for apid in sorted(apid_dfs):
+            df = apid_dfs[apid]
+            if 'secondary_header' in df.columns:
+                times = pd.to_datetime(df['secondary_header'], errors='coerce')
+                df = df.drop(columns=['secondary_header'])
+            else:
+                times = pd.Series(pd.to_datetime(df.index, errors='coerce'))
+            df = df.drop(columns=[column for column in ['index', 'time'] if column in df.columns])
+
+            canonical[apid] = {
+                'time': [None if pd.isna(t) else t.isoformat() for t in times],
+                'columns': {str(column): [self.canonical_value(value) for value in df[column]] for column in df.columns},
+            }
+
+        return canonical
+
+    def canonical_value(self, value):
+        if isinstance(value, np.ndarray):
+            return [self.canonical_value(v) for v in value]
+        elif isinstance(value, (list, tuple)):
+            return [self.canonical_value(v) for v in value]
+        elif value is None or value is pd.NaT:
+            return None
+        elif isinstance(value, (bool, np.bool_)):
+            return bool(value)
+        elif isinstance(value, (int, np.integer)):
+            return int(value)
+        elif isinstance(value, (float, np.floating)):
+            return None if math.isnan(value) else float(value)
+        elif isinstance(value, (pd.Timestamp, datetime, np.datetime64)):
+            return pd.Timestamp(value).isoformat()
+        elif isinstance(value, bytes):
+            return value.hex()
+        return str(value)
+
+    def make_fuzz_stream(self, rng: np.random.Generator, n_packets: int, segmented_fraction: float = DEFAULT_SEGMENTED_FRACTION) -> str:
+        """Hex data of n_packets random packets of the catalog apids, with good checksums. The data of each packet is
+        random except for the GPS time fields, which get valid times. Packets of an apid come in time order and the
+        packets of 'segmented_fraction' of the apids are split in segments. The stream ends with a packet of the longest
+        apid, never segmented: the reference framer stops when the data left is shorter than the last packet it read,
+        and it drops the unsegmented packets of an apid that also has segments."""
+        apid_layouts = self.get_fuzz_apid_layouts()
+        apids = list(apid_layouts)
+        longest_apid = max(apids, key=lambda apid: apid_layouts[apid][0] + (MAX_FUZZ_EXTRA_BYTES if apid_layouts[apid][1] else 0))
+        segmented_apids = {apid for apid in apids if rng.random() < segmented_fraction and apid != longest_apid}
+
+        apid_sequence = [(apids[apid_id], apids[apid_id] in segmented_apids) for apid_id in rng.choice(len(apids), size=n_packets - 1)]
+        apid_sequence.append((longest_apid, False))
+        apid_times = {apid: self.get_random_gps_ms(rng) for apid in apids}
+        seq_counts = {apid: int(rng.integers(0, 0x4000)) for apid in apids}
+
+        packets = []
+        for i, (apid, segmented) in enumerate(apid_sequence):
+            data_bytes, varies, gps_time_offsets = apid_layouts[apid]
+            if varies:
+                data_bytes += MAX_FUZZ_EXTRA_BYTES if i == len(apid_sequence) - 1 else int(rng.integers(0, MAX_FUZZ_EXTRA_BYTES + 1))
+            data_bits = np.unpackbits(rng.integers(0, 256, size=data_bytes, dtype=np.uint8))
+            for offset in gps_time_offsets:
+                data_bits[offset:(offset+64)] = np.unpackbits(np.frombuffer(self.to_gps_bytes(self.get_random_gps_ms(rng)), dtype=np.uint8))
+            data = np.packbits(data_bits)
+
+            apid_times[apid] += int(rng.integers(1, 60_000))
+            secondary_header = self.to_gps_bytes(apid_times[apid])
+
+            if segmented and data_bytes >= 2:
+                n_segments = int(rng.integers(2, min(4, data_bytes) + 1))
+                cuts = np.sort(rng.choice(np.arange(1, data_bytes), size=n_segments - 1, replace=False))
+                parts = np.split(data, cuts)
+                seq_flags = [0x1] + [0x0]*(n_segments - 2) + [0x2]
+            else:
+                parts = [data]
+                seq_flags = [0x3]
+
+            for part, seq_flag in zip(parts, seq_flags):
+                packets.append(self.make_packet(int(apid, 16), seq_flag, seq_counts[apid], secondary_header, part.tobytes()))
+                seq_counts[apid] = (seq_counts[apid] + 1) % 0x4000
+
+        return b''.join(packets).hex()
+
+    def make_packet(self, apid: int, seq_flags: int, seq_count: int, secondary_header: bytes, data: bytes) -> bytes:
+        """Telemetry packet with secondary header and checksum (version 0, type 0)."""
+        pkt_data_length = SECONDARY_HEADER_BYTES + len(data) + CHECKSUM_BYTES - 1
+        primary_header = ((0x08 << 8) | apid).to_bytes(2, 'big') + ((seq_flags << 14) | seq_count).to_bytes(2, 'big') + pkt_data_length.to_bytes(2, 'big')
+        return self.packet_checksum.with_checksum(primary_header + secondary_header + data + bytes(CHECKSUM_BYTES))
+
+    def get_random_gps_ms(self, rng: np.random.Generator) -> int:
+        """Milliseconds since the GPS epoch of a random time within FUZZ_GPS_WEEKS."""
+        return int(rng.integers(FUZZ_GPS_WEEKS[0], FUZZ_GPS_WEEKS[1]))*MS_PER_GPS_WEEK + int(rng.integers(0, MS_PER_GPS_WEEK))
+
+    def to_gps_bytes(self, gps_ms: int) -> bytes:
+        week, ms = divmod(gps_ms, MS_PER_GPS_WEEK)
+        return week.to_bytes(4, 'big') + ms.to_bytes(4, 'big')
+
+    def get_fuzz_apid_layouts(self) -> dict[str, tuple[int, bool, list[int]]]:
+        """apid -> (data bytes of the packets, True if the length varies, bit offsets of the GPS time fields) for the
+        apids in both sheets. The data covers the DD fields (or the TM length if longer). Apids the reference can not
+        decode are left out: a variable field after other fields (it is given the whole data) or an integer array
+        wider than 64 bits (it becomes one python int that does not fit in a df column)."""
+        dd_apids = set(self.main_dd_df['apid'])
+        apid_layouts = {}
+        for apid, pkt_data_length in zip(self.main_tm_df['apid'], self.main_tm_df['pkt_data_length']):
+            if apid not in dd_apids:
+                continue
+            decoder_plan = ApidDecoderPlan(apid, self.main_dd_df.query(f"""apid == '{apid}'""")['data_packets'].item())
+            if any(self.is_undecodable_by_reference(field) for field in decoder_plan.fields):
+                continue
+            try:
+                tm_data_bytes = int(pkt_data_length, 16) + 1 - SECONDARY_HEADER_BYTES - CHECKSUM_BYTES
+                varies = False
+            except (TypeError, ValueError):
+                tm_data_bytes = 0
+                varies = True
+
+            data_bytes = max(tm_data_bytes, math.ceil(self.get_dd_data_bits(apid)/8))
+            gps_time_offsets = [field['offset'] for field in decoder_plan.fields if field['format'] == 'GPS time' and field['length'] == 64]
+            if data_bytes > 0:
+                apid_layouts[apid] = (data_bytes, varies, gps_time_offsets)
+
+        return apid_layouts
+
+    def is_undecodable_by_reference(self, field: dict) -> bool:
+        if field['length'] is None:
+            return field['offset'] > 0
+        return field['length'] > 64 and str(field['format']).startswith(('uint', 'int'))
+
+    def get_dd_data_bits(self, apid: str) -> int:
+        """Bits of the fixed length fields of the DD of the apid, up to 'Total' or the first variable field."""
+        data_bits = 0
+        for single_data_field in self.main_dd_df.query(f"""apid == '{apid}'""")['data_packets'].item():
+            bit_length = single_data_field['lenght(bits)']
+            if single_data_field['field'] == 'Total' or bit_length == 'Varies':
+                break
+            try:
+                data_bits += int(bit_length)
+            except (TypeError, ValueError):
+                continue
+        return data_bits
+
+    def load_manifest(self) -> dict:
+        manifest_path = os.path.join(self.golden_folder_path, MANIFEST_FILE_NAME)
+        assert os.path.isfile(manifest_path), f"No golden files in {self.golden_folder_path}, record them first!"
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def load_known_differences(self) -> dict[str, list[dict]]:
+        known_differences_path = os.path.join(self.golden_folder_path, KNOWN_DIFFERENCES_FILE_NAME)
+        if not os.path.isfile(known_differences_path):
+            return {}
+        with open(known_differences_path) as f:
+            return json.load(f)
+
+    def get_golden_path(self, file_name: str) -> str:
+        return os.path.join(self.golden_folder_path, f"{file_name}.json")
+
+    def get_dump_hash(self, file_name: str) -> str:
+        with open(self.telemetry_repo.get_file_path_from_file_name(file_name), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def make_mismatch(self, source: str, apid: str | None, column: str | None, kind: str, rows: int | None = None,
+                      first_row: int | None = None, expected=None, got=None) -> dict:
+        return {'source': source, 'apid': apid, 'column': column, 'kind': kind, 'rows': rows, 'first_row': first_row, 'expected': expected, 'got': got}
+
+    def to_mismatches_df(self, mismatches: list[dict]) -> pd.DataFrame:
+        mismatches = [mismatch for mismatch in mismatches if mismatch['kind'] not in self.ignore_kinds]
+        mismatches_df = pd.DataFrame(mismatches, columns=['source', 'apid', 'column', 'kind', 'rows', 'first_row', 'expected', 'got'])
+        return mismatches_df.astype({'rows': 'Int64', 'first_row': 'Int64'})
+
+
+def print_mismatches(mismatches: pd.DataFrame, label: str, elapsed: float) -> None:
+    if mismatches.empty:
+        print(f"{label}: OK ({elapsed:.1f} s)")
+        return
+    print(f"{label}: {len(mismatches)} mismatches ({elapsed:.1f} s)")
+    with pd.option_context('display.max_rows', None, 'display.max_colwidth', 80, 'display.width', 200):
+        print(mismatches.to_string(index=False))
+
+def main():
+    parser = argparse.ArgumentParser(description='Golden output regression of the telemetry decoders.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='Decode the dumps with the reference engine and write the golden files')
+    record_parser.add_argument('files', nargs='*', help='Dumps inside the telemetry folder (all of them if none)')
+    compare_parser = subparsers.add_parser('compare', help='Check an engine against the golden files')
+    compare_parser.add_argument('files', nargs='*', help='Dumps to check (all the recorded ones if none)')
+    fuzz_parser = subparsers.add_parser('fuzz', help='Compare an engine with the reference on random packet streams')
+    fuzz_parser.add_argument('--iterations', type=int, default=DEFAULT_FUZZ_ITERATIONS, help='Random streams')
+    fuzz_parser.add_argument('--packets', type=int, default=DEFAULT_FUZZ_PACKETS, help='Packets per stream')
+    fuzz_parser.add_argument('--seed', type=int, default=0, help='Seed of the first stream')
+    fuzz_parser.add_argument('--segmented-fraction', type=float, default=DEFAULT_SEGMENTED_FRACTION, help='Fraction of the apids sent in segments')
+    fuzz_parser.add_argument('--failures-folder', type=str, default=None, help='Folder to write the failing streams to')
+    for subparser in [compare_parser, fuzz_parser]:
+        subparser.add_argument('--engine', type=str, default='plan', help=f"One of {list(ENGINES)} or 'module:function'")
+        subparser.add_argument('--rtol', type=float, default=DEFAULT_RTOL, help='Relative tolerance of the numbers')
+        subparser.add_argument('--atol', type=float, default=DEFAULT_ATOL, help='Absolute tolerance of the numbers')
+        subparser.add_argument('--ignore', nargs='*', choices=MISMATCH_KINDS, default=[], help='Kinds of mismatch not reported')
+    for subparser in [record_parser, compare_parser, fuzz_parser]:
+        subparser.add_argument('--catalog', type=str, default=MAIN_SPORT_DOCUMENT_FILE_NAME, help='Catalog document')
+        subparser.add_argument('--golden-folder', type=str, default=GOLDEN_FOLDER_PATH, help='Folder of the golden files')
+        subparser.add_argument('--telemetry-folder', type=str, default=TELEMETRY_FOLDER_PATH, help='Folder of the dumps')
+    args = parser.parse_args()
+
+    main_tm_df, main_dd_df = CatalogCache(CatalogDataReader()).get_catalog(args.catalog)
+    harness = DecoderRegressionHarness(main_tm_df, main_dd_df, args.golden_folder, args.telemetry_folder,
+                                       rtol=getattr(args, 'rtol', DEFAULT_RTOL), atol=getattr(args, 'atol', DEFAULT_ATOL), ignore_kinds=tuple(getattr(args, 'ignore', ())))
+
+    start = time.perf_counter()
+    if args.command == 'record':
+        dump_files = args.files or sorted(harness.telemetry_repo.list_files())
+        manifest = harness.record(dump_files, args.catalog)
+        for file_name, dump in manifest["dumps"].items():
+            print(f"{file_name}: {sum(dump['rows'].values())} rows of {len(dump['rows'])} apids")
+        print(f"Golden files written to {args.golden_folder} in {time.perf_counter() - start:.1f} s")
+        return
+
+    engine = load_engine(args.engine)
+    if args.command == 'compare':
+        mismatches = harness.compare(engine, args.files or None)
+        print_mismatches(mismatches, f"{args.engine} against the golden files", time.perf_counter() - start)
+    else:
+        mismatches = harness.fuzz(engine, args.iterations, args.packets, args.seed, args.segmented_fraction, args.failures_folder)
+        print_mismatches(mismatches, f"{args.engine} against the reference on {args.iterations} random streams", time.perf_counter() - start)
+    sys.exit(1 if not mismatches.empty else 0)
+
+if __name__ == '__main__':
+    main()
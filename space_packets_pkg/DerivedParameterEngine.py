@@ -0,0 +1,239 @@
+import ast
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.DataConverter import DataConverter
+
+FIELD_REFERENCE_PATTERN = re.compile(r'\[(?:(0x[0-9a-fA-F]+):)?([^\[\]]+)\]')
+DEFAULT_ALIGN_TOLERANCE = pd.Timedelta(seconds=10)
+DEFAULT_MAX_CACHED_RESULTS = 128
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Constant, ast.Load,
+    ast.Subscript, ast.Slice, ast.Tuple, ast.List,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.BitAnd, ast.BitOr, ast.Invert,
+)
+
+def stack_components(values) -> np.ndarray:
+    """(samples x components) float array from a column of vectors/quaternions (lists or arrays per sample)."""
+    values = np.asarray(values)
+    if values.dtype != object:
+        return values.astype(float)
+    n_components = max((len(value) for value in values if value is not None and np.ndim(value) > 0), default=0)
+    stacked = np.full((len(values), n_components), np.nan)
+    for i, value in enumerate(values):
+        if value is not None and np.ndim(value) > 0:
+            stacked[i, :len(value)] = np.ravel(value)
+    return stacked
+
+def norm(values) -> np.ndarray:
+    return DataConverter().vector_norms(stack_components(values))
+
+def euler_angle(quaternions, axis: int) -> np.ndarray:
+    return DataConverter().quaternions_to_euler_angles(stack_components(quaternions))[:, axis]
+
+def roll(quaternions) -> np.ndarray:
+    return euler_angle(quaternions, 0)
+
+def pitch(quaternions) -> np.ndarray:
+    return euler_angle(quaternions, 1)
+
+def yaw(quaternions) -> np.ndarray:
+    return euler_angle(quaternions, 2)
+
+def quaternion_error_angle(measured, reference) -> np.ndarray:
+    """Angle in degrees of the rotation between two quaternions per sample (sign and order of components agnostic
+    as long as both use the same convention)."""
+    measured = stack_components(measured)
+    reference = stack_components(reference)
+    measured = measured / np.linalg.norm(measured, axis=1, keepdims=True)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    dot = np.clip(np.abs(np.sum(measured*reference, axis=1)), 0.0, 1.0)
+    return np.degrees(2*np.arccos(dot))
+
+EXPRESSION_FUNCTIONS = {
+    'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10,
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'arcsin': np.arcsin, 'arccos': np.arccos, 'arctan': np.arctan,
+    'arctan2': np.arctan2, 'hypot': np.hypot, 'degrees': np.degrees, 'radians': np.radians,
+    'minimum': np.minimum, 'maximum': np.maximum, 'where': np.where, 'clip': np.clip,
+    'stack': stack_components, 'norm': norm, 'quaternion_error_angle': quaternion_error_angle,
+    'roll': roll, 'pitch': pitch, 'yaw': yaw,
+}
+EXPRESSION_CONSTANTS = {'pi': np.pi, 'e': np.e}
+
+class DerivedParameterEngine:
+    """This class computes derived parameters from expressions over the catalog fields, e.g.
+    'Battery power (W) = [Output voltage of VBAT bus (V)] * [Output current of VBAT bus (A)]'.
+
+    A field is referenced by its column name in brackets, [apid:column name] when the name exists in more than one
+    apid. Expressions are parsed and compiled once (only arithmetic, comparisons and the numpy functions of
+    EXPRESSION_FUNCTIONS are accepted) and evaluated on whole columns. The fields of other apids are aligned with
+    merge_asof on the times of the first apid referenced (the last value not older than 'tolerance'), instead of an
+    outer join of the frames.
+
+    Results are cached by a fingerprint of the columns they use, so they are computed again only when that data
+    changes. The engine holds neither the data nor the parameters of a user, so one engine is shared by every user of
+    the dashboard.
+    """
+    compiled_expressions: dict[str, tuple]
+    results: OrderedDict
+
+    def __init__(self, tolerance: pd.Timedelta | None = DEFAULT_ALIGN_TOLERANCE, direction: str = 'backward', max_cached_results: int = DEFAULT_MAX_CACHED_RESULTS) -> None:
+        self.tolerance = tolerance
+        self.direction = direction
+        self.max_cached_results = max_cached_results
+        self.compiled_expressions = {}
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+
+    def parse_parameters(self, text: str) -> OrderedDict:
+        """name -> expression of the 'name = expression' lines of the text (empty lines and lines starting with # are
+        skipped), every expression is checked and compiled here."""
+        parameters = OrderedDict()
+        for line in (text or '').splitlines():
+            line = line.strip()
+            if line == '' or line.startswith('#'):
+                continue
+            name, separator, expression = line.partition('=')
+            if separator == '' or name.strip() == '' or expression.strip() == '':
+                raise ValueError(f"Derived parameter must be 'name = expression': {line}")
+            self.compile_expression(expression.strip())
+            parameters[name.strip()] = expression.strip()
+
+        return parameters
+
+    def compile_expression(self, expression: str) -> tuple:
+        """(code, references) of the expression, references are (apid or None, column name) in order of appearance."""
+        if expression in self.compiled_expressions:
+            return self.compiled_expressions[expression]
+
+        references = []
+        def replace_reference(match: re.Match) -> str:
+            reference = (match.group(1).lower() if match.group(1) else None, match.group(2).strip())
+            if reference not in references:
+                references.append(reference)
+            return f"_field_{references.index(reference)}"
+
+        python_expression = FIELD_REFERENCE_PATTERN.sub(replace_reference, expression)
+        if len(references) == 0:
+            raise ValueError(f"Expression has no [field] reference: {expression}")
+        try:
+            tree = ast.parse(python_expression, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression {expression}: {e.msg}") from None
+
+        allowed_names = set(EXPRESSION_FUNCTIONS) | set(EXPRESSION_CONSTANTS) | {f"_field_{i}" for i in range(len(references))}
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(f"'{type(node).__name__}' is not allowed in derived expressions: {expression}")
+            if isinstance(node, ast.Name) and node.id not in allowed_names:
+                raise ValueError(f"Unknown name '{node.id}' in {expression}, fields must be written in brackets")
+            if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in EXPRESSION_FUNCTIONS):
+                raise ValueError(f"Only the functions {sorted(EXPRESSION_FUNCTIONS)} can be called: {expression}")
+
+        compiled = (compile(tree, '<derived parameter>', 'eval'), references)
+        self.compiled_expressions[expression] = compiled
+        return compiled
+
+    def evaluate(self, name: str, expression: str, apid_frames: dict[str, pd.DataFrame]) -> pd.Series:
+        """Values of the expression on the times of its first apid. apid_frames are the decoded fields of each apid
+        indexed by time."""
+        code, references = self.compile_expression(expression)
+        resolved = [(self.resolve_apid(reference, apid_frames), reference[1]) for reference in references]
+
+        key = (expression, self.tolerance, self.direction,
+               tuple((apid, column, self.fingerprint(apid_frames[apid][column])) for apid, column in resolved))
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key].rename(name)
+
+        grid, aligned_columns = self.align(resolved, apid_frames)
+        namespace = dict(EXPRESSION_FUNCTIONS, **EXPRESSION_CONSTANTS)
+        namespace.update({f"_field_{i}": values for i, values in enumerate(aligned_columns)})
+        with np.errstate(all='ignore'):
+            values = eval(code, {'__builtins__': {}}, namespace)
+        values = np.broadcast_to(np.asarray(values), (len(grid),)) if np.ndim(values) == 0 else np.asarray(values)
+        if values.shape != (len(grid),):
+            raise ValueError(f"{name} must give one value per sample, got shape {values.shape}")
+        result = pd.Series(values, index=grid, name=name)
+
+        with self.lock:
+            self.results[key] = result
+            if len(self.results) > self.max_cached_results:
+                self.results.popitem(last=False)
+        return result
+
+    def evaluate_all(self, parameters: dict[str, str], apid_frames: dict[str, pd.DataFrame]) -> tuple[dict[str, pd.Series], dict[str, str]]:
+        """(values, errors) of the parameters (name -> expression), a parameter that cannot be evaluated with these
+        frames goes to errors."""
+        values = {}
+        errors = {}
+        for name, expression in parameters.items():
+            try:
+                values[name] = self.evaluate(name, expression, apid_frames)
+            except (ValueError, KeyError, TypeError) as e:
+                errors[name] = str(e)
+
+        return values, errors
+
+    def resolve_apid(self, reference: tuple[str | None, str], apid_frames: dict[str, pd.DataFrame]) -> str:
+        apid, column = reference
+        if apid is not None:
+            if apid not in apid_frames or column not in apid_frames[apid].columns:
+                raise KeyError(f"Field [{apid}:{column}] is not loaded")
+            return apid
+
+        apids = [apid for apid, df in apid_frames.items() if column in df.columns]
+        if len(apids) == 0:
+            raise KeyError(f"Field [{column}] is not loaded")
+        elif len(apids) > 1:
+            raise ValueError(f"Field [{column}] exists in apids {apids}, write it as [apid:{column}]")
+        return apids[0]
+
+    def align(self, resolved: list[tuple[str, str]], apid_frames: dict[str, pd.DataFrame]) -> tuple[pd.DatetimeIndex, list[np.ndarray]]:
+        """Common time grid (the sorted times of the first apid) and the referenced columns aligned to it."""
+        base_apid = resolved[0][0]
+        base_times = pd.DatetimeIndex(apid_frames[base_apid].index)
+        grid = base_times[~base_times.isna()].sort_values().unique()
+        grid_df = pd.DataFrame({'time': grid})
+
+        aligned = {}
+        for apid in dict.fromkeys(apid for apid, _ in resolved):
+            columns = [column for other_apid, column in resolved if other_apid == apid]
+            apid_df = apid_frames[apid][columns]
+            apid_df = apid_df[~pd.DatetimeIndex(apid_df.index).isna()]
+            apid_df = apid_df.set_axis(pd.DatetimeIndex(apid_df.index).rename('time'), axis=0).sort_index()
+            apid_df = apid_df[~apid_df.index.duplicated(keep='last')].reset_index()
+
+            if apid == base_apid:
+                merged = grid_df.merge(apid_df, on='time', how='left')
+            else:
+                merged = pd.merge_asof(grid_df, apid_df, on='time', direction=self.direction, tolerance=self.tolerance)
+            for column in columns:
+                aligned[(apid, column)] = self._to_values(merged[column])
+
+        return pd.DatetimeIndex(grid), [aligned[reference] for reference in resolved]
+
+    def fingerprint(self, column: pd.Series) -> tuple:
+        """Changes when the values or times of the column change."""
+        try:
+            hashed = pd.util.hash_pandas_object(column, index=True)
+        except TypeError:
+            hashed = pd.util.hash_pandas_object(column.map(repr), index=True)
+        return (len(column), int(hashed.sum()))
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.results.clear()
+
+    def _to_values(self, column: pd.Series) -> np.ndarray:
+        """Numeric columns as float arrays (missing values are NaN), the others (vectors, quaternions) as they are."""
+        if pd.api.types.is_numeric_dtype(column.dtype) or pd.api.types.is_bool_dtype(column.dtype):
+            return column.to_numpy(dtype=float, na_value=np.nan)
+        return column.to_numpy()
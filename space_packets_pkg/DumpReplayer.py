@@ -0,0 +1,163 @@
+import argparse
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Callable
+from urllib.parse import urlparse
+
+import numpy as np
+
+from space_packets_pkg.DataConverter import DataConverter
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer, PRIMARY_HEADER_BYTES, SECONDARY_HEADER_BYTES
+
+TELEMETRY_FOLDER_PATH = "decoded_satcs_dump"
+MAX_REPLAY_GAP_SECONDS = 10.0
+REPORT_INTERVAL_SECONDS = 5.0
+
+class DumpReplayer:
+    """This class replays telemetry dumps as a live downlink, it frames the dump files into packets and sends them
+    to a socket or named pipe at the original pace (scaled by a rate factor) or as fast as possible.
+
+    When restamping, the secondary header of every packet is replaced by its emission time (and the checksum is
+    recomputed), so the receiver can measure the latency from emission to decoded value.
+    """
+    file_repo: FileRepository
+    framer: SpacePacketFramer
+    data_converter: DataConverter
+    packet_checksum: PacketChecksum
+
+    def __init__(self, folder_path: str = TELEMETRY_FOLDER_PATH) -> None:
+        self.file_repo = FileRepository(folder_path)
+        self.framer = SpacePacketFramer()
+        self.data_converter = DataConverter()
+        self.packet_checksum = PacketChecksum()
+
+    def load_packets(self, file_names: list[str]) -> list[bytes]:
+        """Reads the dumps with the file repository and frames them into packets, in file order."""
+        packets = []
+        for file_name in file_names:
+            hex_data = self.file_repo.read_telemetry_dump_file(file_name)
+            packets.extend(self.framer.frame_bytes(bytes.fromhex(hex_data)))
+
+        return packets
+
+    def get_send_delays(self, packets: list[bytes], rate: float | None) -> np.ndarray:
+        """Seconds to wait before sending each packet, from the secondary header times divided by the rate. Jumps
+        back in time (clock resets) count as no wait and long gaps are limited to MAX_REPLAY_GAP_SECONDS, so a
+        dump with a reset does not stall the replay. With rate None all delays are zero."""
+        if rate is None or len(packets) == 0:
+            return np.zeros(len(packets))
+
+        times_ms = np.array([self._packet_time_ms(packet) for packet in packets], dtype=float)
+        deltas = np.diff(times_ms, prepend=times_ms[0])/1000
+        deltas = np.nan_to_num(deltas, nan=0.0)
+        return np.clip(deltas, 0, MAX_REPLAY_GAP_SECONDS)/rate
+
+    def restamp_packet(self, packet: bytes, date_time: datetime) -> bytes:
+        """Writes the GPS time of date_time in the secondary header and recomputes the checksum. Packets without
+        secondary header are returned as they are."""
+        primary_header = self.framer.parse_primary_header(packet)
+        if primary_header['sec_hdr_flag'] != 1:
+            return packet
+
+        week, ms = self.data_converter.datetime_to_gps_time(date_time)
+        secondary_header = week.to_bytes(4, 'big') + ms.to_bytes(4, 'big')
+        restamped = packet[:PRIMARY_HEADER_BYTES] + secondary_header + packet[(PRIMARY_HEADER_BYTES+SECONDARY_HEADER_BYTES):]
+        return self.packet_checksum.with_checksum(restamped)
+
+    def replay(self, packets: list[bytes], target: str, rate: float | None = 1.0, restamp: bool = False, loops: int = 1,
+               progress_callback: Callable[[int, int, float], None] = None) -> dict:
+        """Sends the packets to the target ('udp://host:port', 'tcp://host:port' or 'pipe:///path/to/fifo') and
+        returns the achieved rates. With rate None the packets are sent as fast as possible. progress_callback(packets,
+        bytes, seconds) is called with what was sent so far every REPORT_INTERVAL_SECONDS."""
+        send, close = self.open_target(target)
+        delays = self.get_send_delays(packets, rate)
+
+        sent_packets = 0
+        sent_bytes = 0
+        start = time.perf_counter()
+        next_send = start
+        last_report = start
+        try:
+            for _ in range(loops):
+                for packet, delay in zip(packets, delays):
+                    next_send += delay
+                    wait = next_send - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                    if restamp:
+                        packet = self.restamp_packet(packet, datetime.now(timezone.utc).replace(tzinfo=None))
+                    send(packet)
+                    sent_packets += 1
+                    sent_bytes += len(packet)
+
+                    if progress_callback is not None and time.perf_counter() - last_report >= REPORT_INTERVAL_SECONDS:
+                        last_report = time.perf_counter()
+                        progress_callback(sent_packets, sent_bytes, last_report - start)
+        finally:
+            close()
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "packets": sent_packets,
+            "bytes": sent_bytes,
+            "seconds": elapsed,
+            "packets_per_second": sent_packets/elapsed if elapsed > 0 else 0.0,
+            "bytes_per_second": sent_bytes/elapsed if elapsed > 0 else 0.0,
+        }
+        return report
+
+    def open_target(self, target: str):
+        """Returns the (send, close) functions of the target."""
+        parsed = urlparse(target)
+        if parsed.scheme == 'udp':
+            udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            address = (parsed.hostname, parsed.port)
+            return (lambda packet: udp_socket.sendto(packet, address)), udp_socket.close
+        elif parsed.scheme == 'tcp':
+            tcp_socket = socket.create_connection((parsed.hostname, parsed.port))
+            return tcp_socket.sendall, tcp_socket.close
+        elif parsed.scheme == 'pipe':
+            if not os.path.exists(parsed.path):
+                os.mkfifo(parsed.path)
+            pipe = open(parsed.path, 'wb', buffering=0)
+            return pipe.write, pipe.close
+        else:
+            raise ValueError(f"Unsupported target: {target}, use udp://, tcp:// or pipe://")
+
+    def _packet_time_ms(self, packet: bytes) -> float:
+        primary_header = self.framer.parse_primary_header(packet)
+        if primary_header['sec_hdr_flag'] != 1:
+            return np.nan
+        week = int.from_bytes(packet[6:10], 'big')
+        ms = int.from_bytes(packet[10:14], 'big')
+        return week*7*86400000 + ms
+
+def format_report(sent_packets: int, sent_bytes: int, elapsed: float) -> str:
+    packets_per_second = sent_packets/elapsed if elapsed > 0 else 0.0
+    bytes_per_second = sent_bytes/elapsed if elapsed > 0 else 0.0
+    return f"Sent {sent_packets} packets in {elapsed:.2f} s ({packets_per_second:.1f} packets/s, {bytes_per_second/1024:.1f} KiB/s)"
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay telemetry dumps as live packets.')
+    parser.add_argument('files', nargs='+', help='Dump files inside the telemetry folder')
+    parser.add_argument('--target', type=str, default='udp://127.0.0.1:9000', help='udp://host:port, tcp://host:port or pipe:///path')
+    parser.add_argument('--rate', type=str, default='1', help="Replay speed factor (1, 10, ...) or 'max'")
+    parser.add_argument('--restamp', action='store_true', help='Replace the secondary header with the emission time')
+    parser.add_argument('--loops', type=int, default=1, help='Number of times to replay the files')
+    parser.add_argument('--folder', type=str, default=TELEMETRY_FOLDER_PATH, help='Telemetry folder')
+    args = parser.parse_args()
+
+    replayer = DumpReplayer(args.folder)
+    packets = replayer.load_packets(args.files)
+    rate = None if args.rate == 'max' else float(args.rate)
+    report = replayer.replay(packets, args.target, rate, args.restamp, args.loops,
+                             progress_callback=lambda sent_packets, sent_bytes, elapsed: print(format_report(sent_packets, sent_bytes, elapsed)))
+    print(format_report(report["packets"], report["bytes"], report["seconds"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,9 @@
 import os
 import shutil
-import pandas as pd
-import ezodf
 
 class FileRepository:
+    """Files of a folder. Listing and reading raw files needs nothing else, pandas and the .ods reader/writer are
+    only imported by the methods that use them (the dashboard lists the folders at startup)."""
     def __init__(self, folder_path):
         self.folder_path = folder_path
         if not os.path.exists(folder_path):
@@ -15,28 +15,41 @@ class FileRepository:
     
     def read_ods_document_by_sheet(self, file_name, sheet_name):
         """reads specific sheet from document."""
-        ods = self.read_ods(file_name)
-        sheet = ods.sheets[sheet_name]
-        
-        data = []
-        for row in sheet.rows():
-            data_row = [cell.value for cell in row]
-            data.append(data_row)
-        
-        df = pd.DataFrame(data)
-        return df
+        sheets = self.read_ods_sheets(file_name, sheet_names=[sheet_name])
+        assert sheet_name in sheets, f"Sheet {sheet_name} not found in {file_name}!"
+
+        return sheets[sheet_name]
+
+    def read_ods_sheets(self, file_name: str, sheet_names: list[str] | None = None, starts_with: str | None = None) -> 'dict[str, pd.DataFrame]':
+        """Reads several sheets (by name and/or first characters) in a single pass over the document."""
+        import pandas as pd
+        from space_packets_pkg.OdsSheetReader import OdsSheetReader
+
+        file_path = self.get_ods_file_path(file_name)
+        sheets = OdsSheetReader().read_sheets(file_path, sheet_names, starts_with)
+
+        return {sheet_name: pd.DataFrame(data) for sheet_name, data in sheets.items()}
     
     def get_specific_sheet_names_from_ods_document(self, file_name: str, starts_with: str) -> list:
         """Filter the sheets based on the first characters."""
-        ods = self.read_ods(file_name)
-        sheets = [name for name in ods.sheets.names() if name.startswith(starts_with)]
+        from space_packets_pkg.OdsSheetReader import OdsSheetReader
+
+        file_path = self.get_ods_file_path(file_name)
+        sheets = [name for name in OdsSheetReader().get_sheet_names(file_path) if name.startswith(starts_with)]
 
         return sheets
     
-    def read_ods(self, file_name: str):
+    def get_ods_file_path(self, file_name: str) -> str:
         _, ext = os.path.splitext(file_name)
         assert ext == '.ods', "File must be of extension '.ods'!"
-        file_path = self.get_file_path_from_file_name(file_name)
+        return self.get_file_path_from_file_name(file_name)
+
+    def read_ods(self, file_name: str):
+        """Opens the document with ezodf, only needed to work with its object model (the sheets are read with
+        read_ods_sheets)."""
+        import ezodf  # imported here, nothing else needs it
+
+        file_path = self.get_ods_file_path(file_name)
         ods_file = ezodf.opendoc(file_path)
 
         return ods_file
@@ -73,7 +86,8 @@ class FileRepository:
         _, ext = os.path.splitext(file_name)
         
         if ext == '.ods':
-            raise NotImplementedError("Writing to .ods files is not implemented.")
+            from space_packets_pkg.OdsSheetWriter import OdsSheetWriter
+            OdsSheetWriter(file_path).write_df(content)
         elif ext == '.csv':
             content.to_csv(file_path, index=False)
         elif ext in ['.xlsx', '.xls']:
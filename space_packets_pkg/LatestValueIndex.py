@@ -0,0 +1,132 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+class LatestValueIndex:
+    """This class keeps the last received value of each (apid, field), so the "last values" of the telemetry
+    can be queried without going through all the decoded packets again. A value is only replaced by a newer one
+    (by packet time), so packets can be fed in any order. The index is updated by the live ingest thread while the
+    dashboard reads it, every access goes through a lock and the readers work on a copy of the items.
+    """
+    latest_values: dict[tuple[str, str], tuple[pd.Timestamp, object]]
+
+    def __init__(self) -> None:
+        self.latest_values = {}
+        self.lock = threading.RLock()
+
+    def __getstate__(self) -> dict:
+        with self.lock:
+            return {"latest_values": dict(self.latest_values)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.latest_values = state["latest_values"]
+        self.lock = threading.RLock()
+
+    def update(self, apid: str, field: str, time: pd.Timestamp, value) -> None:
+        """Updates a single (apid, field) if the time given is not older than the one stored."""
+        key = (apid, field)
+        with self.lock:
+            current = self.latest_values.get(key)
+            if current is None or pd.isna(current[0]) or time >= current[0]:
+                self.latest_values[key] = (time, value)
+
+    def update_from_packet(self, apid: str, time: pd.Timestamp, values: dict) -> None:
+        """Updates all the fields of a single decoded packet, given as {field: value}."""
+        with self.lock:
+            for field, value in values.items():
+                if not self._is_missing(value):
+                    self.update(apid, field, time, value)
+
+    def update_from_apid_df(self, apid: str, fields_apid_df: pd.DataFrame) -> None:
+        """Updates the index from the df of get_specific_apid_df_from_telemetry_df (time indexed or with the
+        'secondary_header' column, one field per column). The last valid row of every column is found at once,
+        so only one update per field is made."""
+        if fields_apid_df.empty:
+            return
+
+        if 'secondary_header' in fields_apid_df.columns:
+            times = pd.to_datetime(fields_apid_df['secondary_header'])
+            fields_apid_df = fields_apid_df.drop(columns=['secondary_header']).set_axis(times, axis=0)
+
+        fields_apid_df = fields_apid_df.sort_index(kind='stable')
+        valid_mask = fields_apid_df.notna().to_numpy()
+        has_valid = valid_mask.any(axis=0)
+        last_rows = len(valid_mask) - 1 - valid_mask[::-1].argmax(axis=0)
+
+        with self.lock:
+            for column_id in np.flatnonzero(has_valid):
+                row = last_rows[column_id]
+                self.update(apid, fields_apid_df.columns[column_id], fields_apid_df.index[row], fields_apid_df.iat[row, column_id])
+
+    def get_snapshot_df(self, apid_fields: dict[str, list[str]] | None = None, include_apid: bool = False) -> pd.DataFrame:
+        """Returns the last values of the fields asked, given as {apid: [fields]} (all of them if None), in the
+        format of the "Last Received Values" table."""
+        with self.lock:
+            latest_values = dict(self.latest_values)
+        if apid_fields is None:
+            apid_fields = self._group_by_apid(latest_values)
+
+        rows = []
+        for apid, fields in apid_fields.items():
+            for field in fields:
+                if (apid, field) in latest_values:
+                    time, value = latest_values[(apid, field)]
+                    rows.append([apid, field, value, time])
+
+        snapshot_df = pd.DataFrame(rows, columns=['APID', 'Fields', 'Last Value', 'Time'])
+        return snapshot_df if include_apid else snapshot_df.drop(columns=['APID'])
+
+    def get_apid_fields(self) -> dict[str, list[str]]:
+        """All the fields in the index, grouped by apid."""
+        with self.lock:
+            latest_values = dict(self.latest_values)
+        return self._group_by_apid(latest_values)
+
+    def _group_by_apid(self, latest_values: dict) -> dict[str, list[str]]:
+        apid_fields = {}
+        for apid, field in latest_values:
+            apid_fields.setdefault(apid, []).append(field)
+
+        return apid_fields
+
+    def to_records(self) -> list[list]:
+        """JSON serializable version of the index, as [apid, field, iso time, value] records."""
+        with self.lock:
+            items = list(self.latest_values.items())
+
+        records = []
+        for (apid, field), (time, value) in items:
+            time_str = None if pd.isna(time) else pd.Timestamp(time).isoformat()
+            records.append([apid, field, time_str, self._to_json_value(value)])
+
+        return records
+
+    def to_current_state_dict(self, apids: list[str] | None = None) -> dict:
+        """The index grouped by apid, {apid: {field: {"time": iso time, "value": value}}}."""
+        current_state = {}
+        for apid, field, time_str, value in self.to_records():
+            if apids is not None and apid not in apids:
+                continue
+            current_state.setdefault(apid, {})[field] = {"time": time_str, "value": value}
+
+        return current_state
+
+    @staticmethod
+    def from_records(records: list[list]) -> 'LatestValueIndex':
+        """Rebuilds the index from to_records output."""
+        latest_value_index = LatestValueIndex()
+        for apid, field, time_str, value in records:
+            latest_value_index.update(apid, field, pd.Timestamp(time_str), value)
+
+        return latest_value_index
+
+    def _to_json_value(self, value):
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        if self._is_missing(value):
+            return None
+        return value
+
+    def _is_missing(self, value) -> bool:
+        return value is None or (isinstance(value, float) and np.isnan(value))
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+
+LIMIT_SUMMARY_COLUMNS = [
+    'Field',
+    'Nominal Min',
+    'Nominal Max',
+    'Samples',
+    'Below Min',
+    'Above Max',
+    'Violations',
+    'First Violation',
+    'Last Violation'
+]
+
+LIMIT_INTERVAL_COLUMNS = ['Field', 'Start', 'End', 'Samples']
+
+class LimitChecker:
+    """This class checks the decoded telemetry against the nominal ranges of the catalog (nominal_minimum and
+    nominal_maximum of each field). All the checks are done over the whole field matrix at once with numpy, so there
+    is no python loop over the samples.
+    """
+    telemetry_reader: TelemetryDataReader
+
+    def __init__(self) -> None:
+        self.telemetry_reader = TelemetryDataReader()
+
+    def get_nominal_limits_df(self, apid: str, main_dd_df: pd.DataFrame) -> pd.DataFrame:
+        """Returns a df indexed by the column names used in get_specific_apid_df_from_telemetry_df with the
+        nominal minimum and maximum of each field. Only fields with at least one numeric limit are returned, a missing
+        limit is NaN."""
+        apid_linked_dd = main_dd_df.query(f"""apid == '{apid}'""")['data_packets'].item()
+        column_names = self.telemetry_reader.get_field_column_names(apid_linked_dd)
+
+        limits = {}
+        for column_name, field_data in zip(column_names, apid_linked_dd):
+            if column_name is None:
+                continue
+            nominal_min = self._limit_to_float(field_data['nominal_minimum'])
+            nominal_max = self._limit_to_float(field_data['nominal_maximum'])
+            if not (np.isnan(nominal_min) and np.isnan(nominal_max)):
+                limits[column_name] = (nominal_min, nominal_max)
+
+        limits_df = pd.DataFrame.from_dict(limits, orient='index', columns=['nominal_minimum', 'nominal_maximum'])
+        return limits_df.astype(float)
+
+    def check_limits(self, fields_df: pd.DataFrame, limits_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Checks every sample of the fields_df (time indexed, one field per column) that has a nominal range in
+        limits_df. Returns the summary df (one row per field, see LIMIT_SUMMARY_COLUMNS) and the intervals df
+        (one row per contiguous run of violations, see LIMIT_INTERVAL_COLUMNS)."""
+        fields = [field for field in fields_df.columns if field in limits_df.index]
+        if len(fields) == 0 or fields_df.empty:
+            return pd.DataFrame(columns=LIMIT_SUMMARY_COLUMNS), pd.DataFrame(columns=LIMIT_INTERVAL_COLUMNS)
+
+        values = np.column_stack([pd.to_numeric(fields_df[field], errors='coerce').to_numpy(dtype=float) for field in fields])
+        minimums = limits_df.loc[fields, 'nominal_minimum'].to_numpy(dtype=float)
+        maximums = limits_df.loc[fields, 'nominal_maximum'].to_numpy(dtype=float)
+        times = fields_df.index.to_numpy()
+
+        # Comparisons against NaN are False, so missing samples and missing limits never count as violations.
+        with np.errstate(invalid='ignore'):
+            below = values < minimums
+            above = values > maximums
+        violations = below | above
+
+        violation_counts = violations.sum(axis=0)
+        has_violation = violation_counts > 0
+        first_rows = violations.argmax(axis=0)
+        last_rows = len(violations) - 1 - violations[::-1].argmax(axis=0)
+
+        summary_df = pd.DataFrame({
+            'Field': fields,
+            'Nominal Min': minimums,
+            'Nominal Max': maximums,
+            'Samples': (~np.isnan(values)).sum(axis=0),
+            'Below Min': below.sum(axis=0),
+            'Above Max': above.sum(axis=0),
+            'Violations': violation_counts,
+            'First Violation': pd.Series(times[first_rows]).where(has_violation),
+            'Last Violation': pd.Series(times[last_rows]).where(has_violation),
+        })
+
+        intervals_df = self.get_violation_intervals_df(violations, fields, times)
+        return summary_df, intervals_df
+
+    def get_violation_intervals_df(self, violations: np.ndarray, fields: list[str], times: np.ndarray) -> pd.DataFrame:
+        """Given the boolean violation matrix (samples x fields), finds the contiguous runs of violations of each field
+        by looking for the rising and falling edges of the matrix."""
+        padding = np.zeros((1, violations.shape[1]), dtype=np.int8)
+        edges = np.diff(np.vstack([padding, violations.astype(np.int8), padding]), axis=0)
+
+        # Transposing makes nonzero return the edges ordered by field and then by row, so starts and ends pair up.
+        start_fields, start_rows = np.nonzero(edges.T == 1)
+        _, end_rows = np.nonzero(edges.T == -1)
+
+        intervals_df = pd.DataFrame({
+            'Field': np.asarray(fields, dtype=object)[start_fields],
+            'Start': times[start_rows],
+            'End': times[end_rows - 1],
+            'Samples': end_rows - start_rows,
+        }, columns=LIMIT_INTERVAL_COLUMNS)
+        return intervals_df
+
+    def get_limits_dict(self, limits_df: pd.DataFrame) -> dict:
+        """Turns the limits df into a {column_name: (minimum, maximum)} dict with None for the missing limits,
+        which is the format used by the dashboard tables."""
+        limits_dict = {}
+        for column_name, row in limits_df.iterrows():
+            nominal_min = None if np.isnan(row['nominal_minimum']) else float(row['nominal_minimum'])
+            nominal_max = None if np.isnan(row['nominal_maximum']) else float(row['nominal_maximum'])
+            limits_dict[column_name] = (nominal_min, nominal_max)
+
+        return limits_dict
+
+    def _limit_to_float(self, limit) -> float:
+        try:
+            return float(limit)
+        except (TypeError, ValueError):
+            return np.nan
@@ -0,0 +1,335 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.ApidDecoderPlan import ApidDecoderPlan
+from space_packets_pkg.ApidRingBuffer import ApidRingBuffer
+from space_packets_pkg.CatalogVersionRegistry import CatalogVersionRegistry
+from space_packets_pkg.DataConverter import DataConverter
+from space_packets_pkg.LatestValueIndex import LatestValueIndex
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.PacketDeduplicator import PacketDeduplicator
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable, TypedTelemetryStore
+
+DEFAULT_BUFFER_CAPACITY = 50_000
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_BATCH_SIZE = 2_000
+DEFAULT_MAX_PENDING_PACKETS = 100_000
+SOCKET_READ_BYTES = 65536
+
+class _UdpIngestProtocol(asyncio.DatagramProtocol):
+    """Each datagram holds one or more whole packets."""
+
+    def __init__(self, ingest: 'LiveTelemetryIngest') -> None:
+        self.ingest = ingest
+        self.framer = ingest.new_framer()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.ingest.ingest_bytes(data, self.framer.frame_bytes(data))
+
+
+class LiveTelemetryIngest:
+    """This class is an asyncio service that receives CCSDS space packets over TCP, UDP and/or a named pipe, frames them, decodes them
+    in batches per apid with the catalog (ApidDecoderPlan) and keeps the recent decoded rows of each apid in a fixed
+    capacity ApidRingBuffer. Rows older than 'retention' (or pushed out by newer ones) are moved to the
+    'history_store' when one is given, otherwise they are discarded. The latest value of every field is also kept in a LatestValueIndex, which is what the dashboard polls.
+    The latency of each batch (decode time minus packet time) is kept in the stats, which is the end-to-end latency
+    when the packets are restamped at emission by the DumpReplayer.
+
+    Packets are decoded every 'flush_interval' seconds (or as soon as 'batch_size' packets are waiting), so the cost of
+    decoding is paid per batch and not per packet. If decoding falls behind, the oldest waiting packets are dropped
+    once there are more than 'max_pending_packets', so memory stays bounded. The checksum of the waiting packets is
+    checked per apid batch before decoding, bad packets are counted in the stats and dropped (or only counted). With a
+    PacketDeduplicator the packets already received (e.g. overlapping passes) are dropped before decoding too. With a
+    CatalogVersionRegistry each packet is decoded with the catalog version in force at its time. 'derived_columns'
+    adds the norm/Euler angle columns of the quaternion and vector fields (see ApidDecoderPlan).
+
+    All the framing, joining and decoding runs on the event loop thread: the named pipe is read on its own thread
+    but its bytes are handed to the loop with call_soon_threadsafe. The lock only guards what the dashboard threads
+    read (the buffers and the stats).
+    """
+    main_dd_df: pd.DataFrame
+    latest_values: LatestValueIndex
+    buffers: dict[str, ApidRingBuffer]
+    history_store: TypedTelemetryStore | None
+    decoder_plans: dict[str, ApidDecoderPlan | None]
+    stats: dict
+
+    def __init__(
+            self,
+            main_dd_df: pd.DataFrame,
+            latest_values: LatestValueIndex | None = None,
+            buffer_capacity: int = DEFAULT_BUFFER_CAPACITY,
+            flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            max_pending_packets: int = DEFAULT_MAX_PENDING_PACKETS,
+            retention: np.timedelta64 | None = None,
+            history_store: TypedTelemetryStore | None = None,
+            check_checksums: bool = True,
+            drop_bad_checksums: bool = True,
+            main_tm_df: pd.DataFrame | None = None,
+            deduplicator: PacketDeduplicator | None = None,
+            catalog_versions: CatalogVersionRegistry | None = None,
+            derived_columns: tuple[str, ...] = ()
+        ) -> None:
+        self.main_dd_df = main_dd_df
+        self.latest_values = LatestValueIndex() if latest_values is None else latest_values
+        self.buffer_capacity = buffer_capacity
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending_packets = max_pending_packets
+        self.retention = retention
+        self.history_store = history_store
+        self.check_checksums = check_checksums
+        self.drop_bad_checksums = drop_bad_checksums
+        self.main_tm_df = main_tm_df
+        self.deduplicator = deduplicator
+        self.catalog_versions = catalog_versions
+        self.derived_columns = tuple(derived_columns)
+
+        self.framer = SpacePacketFramer()
+        self.data_converter = DataConverter()
+        self.packet_checksum = PacketChecksum()
+        self.buffers = {}
+        self.decoder_plans = {}
+        self.pending_packets = {}
+        self.pending_count = 0
+        self.lock = threading.Lock()
+        self.stats = {
+            "packets_received": 0,
+            "bytes_received": 0,
+            "packets_decoded": 0,
+            "packets_dropped": 0,
+            "unknown_apid_packets": 0,
+            "checksum_errors": 0,
+            "checksum_errors_per_apid": {},
+            "packets_per_apid": {},
+            "decode_seconds": 0.0,
+            "latency_mean_seconds": None,
+            "latency_max_seconds": None,
+            "started_at": time.time(),
+        }
+
+    async def serve(self, host: str = '127.0.0.1', tcp_port: int | None = None, udp_port: int | None = None, pipe_path: str | None = None) -> None:
+        """Starts the listeners asked and decodes the received packets until cancelled."""
+        assert any(source is not None for source in [tcp_port, udp_port, pipe_path]), "At least one of tcp_port, udp_port or pipe_path must be given!"
+        loop = asyncio.get_running_loop()
+
+        tcp_server = None
+        udp_transport = None
+        if tcp_port is not None:
+            tcp_server = await asyncio.start_server(self._handle_tcp_connection, host, tcp_port)
+            print(f"Live telemetry listening on tcp://{host}:{tcp_port}")
+        if udp_port is not None:
+            udp_transport, _ = await loop.create_datagram_endpoint(lambda: _UdpIngestProtocol(self), local_addr=(host, udp_port))
+            print(f"Live telemetry listening on udp://{host}:{udp_port}")
+        if pipe_path is not None:
+            threading.Thread(target=self._read_pipe, args=(pipe_path, loop), daemon=True, name="live-telemetry-pipe").start()
+            print(f"Live telemetry reading pipe://{pipe_path}")
+
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                self.flush()
+        finally:
+            if tcp_server is not None:
+                tcp_server.close()
+            if udp_transport is not None:
+                udp_transport.close()
+
+    def start_in_background(self, host: str = '127.0.0.1', tcp_port: int | None = None, udp_port: int | None = None, pipe_path: str | None = None) -> threading.Thread:
+        """Runs the service in its own event loop on a daemon thread, so it can live next to the dash server."""
+        thread = threading.Thread(target=asyncio.run, args=(self.serve(host, tcp_port, udp_port, pipe_path),), daemon=True, name="live-telemetry-ingest")
+        thread.start()
+        return thread
+
+    def new_framer(self) -> SpacePacketFramer:
+        """Each connection has its own framer, checking the headers against the TM sheets when they were given."""
+        return SpacePacketFramer(self.main_tm_df)
+
+    async def _handle_tcp_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        framer = self.new_framer()
+        try:
+            while True:
+                data = await reader.read(SOCKET_READ_BYTES)
+                if not data:
+                    break
+                self.ingest_bytes(data, framer.feed(data))
+        finally:
+            writer.close()
+
+    def _read_pipe(self, pipe_path: str, loop: asyncio.AbstractEventLoop) -> None:
+        """Blocking reader of a named pipe, it runs on its own daemon thread and reopens the pipe when the writer closes it.
+        The bytes are framed on the loop thread, with one framer per opening of the pipe."""
+        if not os.path.exists(pipe_path):
+            os.mkfifo(pipe_path)
+
+        while True:
+            framer = self.new_framer()
+            with open(pipe_path, 'rb', buffering=0) as pipe:
+                while True:
+                    data = pipe.read(SOCKET_READ_BYTES)
+                    if not data:
+                        break
+                    loop.call_soon_threadsafe(self._ingest_stream_bytes, framer, data)
+
+    def _ingest_stream_bytes(self, framer: SpacePacketFramer, data: bytes) -> None:
+        self.ingest_bytes(data, framer.feed(data))
+
+    def ingest_bytes(self, data: bytes, packets: list[bytes]) -> None:
+        """Queues the packets framed from the bytes received, decoding right away when a full batch is waiting."""
+        with self.lock:
+            self.stats["bytes_received"] += len(data)
+        for packet in packets:
+            self.ingest_packet(packet)
+
+        if self.pending_count >= self.batch_size:
+            self.flush()
+
+    def ingest_packet(self, packet: bytes) -> None:
+        """Queues a single packet for decoding, only the apid is read here. The checksum and the segments are handled
+        in flush, for all the waiting packets of an apid at once."""
+        apid = hex(int.from_bytes(packet[0:2], 'big') & 0x7FF)
+
+        with self.lock:
+            self.stats["packets_received"] += 1
+            if apid not in self.pending_packets:
+                self.pending_packets[apid] = deque()
+            self.pending_packets[apid].append(packet)
+            self.pending_count += 1
+            if self.pending_count > self.max_pending_packets:
+                self._drop_oldest_pending()
+
+    def _drop_oldest_pending(self) -> None:
+        largest_apid = max(self.pending_packets, key=lambda apid: len(self.pending_packets[apid]))
+        self.pending_packets[largest_apid].popleft()
+        self.pending_count -= 1
+        self.stats["packets_dropped"] += 1
+
+    def flush(self) -> None:
+        """Decodes all the waiting packets, one batch per apid."""
+        with self.lock:
+            pending_packets = self.pending_packets
+            self.pending_packets = {}
+            self.pending_count = 0
+
+        start = time.perf_counter()
+        latencies = []
+        for apid, packets in pending_packets.items():
+            packets = list(packets)
+            if self.check_checksums:
+                packets = self.validate_checksums(apid, packets)
+            if self.deduplicator is not None:
+                packets = self.deduplicator.filter_packets(packets)
+            packets = [self.framer.join_segment(apid, *self._split_for_join(packet)) for packet in packets]
+            packets = [packet for packet in packets if packet is not None]
+            if len(packets) == 0:
+                continue
+
+            times = self.data_converter.secondary_headers_to_datetime64([secondary_header for secondary_header, _ in packets])
+            apid_table = self.decode_packets(apid, [data for _, data in packets], times)
+            if apid_table is None:
+                with self.lock:
+                    self.stats["unknown_apid_packets"] += len(packets)
+                continue
+
+            with self.lock:
+                if apid not in self.buffers:
+                    spill_callback = self.history_store.add_apid_table if self.history_store is not None else None
+                    self.buffers[apid] = ApidRingBuffer(apid, self.buffer_capacity, spill_callback)
+                self.buffers[apid].append_table(apid_table)
+                if self.retention is not None:
+                    self.buffers[apid].evict_older_than(times.max() - self.retention)
+                self.stats["packets_decoded"] += len(packets)
+                self.stats["packets_per_apid"][apid] = self.stats["packets_per_apid"].get(apid, 0) + len(packets)
+            self.latest_values.update_from_apid_df(apid, apid_table.to_dataframe())
+            latencies.append(self.get_latencies_seconds(times))
+
+        latencies = np.concatenate(latencies) if len(latencies) > 0 else np.array([])
+        latencies = latencies[~np.isnan(latencies)]
+        with self.lock:
+            self.stats["decode_seconds"] += time.perf_counter() - start
+            if len(latencies) > 0:
+                self.stats["latency_mean_seconds"] = float(latencies.mean())
+                self.stats["latency_max_seconds"] = float(latencies.max())
+
+    def validate_checksums(self, apid: str, packets: list[bytes]) -> list[bytes]:
+        """Checks the CRC-16 of a batch of packets of the apid at once and counts the bad ones. The bad packets are
+        removed when drop_bad_checksums is True, otherwise they are only counted and still decoded."""
+        valid = self.packet_checksum.validate_packets(packets)
+        bad_packets = len(packets) - int(valid.sum())
+        if bad_packets == 0:
+            return packets
+
+        with self.lock:
+            self.stats["checksum_errors"] += bad_packets
+            self.stats["checksum_errors_per_apid"][apid] = self.stats["checksum_errors_per_apid"].get(apid, 0) + bad_packets
+        if not self.drop_bad_checksums:
+            return packets
+        return [packet for packet, is_valid in zip(packets, valid) if is_valid]
+
+    def _split_for_join(self, packet: bytes) -> tuple[int, bytes, bytes]:
+        primary_header, secondary_header, data, _ = self.framer.split_packet(packet)
+        return primary_header['seq_flags'], secondary_header, data
+
+    def get_latencies_seconds(self, times: np.ndarray) -> np.ndarray:
+        """Seconds from the packet times to now (UTC, as the secondary header is read without time zone)."""
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), 'ns')
+        latencies = (now - times)/np.timedelta64(1, 's')
+        return np.asarray(latencies, dtype=float)
+
+    def decode_packets(self, apid: str, data_list: list[bytes], times: np.ndarray) -> TypedApidTable | None:
+        """Decodes with the catalog version of each packet time when catalog versions were given, otherwise with the
+        main_dd_df. None if the apid is not in the catalog."""
+        if self.catalog_versions is not None:
+            return self.catalog_versions.decode_packets(apid, data_list, times)
+
+        decoder_plan = self.get_decoder_plan(apid)
+        if decoder_plan is None:
+            return None
+        return decoder_plan.decode_packets(data_list, times)
+
+    def get_decoder_plan(self, apid: str) -> ApidDecoderPlan | None:
+        """The plan of each apid is compiled on the first packet of that apid, None if the apid is not in the catalog."""
+        if apid not in self.decoder_plans:
+            apid_dd_df = self.main_dd_df.query(f"""apid == '{apid}'""")
+            if apid_dd_df.empty:
+                print(f"This apid: {apid} needs to be added to catalog!")
+                self.decoder_plans[apid] = None
+            else:
+                self.decoder_plans[apid] = ApidDecoderPlan(apid, apid_dd_df['data_packets'].item(), self.derived_columns)
+
+        return self.decoder_plans[apid]
+
+    def get_apids(self) -> list[str]:
+        with self.lock:
+            return list(self.buffers.keys())
+
+    def get_apid_df(self, apid: str, start_time: np.datetime64 | None = None, end_time: np.datetime64 | None = None) -> pd.DataFrame:
+        """Recent decoded rows of the apid in the shape of get_specific_apid_df_from_telemetry_df, optionally only
+        the rows between start_time and end_time."""
+        with self.lock:
+            if apid not in self.buffers:
+                return pd.DataFrame()
+            return self.buffers[apid].to_dataframe(start_time=start_time, end_time=end_time)
+
+    def get_stats(self) -> dict:
+        """Counters of the service plus the average rate since it started."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["packets_per_apid"] = dict(self.stats["packets_per_apid"])
+            stats["checksum_errors_per_apid"] = dict(self.stats["checksum_errors_per_apid"])
+        if self.deduplicator is not None:
+            deduplicator_report = self.deduplicator.get_report()
+            stats["duplicate_packets"] = deduplicator_report["duplicate_packets"]
+            stats["duplicates_per_apid"] = deduplicator_report["duplicates_per_apid"]
+        elapsed = time.time() - self.stats["started_at"]
+        stats["packets_per_second"] = stats["packets_received"]/elapsed if elapsed > 0 else 0.0
+        return stats
@@ -0,0 +1,152 @@
+import zipfile
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+TABLE_TAG = f"{{{TABLE_NS}}}table"
+ROW_TAG = f"{{{TABLE_NS}}}table-row"
+CELL_TAGS = (f"{{{TABLE_NS}}}table-cell", f"{{{TABLE_NS}}}covered-table-cell")
+PARAGRAPH_TAGS = (f"{{{TEXT_NS}}}p", f"{{{TEXT_NS}}}h")
+SPACES_TAG = f"{{{TEXT_NS}}}s"
+TAB_TAG = f"{{{TEXT_NS}}}tab"
+LINE_BREAK_TAG = f"{{{TEXT_NS}}}line-break"
+SOFT_PAGE_BREAK_TAG = f"{{{TEXT_NS}}}soft-page-break"
+
+TABLE_NAME = f"{{{TABLE_NS}}}name"
+ROWS_REPEATED = f"{{{TABLE_NS}}}number-rows-repeated"
+COLUMNS_REPEATED = f"{{{TABLE_NS}}}number-columns-repeated"
+VALUE_TYPE = f"{{{OFFICE_NS}}}value-type"
+NUMERIC_VALUE_TYPES = ('float', 'percentage', 'currency')
+VALUE_ATTRIBUTES = {
+    'float': f"{{{OFFICE_NS}}}value",
+    'percentage': f"{{{OFFICE_NS}}}value",
+    'currency': f"{{{OFFICE_NS}}}value",
+    'date': f"{{{OFFICE_NS}}}date-value",
+    'time': f"{{{OFFICE_NS}}}time-value",
+    'boolean': f"{{{OFFICE_NS}}}boolean-value",
+}
+
+class OdsSheetReader:
+    """This class reads the sheets of an .ods document straight from its content.xml, parsed incrementally: each row
+    is converted to values when it ends and then freed, and the rows of the sheets not asked for are only skipped.
+
+    The cell values are the same as ezodf's 'cell.value' (float for numbers, the paragraphs text for strings, None for
+    empty cells). Repeated rows and cells are expanded, except the empty ones at the end of a row or of a sheet
+    (the padding that spreadsheet programs add up to the last column/row of the grid), so the arrays stop at the
+    last used row and column.
+    """
+
+    def get_sheet_names(self, file_path: str) -> list[str]:
+        """Names of the sheets in document order."""
+        sheet_names = []
+        with zipfile.ZipFile(file_path) as ods_zip, ods_zip.open('content.xml') as content:
+            for event, element in ElementTree.iterparse(content, events=('start', 'end')):
+                if element.tag == TABLE_TAG and element.get(TABLE_NAME) not in sheet_names:
+                    sheet_names.append(element.get(TABLE_NAME))
+                elif element.tag == ROW_TAG and event == 'end':
+                    element.clear()
+
+        return sheet_names
+
+    def read_sheets(self, file_path: str, sheet_names: list[str] | None = None, starts_with: str | None = None) -> dict[str, np.ndarray]:
+        """2D object arrays of the sheets asked for (by name and/or name prefix, all of them if neither is given),
+        in document order."""
+        def is_wanted(sheet_name: str) -> bool:
+            if sheet_names is None and starts_with is None:
+                return True
+            return (sheet_names is not None and sheet_name in sheet_names) or (starts_with is not None and sheet_name.startswith(starts_with))
+
+        sheets = {}
+        sheet_name = None
+        rows = []
+        pending_empty_rows = 0
+        with zipfile.ZipFile(file_path) as ods_zip, ods_zip.open('content.xml') as content:
+            for event, element in ElementTree.iterparse(content, events=('start', 'end')):
+                if element.tag == TABLE_TAG:
+                    if event == 'start':
+                        sheet_name = element.get(TABLE_NAME) if is_wanted(element.get(TABLE_NAME)) else None
+                        rows = []
+                        pending_empty_rows = 0
+                    else:
+                        if sheet_name is not None:
+                            sheets[sheet_name] = self.rows_to_array(rows)
+                        sheet_name = None
+                        element.clear()
+
+                elif element.tag == ROW_TAG and event == 'end':
+                    if sheet_name is not None:
+                        row = self.read_row(element)
+                        repeat = int(element.get(ROWS_REPEATED, 1))
+                        if len(row) == 0:
+                            pending_empty_rows += repeat
+                        else:
+                            rows.extend([[]] * pending_empty_rows)
+                            rows.extend([row] * repeat)
+                            pending_empty_rows = 0
+                    element.clear()
+
+        return sheets
+
+    def read_row(self, row_element) -> list:
+        """Values of a row without its trailing empty cells."""
+        values = []
+        pending_empty_cells = 0
+        for cell in row_element:
+            if cell.tag not in CELL_TAGS:
+                continue
+            repeat = int(cell.get(COLUMNS_REPEATED, 1))
+            value = self.cell_value(cell)
+            if value is None:
+                pending_empty_cells += repeat
+                continue
+            values.extend([None] * pending_empty_cells)
+            values.extend([value] * repeat)
+            pending_empty_cells = 0
+
+        return values
+
+    def cell_value(self, cell):
+        value_type = cell.get(VALUE_TYPE)
+        if value_type is None:
+            return None
+        elif value_type == 'string':
+            return "\n".join(self.element_text(child) for child in cell if child.tag in PARAGRAPH_TAGS)
+
+        value = cell.get(VALUE_ATTRIBUTES.get(value_type, ''))
+        if value is None:
+            return None
+        elif value_type in NUMERIC_VALUE_TYPES:
+            return float(value)
+        elif value_type == 'boolean':
+            return value == 'true'
+        return value
+
+    def element_text(self, element) -> str:
+        """Plain text of a paragraph (or span, link...) with the ODF whitespace elements decoded."""
+        if element.tag == SPACES_TAG:
+            return ' ' * int(element.get(f"{{{TEXT_NS}}}c", 1))
+        elif element.tag == TAB_TAG:
+            return '\t'
+        elif element.tag == LINE_BREAK_TAG:
+            return '\n'
+        elif element.tag == SOFT_PAGE_BREAK_TAG:
+            return ''
+
+        text = [element.text]
+        for child in element:
+            text.append(self.element_text(child))
+            text.append(child.tail)
+        return "".join(filter(None, text))
+
+    def rows_to_array(self, rows: list[list]) -> np.ndarray:
+        """Rectangular object array, the short rows are padded with None."""
+        n_columns = max((len(row) for row in rows), default=0)
+        array = np.full((len(rows), n_columns), None, dtype=object)
+        for i, row in enumerate(rows):
+            array[i, :len(row)] = row
+
+        return array
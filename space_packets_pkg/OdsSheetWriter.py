@@ -0,0 +1,106 @@
+import math
+import numbers
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+
+ODS_MIMETYPE = "application/vnd.oasis.opendocument.spreadsheet"
+
+MANIFEST_XML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">
+ <manifest:file-entry manifest:full-path="/" manifest:media-type="{ODS_MIMETYPE}"/>
+ <manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>
+</manifest:manifest>
+"""
+
+CONTENT_XML_BEGIN = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">
+<office:body><office:spreadsheet>
+"""
+CONTENT_XML_END = "</office:spreadsheet></office:body></office:document-content>\n"
+
+class OdsSheetWriter:
+    """This class writes an .ods document one block of rows at a time, the counterpart of OdsSheetReader: content.xml
+    is compressed into the document as the rows arrive, so a table never has to be held in memory as a whole.
+
+    Numbers are written as float cells, datetimes as date cells, booleans as boolean cells, missing values as empty
+    cells and anything else (strings, vectors) as its text. Usage: open, then write_header/write_rows for each sheet
+    (start_sheet begins a new one), then close.
+    """
+    file_path: str
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.ods_zip = None
+        self.content = None
+        self.sheet_open = False
+
+    def open(self) -> None:
+        self.ods_zip = zipfile.ZipFile(self.file_path, 'w')
+        self.ods_zip.writestr(zipfile.ZipInfo('mimetype'), ODS_MIMETYPE, compress_type=zipfile.ZIP_STORED)  # must be first and stored
+        self.ods_zip.writestr('META-INF/manifest.xml', MANIFEST_XML, compress_type=zipfile.ZIP_DEFLATED)
+        content_info = zipfile.ZipInfo('content.xml')
+        content_info.compress_type = zipfile.ZIP_DEFLATED
+        self.content = self.ods_zip.open(content_info, 'w', force_zip64=True)
+        self._write(CONTENT_XML_BEGIN)
+
+    def start_sheet(self, sheet_name: str) -> None:
+        if self.sheet_open:
+            self._write("</table:table>\n")
+        self._write(f"<table:table table:name={quoteattr(sheet_name)}>\n")
+        self.sheet_open = True
+
+    def write_header(self, columns: list[str]) -> None:
+        self._write(self.row_xml(columns))
+
+    def write_rows(self, df: pd.DataFrame) -> None:
+        """Rows of the df (without its index) in the current sheet."""
+        self._write("".join(self.row_xml(row) for row in df.itertuples(index=False, name=None)))
+
+    def close(self) -> None:
+        if self.sheet_open:
+            self._write("</table:table>\n")
+            self.sheet_open = False
+        self._write(CONTENT_XML_END)
+        self.content.close()
+        self.ods_zip.close()
+
+    def write_df(self, df: pd.DataFrame, sheet_name: str = 'Sheet1') -> None:
+        """Whole document with the df (header and rows) in one sheet."""
+        self.open()
+        try:
+            self.start_sheet(sheet_name)
+            self.write_header([str(column) for column in df.columns])
+            self.write_rows(df)
+        finally:
+            self.close()
+
+    def row_xml(self, values) -> str:
+        return "<table:table-row>" + "".join(self.cell_xml(value) for value in values) + "</table:table-row>\n"
+
+    def cell_xml(self, value) -> str:
+        if value is None or value is pd.NaT or value is pd.NA:
+            return "<table:table-cell/>"
+        elif isinstance(value, (bool, np.bool_)):
+            return f'<table:table-cell office:value-type="boolean" office:boolean-value="{str(bool(value)).lower()}"/>'
+        elif isinstance(value, numbers.Integral):
+            return f'<table:table-cell office:value-type="float" office:value="{int(value)}"/>'
+        elif isinstance(value, numbers.Real):
+            if not math.isfinite(value):  # NaN and inf of any float type (np.float32 is not a float), ODS has no value for them
+                return "<table:table-cell/>"
+            return f'<table:table-cell office:value-type="float" office:value="{float(value)!r}"/>'
+        elif isinstance(value, (pd.Timestamp, np.datetime64)):
+            timestamp = pd.Timestamp(value)
+            if timestamp is pd.NaT:
+                return "<table:table-cell/>"
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.tz_convert(None)
+            return f'<table:table-cell office:value-type="date" office:date-value="{timestamp.isoformat()}"/>'
+
+        text = value if isinstance(value, str) else (str(value.tolist()) if isinstance(value, np.ndarray) else str(value))
+        return f'<table:table-cell office:value-type="string"><text:p>{escape(text)}</text:p></table:table-cell>'
+
+    def _write(self, text: str) -> None:
+        self.content.write(text.encode('utf-8'))
@@ -0,0 +1,77 @@
+import numpy as np
+
+CRC16_CCITT_POLYNOMIAL = 0x1021
+CRC16_CCITT_INITIAL_VALUE = 0xFFFF
+
+def _make_crc16_table(polynomial: int) -> list[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+        table.append(crc)
+    return table
+
+CRC16_CCITT_TABLE = _make_crc16_table(CRC16_CCITT_POLYNOMIAL)
+CRC16_CCITT_TABLE_ARRAY = np.array(CRC16_CCITT_TABLE, dtype=np.uint32)
+
+class PacketChecksum:
+    """This class computes the 16-bit checksum of the space packets, a CRC-16-CCITT (polynomial 0x1021, initial
+    value 0xFFFF) over the whole packet except the checksum itself.
+
+    Many packets are checked at once by grouping them by size: each group is a (packets x bytes) matrix and the table
+    lookup runs one byte column at a time for all the packets of the group, so the python loop is over the packet
+    size and not over the number of packets.
+    """
+
+    def crc16(self, data: bytes) -> int:
+        """Table driven CRC-16-CCITT of the bytes given."""
+        crc = CRC16_CCITT_INITIAL_VALUE
+        for byte in data:
+            crc = ((crc << 8) & 0xFFFF) ^ CRC16_CCITT_TABLE[(crc >> 8) ^ byte]
+        return crc
+
+    def with_checksum(self, packet: bytes) -> bytes:
+        """Returns the packet with its last two bytes replaced by the checksum of the rest of it."""
+        return packet[:-2] + self.crc16(packet[:-2]).to_bytes(2, 'big')
+
+    def is_valid(self, packet: bytes) -> bool:
+        return len(packet) > 2 and self.crc16(packet[:-2]) == int.from_bytes(packet[-2:], 'big')
+
+    def validate_packets(self, packets: list[bytes]) -> np.ndarray:
+        """Boolean array telling which packets have a checksum that matches their content."""
+        sizes = np.fromiter((len(packet) for packet in packets), dtype=np.int64, count=len(packets))
+        valid = np.zeros(len(packets), dtype=bool)
+
+        for size in np.unique(sizes):
+            if size <= 2:
+                continue
+            rows = np.flatnonzero(sizes == size)
+            matrix = np.frombuffer(b''.join(packets[i] for i in rows), dtype=np.uint8).reshape(len(rows), size)
+            received = (matrix[:, -2].astype(np.uint32) << 8) | matrix[:, -1]
+            valid[rows] = self.crc16_matrix(matrix[:, :-2]) == received
+
+        return valid
+
+    def crc16_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """CRC-16-CCITT of every row of an uint8 matrix of shape (packets, bytes)."""
+        crc = np.full(matrix.shape[0], CRC16_CCITT_INITIAL_VALUE, dtype=np.uint32)
+        for column in matrix.T:
+            crc = ((crc << 8) & 0xFFFF) ^ CRC16_CCITT_TABLE_ARRAY[(crc >> 8) ^ column]
+        return crc
+
+    def binary_space_packet_to_bytes(self, space_packet: dict) -> bytes:
+        """Rebuilds the bytes of a packet read by TelemetryDataReader.read_binary_str_to_space_packet (a dict of
+        binary strings). A truncated packet gives an empty bytes."""
+        binary_string = ''.join(space_packet.values())
+        if len(binary_string) == 0 or len(binary_string) % 8 != 0:
+            return b''
+        return int(binary_string, 2).to_bytes(len(binary_string)//8, 'big')
+
+    def count_per_apid(self, packets: list[bytes]) -> dict[str, int]:
+        """Number of packets of each apid (as the hex strings used in the dfs)."""
+        counts = {}
+        for packet in packets:
+            apid = hex(int.from_bytes(packet[0:2], 'big') & 0x7FF) if len(packet) >= 2 else None
+            counts[apid] = counts.get(apid, 0) + 1
+        return counts
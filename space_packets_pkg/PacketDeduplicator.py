@@ -0,0 +1,63 @@
+import hashlib
+from collections import OrderedDict
+
+from space_packets_pkg.SpacePacketFramer import PRIMARY_HEADER_BYTES, SECONDARY_HEADER_BYTES
+
+DEFAULT_MAX_KEYS = 500_000
+CONTENT_DIGEST_BYTES = 8
+
+class PacketDeduplicator:
+    """This class removes the packets already seen, as happens when consecutive passes downlink overlapping stored
+    telemetry. A packet is identified by its apid, sequence count and secondary header (the GPS time). Packets
+    without secondary header (segments) have no time, so their whole content is hashed instead.
+
+    The keys are kept in insertion order and only the last 'max_keys' are remembered, so memory stays bounded when
+    many files are streamed through it. Duplicates further apart than that are not detected.
+    """
+    max_keys: int
+    seen_keys: OrderedDict
+    duplicates_per_apid: dict[str, int]
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS) -> None:
+        assert max_keys > 0, "max_keys must be positive!"
+        self.max_keys = max_keys
+        self.seen_keys = OrderedDict()
+        self.duplicates_per_apid = {}
+        self.packets_checked = 0
+        self.forgotten_keys = 0
+
+    def packet_key(self, packet: bytes) -> bytes:
+        """apid (11 bits) and sequence count (14 bits) followed by the secondary header, or by a digest of the packet
+        when it has no secondary header."""
+        key = bytes([packet[0] & 0x07, packet[1], packet[2] & 0x3F, packet[3]])
+        if packet[0] & 0x08:
+            return key + packet[PRIMARY_HEADER_BYTES:(PRIMARY_HEADER_BYTES+SECONDARY_HEADER_BYTES)]
+        return key + hashlib.blake2b(packet, digest_size=CONTENT_DIGEST_BYTES).digest()
+
+    def is_duplicate(self, packet: bytes) -> bool:
+        """Checks the packet against the packets seen and remembers it."""
+        self.packets_checked += 1
+        key = self.packet_key(packet)
+        if key in self.seen_keys:
+            self.seen_keys.move_to_end(key)
+            apid = hex(((packet[0] & 0x07) << 8) | packet[1])
+            self.duplicates_per_apid[apid] = self.duplicates_per_apid.get(apid, 0) + 1
+            return True
+
+        self.seen_keys[key] = None
+        if len(self.seen_keys) > self.max_keys:
+            self.seen_keys.popitem(last=False)
+            self.forgotten_keys += 1
+        return False
+
+    def filter_packets(self, packets: list[bytes]) -> list[bytes]:
+        """Returns the packets not seen before, in order. Duplicates inside the list are removed as well."""
+        return [packet for packet in packets if not self.is_duplicate(packet)]
+
+    def get_report(self) -> dict:
+        return {
+            "packets_checked": self.packets_checked,
+            "duplicate_packets": sum(self.duplicates_per_apid.values()),
+            "duplicates_per_apid": dict(self.duplicates_per_apid),
+            "forgotten_keys": self.forgotten_keys,
+        }
@@ -0,0 +1,277 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.DataConverter import DataConverter
+from space_packets_pkg.PacketChecksum import PacketChecksum
+
+PRIMARY_HEADER_BYTES = 6
+SECONDARY_HEADER_BYTES = 8
+CHECKSUM_BYTES = 2
+MAX_PACKET_BYTES = PRIMARY_HEADER_BYTES + (0xFFFF + 1)
+MIN_PACKET_BYTES = PRIMARY_HEADER_BYTES + CHECKSUM_BYTES
+
+class SpacePacketFramer:
+    """This class splits a byte stream into CCSDS space packets using the packet data length of the primary header.
+    The bytes can be fed in chunks of any size (as they arrive from a socket), an incomplete packet is kept in the
+    buffer until the rest of it arrives.
+
+    The lengths are not trusted blindly: the packets are chained through their headers (version and type 0 and, when
+    the TM sheets of the catalog are given, a known apid) and the checksums of the whole chain are validated at once.
+    A packet is accepted when its checksum, or the one of the packet right after it, matches (a bad checksum with a
+    good next packet is corrupt data, the length was right). Otherwise its length is corrupt: if the TM sheet has a
+    fixed length for the apid and the checksum matches with it, the packet is repaired, if not the framer scans
+    forward for the next valid header confirmed by its checksum. So a corrupt or truncated packet only costs that
+    packet instead of the rest of the dump. 'resync_count', 'skipped_bytes' and 'repaired_packets' count the recoveries.
+    """
+    buffer: bytearray
+    data_converter: DataConverter
+    packet_checksum: PacketChecksum
+    known_apids: set[int] | None
+    expected_data_lengths: dict[int, int | None]
+
+    def __init__(self, main_tm_df: pd.DataFrame | None = None) -> None:
+        self.buffer = bytearray()
+        self.data_converter = DataConverter()
+        self.packet_checksum = PacketChecksum()
+        self.known_apids = None
+        self.expected_data_lengths = {}
+        self.resync_count = 0
+        self.skipped_bytes = 0
+        self.repaired_packets = 0
+        self.segmented_packets = {}
+        if main_tm_df is not None:
+            self.set_catalog(main_tm_df)
+
+    def set_catalog(self, main_tm_df: pd.DataFrame) -> None:
+        """Takes the apids and the packet data lengths of the TM sheets. 'Varies' (or unreadable) lengths are not used."""
+        self.known_apids = set()
+        for apid, pkt_data_length in zip(main_tm_df['apid'], main_tm_df['pkt_data_length']):
+            try:
+                apid = int(apid, 16)
+            except (TypeError, ValueError):
+                continue
+            self.known_apids.add(apid)
+            try:
+                self.expected_data_lengths[apid] = int(pkt_data_length, 16)
+            except (TypeError, ValueError):
+                self.expected_data_lengths[apid] = None
+
+    def feed(self, data: bytes, final: bool = False) -> list[bytes]:
+        """Adds the bytes received to the buffer and returns all the complete packets in it. With final=True no more
+        bytes are expected, so nothing is kept waiting for the rest of a packet."""
+        self.buffer.extend(data)
+
+        packets = []
+        pointer = 0
+        while len(self.buffer) - pointer >= PRIMARY_HEADER_BYTES:
+            chained_packets, stop = self.chain_packets(self.buffer, pointer)
+            if len(chained_packets) == 0:
+                if stop == 'incomplete' and not final:
+                    break
+                pointer = self.resync(self.buffer, pointer + 1, final)
+                continue
+
+            valid = self.packet_checksum.validate_packets(chained_packets)
+            waiting = False
+            for i, packet in enumerate(chained_packets):
+                is_last = i + 1 == len(chained_packets)
+                if valid[i] or (not is_last and valid[i+1]):
+                    packets.append(packet)
+                    pointer += len(packet)
+                    continue
+
+                if is_last and not final and stop in ['incomplete', 'end']:
+                    # Nothing after it yet to tell if the length is right.
+                    waiting = True
+                elif is_last and final and stop == 'end':
+                    packets.append(packet)
+                    pointer += len(packet)
+                else:
+                    repaired_packet = self.repair_length(self.buffer, pointer)
+                    if repaired_packet is not None:
+                        packets.append(repaired_packet)
+                        pointer += len(repaired_packet)
+                    else:
+                        pointer = self.resync(self.buffer, pointer + 1, final)
+                break
+
+            if waiting:
+                break
+
+        if final and len(self.buffer) > pointer:
+            self.skipped_bytes += len(self.buffer) - pointer
+            pointer = len(self.buffer)
+        del self.buffer[:pointer]
+        return packets
+
+    def frame_bytes(self, data: bytes) -> list[bytes]:
+        """Splits a whole dump into packets, trailing bytes that do not make a full packet are ignored."""
+        framer = SpacePacketFramer()
+        framer.known_apids = self.known_apids
+        framer.expected_data_lengths = self.expected_data_lengths
+        packets = framer.feed(data, final=True)
+        self.resync_count += framer.resync_count
+        self.skipped_bytes += framer.skipped_bytes
+        self.repaired_packets += framer.repaired_packets
+        return packets
+
+    def chain_packets(self, data: bytes | bytearray, pointer: int) -> tuple[list[bytes], str]:
+        """Follows the packet lengths from the pointer while the headers are valid and the packets complete. Returns the
+        packets and why it stopped: 'end' (the data ends right after the last packet), 'incomplete' or 'invalid'."""
+        packets = []
+        while True:
+            if pointer == len(data):
+                return packets, 'end'
+            if len(data) - pointer < PRIMARY_HEADER_BYTES:
+                return packets, 'incomplete'
+            if not self.is_valid_header(data, pointer):
+                return packets, 'invalid'
+
+            packet_size = self.get_packet_size(data, pointer)
+            if len(data) - pointer < packet_size:
+                return packets, 'incomplete'
+            packets.append(bytes(data[pointer:(pointer+packet_size)]))
+            pointer += packet_size
+
+    def is_valid_header(self, data: bytes | bytearray, pointer: int = 0) -> bool:
+        """Checks the fields of the primary header that do not change: version 0, telemetry type, a known apid (when
+        the catalog is given) and room for the secondary header and checksum."""
+        first_byte = data[pointer]
+        if first_byte & 0xF0 != 0:
+            return False
+
+        apid = ((first_byte & 0x07) << 8) | data[pointer+1]
+        if self.known_apids is not None and apid not in self.known_apids:
+            return False
+
+        secondary_header_bytes = SECONDARY_HEADER_BYTES if first_byte & 0x08 else 0
+        return self.get_packet_size(data, pointer) >= MIN_PACKET_BYTES + secondary_header_bytes
+
+    def repair_length(self, data: bytes | bytearray, pointer: int) -> bytes | None:
+        """When the TM sheet has a fixed length for the apid of an unsegmented packet and the packet has another length,
+        tries the sheet length: if the checksum matches with it, only the length field was corrupt and the packet is
+        returned with it fixed. None if it can not be repaired."""
+        primary_header = self.parse_primary_header(bytes(data[pointer:(pointer+PRIMARY_HEADER_BYTES)]))
+        expected_data_length = self.expected_data_lengths.get(primary_header['apid'])
+        if expected_data_length is None or primary_header['seq_flags'] != 0x3 or primary_header['pkt_data_length'] == expected_data_length:
+            return None
+
+        packet_size = PRIMARY_HEADER_BYTES + expected_data_length + 1
+        if len(data) - pointer < packet_size:
+            return None
+        packet = bytes(data[pointer:(pointer+4)]) + expected_data_length.to_bytes(2, 'big') + bytes(data[(pointer+6):(pointer+packet_size)])
+        if not self.packet_checksum.is_valid(packet):
+            return None
+
+        self.repaired_packets += 1
+        return packet
+
+    def resync(self, data: bytes | bytearray, start: int, final: bool = False) -> int:
+        """Returns the position of the next header from start that is valid and whose packet has a good checksum. The
+        candidates are found at once with numpy over the bytes available. If no complete packet is confirmed, the first
+        candidate whose packet is not complete yet is returned, it will be checked when the rest of it arrives. Without
+        candidates the last bytes that could still start a header are kept."""
+        self.resync_count += 1
+        search = np.frombuffer(bytes(data[start:]), dtype=np.uint8)
+        last_start = len(search) - PRIMARY_HEADER_BYTES + 1
+
+        candidates = np.array([], dtype=np.int64)
+        if last_start > 0:
+            first_bytes = search[:last_start]
+            candidates = np.flatnonzero((first_bytes & 0xF0) == 0)
+            if self.known_apids is not None and len(candidates) > 0:
+                apids = ((first_bytes[candidates].astype(np.int64) & 0x07) << 8) | search[candidates + 1]
+                candidates = candidates[np.isin(apids, list(self.known_apids))]
+
+        first_incomplete = None
+        for candidate in candidates:
+            pointer = start + int(candidate)
+            if not self.is_valid_header(data, pointer):
+                continue
+            packet_size = self.get_packet_size(data, pointer)
+            if len(data) - pointer < packet_size:
+                if first_incomplete is None and not final:
+                    first_incomplete = pointer
+                continue
+            if self.packet_checksum.is_valid(bytes(data[pointer:(pointer+packet_size)])):
+                new_pointer = pointer
+                break
+        else:
+            if first_incomplete is not None:
+                new_pointer = first_incomplete
+            else:
+                new_pointer = len(data) if final else max(start, len(data) - PRIMARY_HEADER_BYTES + 1)
+
+        self.skipped_bytes += new_pointer - start + 1
+        return new_pointer
+
+    def get_packet_size(self, data: bytes | bytearray, pointer: int = 0) -> int:
+        """Total size in bytes of the packet starting at the pointer, primary header included."""
+        pkt_data_length = int.from_bytes(data[(pointer+4):(pointer+6)], 'big')
+        return PRIMARY_HEADER_BYTES + pkt_data_length + 1
+
+    def parse_primary_header(self, packet: bytes) -> dict:
+        """Reads the primary header fields as integers."""
+        first_word = int.from_bytes(packet[0:2], 'big')
+        second_word = int.from_bytes(packet[2:4], 'big')
+
+        primary_header = {
+            "version_number": first_word >> 13,
+            "pkt_type": (first_word >> 12) & 0x1,
+            "sec_hdr_flag": (first_word >> 11) & 0x1,
+            "apid": first_word & 0x7FF,
+            "seq_flags": second_word >> 14,
+            "seq_count": second_word & 0x3FFF,
+            "pkt_data_length": int.from_bytes(packet[4:6], 'big'),
+        }
+        return primary_header
+
+    def split_packet(self, packet: bytes) -> tuple[dict, bytes, bytes, bytes]:
+        """Splits a packet into its primary header (as a dict of integers), secondary header, data and checksum bytes."""
+        primary_header = self.parse_primary_header(packet)
+        secondary_header_bytes = SECONDARY_HEADER_BYTES if primary_header['sec_hdr_flag'] == 1 else 0
+
+        data_start = PRIMARY_HEADER_BYTES + secondary_header_bytes
+        secondary_header = packet[PRIMARY_HEADER_BYTES:data_start]
+        data = packet[data_start:-CHECKSUM_BYTES]
+        checksum = packet[-CHECKSUM_BYTES:]
+
+        return primary_header, secondary_header, data, checksum
+
+    def join_segment(self, apid: str, seq_flags: int, secondary_header: bytes, data: bytes) -> tuple[bytes, bytes] | None:
+        """Same rules as TelemetryDataReader.adjust_df_for_segmented_packets: 0x3 is unsegmented, 0x1 starts a message
+        (keeping its secondary header), 0x0 is a middle segment and 0x2 the final one. Segments without a start are
+        skipped. Returns the joined (secondary_header, data) when a message is complete."""
+        if seq_flags == 0x3:
+            return secondary_header, data
+
+        started = apid in self.segmented_packets
+        if seq_flags == 0x1 and not started:
+            self.segmented_packets[apid] = (secondary_header, [data])
+        elif seq_flags == 0x0 and started:
+            self.segmented_packets[apid][1].append(data)
+        elif seq_flags == 0x2 and started:
+            start_secondary_header, data_parts = self.segmented_packets.pop(apid)
+            data_parts.append(data)
+            return start_secondary_header, b''.join(data_parts)
+
+        return None
+
+    def packet_to_space_packet_dict(self, packet: bytes) -> dict:
+        """Returns the packet in the same format as TelemetryDataReader.read_binary_str_to_space_packet, each component
+        as a binary string."""
+        primary_header, secondary_header, data, checksum = self.split_packet(packet)
+
+        space_packet_dict = {
+            "version_number": format(primary_header['version_number'], '03b'),
+            "pkt_type": format(primary_header['pkt_type'], '01b'),
+            "sec_hdr_flag": format(primary_header['sec_hdr_flag'], '01b'),
+            "apid": format(primary_header['apid'], '011b'),
+            "seq_flags": format(primary_header['seq_flags'], '02b'),
+            "seq_count": format(primary_header['seq_count'], '014b'),
+            "pkt_data_length": format(primary_header['pkt_data_length'], '016b'),
+            "secondary_header": self.data_converter.bytes_to_binary(secondary_header),
+            "data": self.data_converter.bytes_to_binary(data),
+            "checksum": self.data_converter.bytes_to_binary(checksum),
+        }
+        return space_packet_dict
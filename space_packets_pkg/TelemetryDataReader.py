@@ -1,39 +1,87 @@
 
 import copy
+import os
+from typing import Callable
 import pandas as pd
 import numpy as np
 from space_packets_pkg.DataConverter import DataConverter
 from space_packets_pkg.SpacePacketDefinitions import SpacePacketDefinitions
 from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer
+from space_packets_pkg.PacketDeduplicator import PacketDeduplicator
 
 TELEMETRY_FOLDER_PATH = "decoded_satcs_dump"
+PROGRESS_REPORT_PACKETS = 50
 class TelemetryDataReader:
     file_repo: FileRepository
     data_converter: DataConverter 
     space_packets: SpacePacketDefinitions
+    packet_checksum: PacketChecksum
 
     def __init__(self) -> None:
         self.file_repo = FileRepository(TELEMETRY_FOLDER_PATH)
         self.data_converter = DataConverter()
         self.space_packets = SpacePacketDefinitions()
+        self.packet_checksum = PacketChecksum()
 
-    def get_space_packets_df_from_file(self, file_name: str, main_dd_df: pd.DataFrame, transform_binary_values: bool = True) -> pd.DataFrame:
+    def get_space_packets_df_from_file(self, file_name: str, main_dd_df: pd.DataFrame, transform_binary_values: bool = True, drop_bad_checksums: bool = True, main_tm_df: pd.DataFrame = None) -> pd.DataFrame:
         """Easier way to get the df directly from the file_path."""
-        space_packets = self.read_file_and_get_space_packets(file_name)
-        df = self.create_df_from_space_packets(space_packets, main_dd_df,transform_binary_values)
+        space_packets = self.read_file_and_get_space_packets(file_name, main_tm_df)
+        df = self.create_df_from_space_packets(space_packets, main_dd_df,transform_binary_values, drop_bad_checksums)
         return df
     
-    def read_file_and_get_space_packets(self, file_name: str) -> list[dict]:
+    def get_space_packets_df_from_files(self, file_names: list[str], main_dd_df: pd.DataFrame, transform_binary_values: bool = True, drop_bad_checksums: bool = True, main_tm_df: pd.DataFrame = None, deduplicator: PacketDeduplicator = None, progress_callback: Callable[[str, int, int], None] = None) -> pd.DataFrame:
+        """Same as get_space_packets_df_from_file for many (possibly overlapping) dumps, the packets repeated across
+        or inside the files are removed before decoding.
+        progress_callback(stage, done, total) is called with the bytes framed ('framing') and then with the packets
+        decoded ('decoding'), an exception raised by it stops the decode."""
+        if deduplicator is None:
+            deduplicator = PacketDeduplicator()
+        space_packets = self.read_files_and_get_space_packets(file_names, main_tm_df, deduplicator, progress_callback)
+
+        report = deduplicator.get_report()
+        if report['duplicate_packets'] > 0:
+            print(f"Removed {report['duplicate_packets']} duplicate packets: {report['duplicates_per_apid']}")
+
+        df = self.create_df_from_space_packets(space_packets, main_dd_df, transform_binary_values, drop_bad_checksums, progress_callback)
+        return df
+
+    def read_files_and_get_space_packets(self, file_names: list[str], main_tm_df: pd.DataFrame = None, deduplicator: PacketDeduplicator = None, progress_callback: Callable[[str, int, int], None] = None) -> list[dict]:
+        """Frames the files one at a time and passes the packets through the deduplicator, so only the packets not seen
+        before are kept. Packets with a bad checksum skip the deduplicator (a corrupt header could hide a good packet)
+        and are left for the checksum stage."""
+        if deduplicator is None:
+            deduplicator = PacketDeduplicator()
+        framer = SpacePacketFramer(main_tm_df)
+        file_sizes = [os.path.getsize(self.file_repo.get_file_path_from_file_name(file_name)) for file_name in file_names]
+
+        space_packets = []
+        for i, file_name in enumerate(file_names):
+            if progress_callback is not None:
+                progress_callback('framing', sum(file_sizes[:i]), sum(file_sizes))
+            packets = framer.frame_bytes(bytes.fromhex(self.file_repo.read_telemetry_dump_file(file_name)))
+            valid = self.packet_checksum.validate_packets(packets)
+            packets = [packet for packet, is_valid in zip(packets, valid) if not is_valid or not deduplicator.is_duplicate(packet)]
+            space_packets.extend(framer.packet_to_space_packet_dict(packet) for packet in packets)
+
+        return space_packets
+
+    def read_file_and_get_space_packets(self, file_name: str, main_tm_df: pd.DataFrame = None) -> list[dict]:
         """Attempts to read a normal hex file, if error it will read as if it were a binary file.
         After being able to read it will parse the hex string into space packets format."""
         hex_data = self.file_repo.read_telemetry_dump_file(file_name)
+        if main_tm_df is not None:
+            return self.read_through_hex_str_with_resync(hex_data, main_tm_df)
         packets = self.read_through_hex_str(hex_data)
         return packets
 
-    def create_df_from_space_packets(self, packets: list[dict], main_dd_df: pd.DataFrame = None,transform_binary_values: bool = True) -> pd.DataFrame:
+    def create_df_from_space_packets(self, packets: list[dict], main_dd_df: pd.DataFrame = None,transform_binary_values: bool = True, drop_bad_checksums: bool = True, progress_callback: Callable[[str, int, int], None] = None) -> pd.DataFrame:
         """Allows the space packets to be displayes as df format, also it performs transformations to the binary values of
-        a space packet. When asked to transform for binary values the function will also adjust for segmented packets."""
+        a space packet. When asked to transform for binary values the function will also adjust for segmented packets.
+        Packets with a bad checksum are dropped before any transformation, or only flagged if drop_bad_checksums is False."""
         df = pd.DataFrame(packets)
+        df = self.adjust_df_for_checksums(df, packets, drop_bad_checksums)
         if transform_binary_values:
             assert main_dd_df is not None, "For transformation main_dd_df must be inputed!"
             df['version_number'] = df['version_number'].apply(lambda x: int(x, 2))
@@ -42,11 +90,27 @@ class TelemetryDataReader:
             df['pkt_data_length'] = df['pkt_data_length'].apply(lambda x: hex(int(x, 2)))
             df['secondary_header'] = df['secondary_header'].apply(self.data_converter.convert_64bit_binary_to_datetime)
             df = self.adjust_df_for_segmented_packets(df)
-            df = self.adjust_df_for_calculated_data(df, main_dd_df)
+            df = self.adjust_df_for_calculated_data(df, main_dd_df, progress_callback)
             df = df.dropna(axis=0)
         
         return df
     
+    def adjust_df_for_checksums(self, df: pd.DataFrame, packets: list[dict], drop_bad_checksums: bool = True) -> pd.DataFrame:
+        """Checks the CRC-16 of every packet, the number of bad packets per apid is printed. The bad packets are dropped,
+        or when drop_bad_checksums is False they are kept and flagged in a 'checksum_valid' column."""
+        packets_bytes = [self.packet_checksum.binary_space_packet_to_bytes(space_packet) for space_packet in packets]
+        valid = self.packet_checksum.validate_packets(packets_bytes)
+
+        if not valid.all():
+            bad_packets = [packet for packet, is_valid in zip(packets_bytes, valid) if not is_valid]
+            print(f"Found {len(bad_packets)} packets with bad checksum: {self.packet_checksum.count_per_apid(bad_packets)}")
+
+        if drop_bad_checksums:
+            return df[valid].reset_index(drop=True)
+
+        df['checksum_valid'] = valid
+        return df
+
     def adjust_df_for_segmented_packets(self, df: pd.DataFrame) -> pd.DataFrame:
         """This is specific to iterate over the main df and adjusts the packtes that have a flag for segmented SPs.
         0x3 is a unsegmented message, 0x1 is the first message, 0x0 is the middle, and 0x2 is the final segment.
@@ -110,6 +174,16 @@ class TelemetryDataReader:
 
         return space_packet_list
 
+    def read_through_hex_str_with_resync(self, hex_string: str, main_tm_df: pd.DataFrame) -> list[dict]:
+        """Same output as read_through_hex_str, but the packets are framed checking each header against the TM sheets,
+        so a corrupt packet length does not desync the rest of the file. The framer skips to the next valid packet."""
+        framer = SpacePacketFramer(main_tm_df)
+        packets = framer.frame_bytes(bytes.fromhex(hex_string))
+        if framer.skipped_bytes > 0:
+            print(f"Resynchronized {framer.resync_count} times, skipping {framer.skipped_bytes} bytes")
+
+        return [framer.packet_to_space_packet_dict(packet) for packet in packets]
+
     def read_binary_str_to_space_packet(self, binary_string: str) -> tuple[dict, int]:
         """Main function to read the hex string. It will turn the hex into binary, then iterate over the components of
         the space packet and dinamically adjusts the bit size. Returns the space packet in a dict format with the components
@@ -158,7 +232,7 @@ class TelemetryDataReader:
 
         return component_binary, new_pointer
     
-    def adjust_df_for_calculated_data(self, df_in: pd.DataFrame, main_dd_df: pd.DataFrame) -> pd.DataFrame:
+    def adjust_df_for_calculated_data(self, df_in: pd.DataFrame, main_dd_df: pd.DataFrame, progress_callback: Callable[[str, int, int], None] = None) -> pd.DataFrame:
 
         assert not df_in.empty, "Empty df as input"
         assert all(column in df_in.columns for column in ['apid', 'data']), "Columns 'apid' and/or 'data' not found in DataFrame"
@@ -166,6 +240,8 @@ class TelemetryDataReader:
         df = df_in.copy(deep=True)
         new_fields = []
         for i in range(0, len(df)):
+            if progress_callback is not None and i % PROGRESS_REPORT_PACKETS == 0:
+                progress_callback('decoding', i, len(df))
             apid = df.iloc[i,:]['apid']
             binary_data = df.iloc[i,:]['data']
             new_fields.append(self.calculate_data_conversion(apid, binary_data, main_dd_df))
@@ -255,6 +331,25 @@ class TelemetryDataReader:
 
         return new_df.drop(columns=['index'])
 
+    def get_field_column_names(self, apid_linked_dd: list[dict]) -> list[str | None]:
+        """Given the data packets of an apid from the catalog, returns the column name that each field will have in the
+        df from get_specific_apid_df_from_telemetry_df. Header rows (fields with only a name) and 'Total' return None."""
+        column_names = []
+        current_none_field = ''
+        for field_data in apid_linked_dd:
+            field_name = field_data['field']
+            if self._check_all_values_none(field_data, exclude_keys=['field', 'value']):
+                current_none_field = field_name
+                column_names.append(None)
+            elif field_name == 'Total':
+                column_names.append(None)
+            elif current_none_field == '':
+                column_names.append(f"{field_name} ({field_data['unit']})")
+            else:
+                column_names.append(f"{current_none_field} {field_name} ({field_data['unit']})")
+
+        return column_names
+
     def query_main_dd_df_for_apid_data_name(self, apids: str | list[str], main_dd_df: pd.DataFrame) -> str | list[str]:
         """This is a function method to get the corresponding names of given apid's. If input is a list the output will
         be a list with all names, if input is a str output will be the single data name str."""
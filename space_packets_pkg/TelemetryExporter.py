@@ -0,0 +1,217 @@
+import importlib.util
+import os
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+from space_packets_pkg.OdsSheetWriter import OdsSheetWriter
+from space_packets_pkg.TypedTelemetryStore import TypedTelemetryStore
+
+EXPORT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow', 'ods': '.ods'}
+PYARROW_FORMATS = ('parquet', 'arrow')
+DEFAULT_CHUNK_ROWS = 50_000
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+    'ods': 'application/vnd.oasis.opendocument.spreadsheet',
+}
+
+class TelemetryExporter:
+    """This class exports the decoded fields of some apids to CSV, Parquet, Arrow IPC or ODS without building the
+    whole table: the decoded telemetry comes as TypedTelemetryStores (e.g. the dumps of the selection decoded
+    together, so the overlapping packets are already removed, or loaded from the decoded data cache) and the rows
+    are taken from the typed columns of its apid tables in blocks of 'chunk_rows' (a Parquet row group / Arrow
+    record batch each), merged on time across the apids. Besides the typed columns only the row numbers of the
+    selection and one block of rows are in memory, not the whole export.
+
+    The table has the columns 'time', 'apid' and then the fields asked for, of every apid, in rows sorted by time
+    within each store. Parquet and Arrow need pyarrow, which is optional.
+    """
+    telemetry_reader: TelemetryDataReader
+    chunk_rows: int
+
+    def __init__(self, telemetry_reader: TelemetryDataReader | None = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+        self.telemetry_reader = telemetry_reader if telemetry_reader is not None else TelemetryDataReader()
+        self.chunk_rows = chunk_rows
+
+    def get_available_formats(self) -> list[str]:
+        has_pyarrow = importlib.util.find_spec('pyarrow') is not None
+        return [export_format for export_format in EXPORT_FORMATS if has_pyarrow or export_format not in PYARROW_FORMATS]
+
+    def get_export_columns(self, apid_fields: dict[str, list[str] | None], main_dd_df: pd.DataFrame) -> list[str]:
+        """Columns of the export, the fields of an apid given as None are all its fields from the catalog."""
+        columns = ['time', 'apid']
+        for apid, fields in apid_fields.items():
+            if fields is None:
+                apid_linked_dd = main_dd_df.query(f"""apid == '{apid}'""")['data_packets'].item()
+                fields = [column for column in self.telemetry_reader.get_field_column_names(apid_linked_dd) if column is not None]
+            columns.extend(field for field in fields if field not in columns)
+
+        return columns
+
+    def iter_chunks(self, typed_stores: Iterable[TypedTelemetryStore], main_dd_df: pd.DataFrame, apid_fields: dict[str, list[str] | None],
+                    start: pd.Timestamp | None = None, end: pd.Timestamp | None = None) -> Iterator[pd.DataFrame]:
+        """Blocks of at most chunk_rows rows with the export columns. The rows of each store are merged on time
+        across its apids a block at a time, only the rows of the block are taken from the typed columns."""
+        columns = self.get_export_columns(apid_fields, main_dd_df)
+        any_rows = False
+        for typed_store in typed_stores:
+            for chunk in self.iter_store_chunks(typed_store, apid_fields, columns, start, end):
+                any_rows = True
+                yield chunk
+
+        if not any_rows:
+            yield pd.DataFrame(columns=columns)  # so the file still has the header
+
+    def iter_store_chunks(self, typed_store: TypedTelemetryStore, apid_fields: dict[str, list[str] | None], columns: list[str],
+                          start: pd.Timestamp | None, end: pd.Timestamp | None) -> Iterator[pd.DataFrame]:
+        """Merges the apids of the store on time: each apid gives the row numbers of its rows within start/end in
+        time order, and every block takes the next chunk_rows earliest rows among the next chunk_rows rows of each
+        apid. Rows at the same time keep the order of the apids in apid_fields and then their own order."""
+        apids_in_store = set(typed_store.get_apids())
+        apid_tables = {}
+        apid_rows = {}
+        for apid, fields in apid_fields.items():
+            if apid not in apids_in_store:
+                continue
+            apid_table = typed_store.get_apid_table(apid)
+            rows = self.get_rows_in_time_order(apid_table.time, start, end)
+            if len(rows) > 0:
+                apid_tables[apid] = apid_table
+                apid_rows[apid] = rows
+
+        cursors = {apid: 0 for apid in apid_tables}
+        while any(cursors[apid] < len(rows) for apid, rows in apid_rows.items()):
+            candidates = {apid: rows[cursors[apid]:cursors[apid] + self.chunk_rows] for apid, rows in apid_rows.items()}
+            candidate_times = np.concatenate([apid_tables[apid].time[rows] for apid, rows in candidates.items()])
+            merged = np.argsort(candidate_times, kind='stable')[:self.chunk_rows]
+
+            candidate_offsets = np.cumsum([0] + [len(rows) for rows in candidates.values()])
+            apid_ids = np.searchsorted(candidate_offsets, merged, side='right') - 1
+            taken = np.bincount(apid_ids, minlength=len(candidates))
+            taken_offsets = np.cumsum(np.concatenate([[0], taken]))
+
+            apid_dfs = []
+            for apid_id, (apid, rows) in enumerate(candidates.items()):
+                if taken[apid_id] == 0:
+                    continue
+                apid_table = apid_tables[apid].take(rows[:taken[apid_id]])
+                fields = apid_fields[apid]
+                fields = list(apid_table.columns) if fields is None else [field for field in fields if field in apid_table.columns]
+                apid_df = apid_table.to_dataframe(fields).rename_axis('time').reset_index()
+                apid_df.insert(1, 'apid', apid)
+                apid_dfs.append(apid_df)
+                cursors[apid] += int(taken[apid_id])
+
+            chunk = pd.concat(apid_dfs, ignore_index=True)
+            positions = taken_offsets[apid_ids] + (merged - candidate_offsets[apid_ids])
+            yield chunk.iloc[positions].reset_index(drop=True).reindex(columns=columns)
+
+    def get_rows_in_time_order(self, time: np.ndarray, start: pd.Timestamp | None, end: pd.Timestamp | None) -> np.ndarray:
+        """Row numbers of the times within start and end, sorted by time (rows without a time last)."""
+        rows = np.arange(len(time))
+        if start is not None:
+            rows = rows[time[rows] >= start.to_datetime64()]
+        if end is not None:
+            rows = rows[time[rows] <= end.to_datetime64()]
+        return rows[np.argsort(time[rows], kind='stable')]
+
+    def export(self, chunks: Iterable[pd.DataFrame], file_path: str, export_format: str | None = None) -> int:
+        """Writes the chunks to file_path (format from the extension if not given), returns the rows written."""
+        if export_format is None:
+            extension = os.path.splitext(file_path)[1]
+            export_format = {extension: name for name, extension in EXPORT_FORMATS.items()}.get(extension)
+        assert export_format in EXPORT_FORMATS, f"Export format must be one of {list(EXPORT_FORMATS)}!"
+        if export_format in PYARROW_FORMATS and importlib.util.find_spec('pyarrow') is None:
+            raise RuntimeError(f"Exporting to {export_format} needs pyarrow (pip install pyarrow)")
+
+        writers = {'csv': self.write_csv, 'parquet': self.write_parquet, 'arrow': self.write_arrow, 'ods': self.write_ods}
+        return writers[export_format](chunks, file_path)
+
+    def write_csv(self, chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+        rows = 0
+        with open(file_path, 'w', newline='') as f:
+            for chunk in chunks:
+                self.to_text_values(chunk).to_csv(f, header=(rows == 0), index=False, date_format='%Y-%m-%dT%H:%M:%S.%f')
+                rows += len(chunk)
+        return rows
+
+    def write_ods(self, chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+        rows = 0
+        writer = OdsSheetWriter(file_path)
+        writer.open()
+        try:
+            writer.start_sheet('Telemetry')
+            for chunk in chunks:
+                if rows == 0:
+                    writer.write_header(list(chunk.columns))
+                writer.write_rows(chunk)
+                rows += len(chunk)
+        finally:
+            writer.close()
+        return rows
+
+    def write_parquet(self, chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+        import pyarrow.parquet as pq  # optional dependency, only for parquet exports
+
+        rows = 0
+        writer = None
+        schema = None
+        try:
+            for chunk in chunks:
+                table = self.to_arrow_table(chunk, schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(file_path, table.schema)
+                writer.write_table(table, row_group_size=self.chunk_rows)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def write_arrow(self, chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+        import pyarrow as pa  # optional dependency, only for arrow exports
+
+        rows = 0
+        writer = None
+        schema = None
+        try:
+            for chunk in chunks:
+                table = self.to_arrow_table(chunk, schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(file_path, table.schema)
+                writer.write_table(table, max_chunksize=self.chunk_rows)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def to_arrow_table(self, chunk: pd.DataFrame, schema=None):
+        """Arrow table of the chunk, with the schema of the first chunk for the next ones. Fields that are vectors
+        become lists of floats, columns without any value in the first chunk are floats."""
+        import pyarrow as pa
+
+        chunk = chunk.copy()
+        for column in chunk.columns:
+            if chunk[column].dtype == object and column not in ('apid',):
+                if chunk[column].map(lambda value: isinstance(value, (list, tuple, np.ndarray))).any():
+                    chunk[column] = chunk[column].map(lambda value: None if value is None or (isinstance(value, float) and np.isnan(value)) else [float(v) for v in value])
+                elif chunk[column].isna().all():
+                    chunk[column] = chunk[column].astype(float)
+        return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+    def to_text_values(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Vectors as '[x, y, z]' for the text formats."""
+        object_columns = [column for column in chunk.columns if chunk[column].dtype == object and column != 'apid']
+        if len(object_columns) == 0:
+            return chunk
+        chunk = chunk.copy()
+        for column in object_columns:
+            chunk[column] = chunk[column].map(lambda value: str(value.tolist()) if isinstance(value, np.ndarray) else value)
+        return chunk
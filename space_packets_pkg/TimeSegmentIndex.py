@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable
+
+VALID_CLOCK_START = np.datetime64('2020-01-01', 'ns')  # after a reset the on-board clock restarts at the GPS epoch (1980)
+DEFAULT_GAP_THRESHOLD = np.timedelta64(10, 'm')
+DEFAULT_JUMP_TOLERANCE = np.timedelta64(1, 's')
+
+class TimeSegmentIndex:
+    """This class indexes the secondary header times of the packets of a dump into contiguous segments (the passes
+    or the stretches of stored telemetry): the packets with a valid clock are sorted by time once and a new segment
+    starts wherever two consecutive packets are more than 'gap_threshold' apart. The packets whose clock is not
+    valid (NaT or before 'valid_clock_start', as after a satellite reset) are kept apart, and the backward jumps of
+    the clock of each apid (packets are stored per apid, in the order they were generated) are recorded.
+
+    With it the rows of a pass are a slice of the sorted rows, the invalid clock packets are dropped with a mask
+    instead of a date filter over every frame, and the coverage of each apid is reported without going through the
+    packets again. It is small and is built once per dump selection (and cached next to the decoded dumps).
+    """
+    times: np.ndarray
+    apids: np.ndarray
+    valid: np.ndarray
+    sorted_rows: np.ndarray
+    segment_offsets: np.ndarray
+    segments: pd.DataFrame
+    jumps: pd.DataFrame
+
+    def __init__(self, times: np.ndarray, apids: np.ndarray, gap_threshold: np.timedelta64 = DEFAULT_GAP_THRESHOLD,
+                 valid_clock_start: np.datetime64 = VALID_CLOCK_START, jump_tolerance: np.timedelta64 = DEFAULT_JUMP_TOLERANCE) -> None:
+        self.times = np.asarray(times, dtype='datetime64[ns]')
+        self.apids = np.asarray(apids, dtype=object)
+        self.gap_threshold = gap_threshold
+        self.valid_clock_start = valid_clock_start
+        self.valid = ~np.isnat(self.times) & (self.times >= valid_clock_start)
+
+        valid_rows = np.flatnonzero(self.valid)
+        self.sorted_rows = valid_rows[np.argsort(self.times[valid_rows], kind='stable')]
+        sorted_times = self.times[self.sorted_rows]
+        breaks = np.flatnonzero(np.diff(sorted_times) > gap_threshold) + 1
+        self.segment_offsets = np.concatenate([[0], breaks, [len(self.sorted_rows)]]).astype(np.int64) if len(self.sorted_rows) > 0 else np.zeros(1, dtype=np.int64)
+
+        self.segments = self.build_segments()
+        self.jumps = self.find_jumps(jump_tolerance)
+
+    @staticmethod
+    def from_space_packets_df(space_packets_df: pd.DataFrame, **kwargs) -> 'TimeSegmentIndex':
+        """Index of the packets of a df from TelemetryDataReader (rows are positions in the df)."""
+        times = pd.to_datetime(space_packets_df['secondary_header'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        return TimeSegmentIndex(times, space_packets_df['apid'].to_numpy(dtype=object), **kwargs)
+
+    @staticmethod
+    def from_apid_tables(apid_tables: list[TypedApidTable], **kwargs) -> 'TimeSegmentIndex':
+        """Index of the decoded rows of TypedApidTables (rows are positions in the tables one after the other, so
+        get_valid_mask(apid) is in the row order of the table of the apid)."""
+        times = np.concatenate([apid_table.time for apid_table in apid_tables]) if len(apid_tables) > 0 else np.array([], dtype='datetime64[ns]')
+        apids = np.concatenate([np.full(len(apid_table), apid_table.apid, dtype=object) for apid_table in apid_tables]) if len(apid_tables) > 0 else np.array([], dtype=object)
+        return TimeSegmentIndex(times, apids, **kwargs)
+
+    def build_segments(self) -> pd.DataFrame:
+        starts = self.times[self.sorted_rows[self.segment_offsets[:-1]]]
+        ends = self.times[self.sorted_rows[self.segment_offsets[1:] - 1]]
+        segment_apids = [sorted(set(self.apids[self.sorted_rows[first:last]])) for first, last in zip(self.segment_offsets[:-1], self.segment_offsets[1:])]
+
+        return pd.DataFrame({
+            'segment': np.arange(len(starts)),
+            'start': starts,
+            'end': ends,
+            'duration_s': (ends - starts) / np.timedelta64(1, 's'),
+            'packets': np.diff(self.segment_offsets),
+            'apids': segment_apids,
+        })
+
+    def find_jumps(self, jump_tolerance: np.timedelta64) -> pd.DataFrame:
+        """Backward steps of the clock of each apid in packet order (the packet before and the one after the jump)."""
+        jumps = []
+        for apid in pd.unique(self.apids):
+            rows = np.flatnonzero((self.apids == apid) & ~np.isnat(self.times))
+            steps = np.diff(self.times[rows])
+            for i in np.flatnonzero(steps < -jump_tolerance):
+                jumps.append({'apid': apid, 'row': rows[i + 1], 'from_time': self.times[rows[i]], 'to_time': self.times[rows[i + 1]]})
+
+        return pd.DataFrame(jumps, columns=['apid', 'row', 'from_time', 'to_time'])
+
+    def get_segment_rows(self, segment: int, apid: str | None = None) -> np.ndarray:
+        """Rows of the packets of a segment sorted by time, only the ones of an apid if given."""
+        rows = self.sorted_rows[self.segment_offsets[segment]:self.segment_offsets[segment + 1]]
+        return rows if apid is None else rows[self.apids[rows] == apid]
+
+    def get_segment_bounds(self, segment: int) -> tuple[pd.Timestamp, pd.Timestamp]:
+        return pd.Timestamp(self.segments['start'].iat[segment]), pd.Timestamp(self.segments['end'].iat[segment])
+
+    def find_segment(self, time: pd.Timestamp) -> int | None:
+        """Segment that contains the time, None if it falls in a gap."""
+        if len(self.segments) == 0:
+            return None
+        segment = int(np.searchsorted(self.segments['start'].to_numpy(), np.datetime64(time, 'ns'), side='right')) - 1
+        if segment < 0 or self.segments['end'].iat[segment] < time:
+            return None
+        return segment
+
+    def get_valid_mask(self, apid: str | None = None) -> np.ndarray:
+        """True for the packets with a valid clock, in packet order (only the packets of an apid if given)."""
+        return self.valid if apid is None else self.valid[self.apids == apid]
+
+    def get_invalid_rows(self) -> np.ndarray:
+        return np.flatnonzero(~self.valid)
+
+    def get_apid_coverage(self) -> pd.DataFrame:
+        """Per apid: packets, packets with an invalid clock, clock jumps, segments with data, first and last valid time,
+        time covered (from the first to the last packet of the apid in each segment) and median period."""
+        coverage = []
+        segment_of_row = np.full(len(self.times), -1, dtype=np.int64)
+        segment_of_row[self.sorted_rows] = np.repeat(np.arange(len(self.segments)), np.diff(self.segment_offsets))
+        for apid in pd.unique(self.apids):
+            is_apid = self.apids == apid
+            rows = self.sorted_rows[is_apid[self.sorted_rows]]
+            times = self.times[rows]
+            segments = segment_of_row[rows]
+
+            covered = 0.0
+            for segment in np.unique(segments):
+                segment_times = times[segments == segment]
+                covered += (segment_times[-1] - segment_times[0]) / np.timedelta64(1, 's')
+            periods = np.diff(times)[np.diff(segments) == 0] / np.timedelta64(1, 's')
+
+            coverage.append({
+                'apid': apid,
+                'packets': int(is_apid.sum()),
+                'invalid_clock': int((is_apid & ~self.valid).sum()),
+                'clock_jumps': int((self.jumps['apid'] == apid).sum()),
+                'segments': len(np.unique(segments)),
+                'first': times[0] if len(times) > 0 else np.datetime64('NaT'),
+                'last': times[-1] if len(times) > 0 else np.datetime64('NaT'),
+                'covered_s': covered,
+                'median_period_s': float(np.median(periods)) if len(periods) > 0 else np.nan,
+            })
+
+        return pd.DataFrame(coverage, columns=['apid', 'packets', 'invalid_clock', 'clock_jumps', 'segments', 'first', 'last', 'covered_s', 'median_period_s'])
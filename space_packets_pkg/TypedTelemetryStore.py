@@ -0,0 +1,339 @@
+import os
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.PacketDeduplicator import PacketDeduplicator
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+
+PACKET_COLUMNS_DTYPES = {
+    "apid": "category",
+    "seq_flags": "category",
+    "seq_count": np.uint16,
+    "pkt_data_length": np.uint16,
+}
+
+class TypedApidTable:
+    """Decoded telemetry of a single apid held as typed columns: a datetime64 time array plus one numpy array per
+    field. Quaternion, vector and matrix fields are fixed-shape float32 arrays of shape (n, size) or (n, rows, cols).
+    The catalog metadata of the fields is kept once per table instead of once per packet.
+    """
+    apid: str
+    time: np.ndarray
+    columns: dict[str, np.ndarray]
+    field_metadata: dict[str, dict]
+
+    def __init__(self, apid: str, time: np.ndarray, columns: dict[str, np.ndarray], field_metadata: dict[str, dict]) -> None:
+        assert all(len(values) == len(time) for values in columns.values()), "All columns must have the same length as time!"
+        self.apid = apid
+        self.time = time
+        self.columns = columns
+        self.field_metadata = field_metadata
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays, object columns are counted with their python objects."""
+        total = self.time.nbytes
+        for values in self.columns.values():
+            total += values.nbytes
+            if values.dtype == object:
+                total += int(pd.Series(values).memory_usage(deep=True, index=False)) - values.nbytes
+
+        return total
+
+    def to_dataframe(self, fields: list[str] | None = None) -> pd.DataFrame:
+        """Returns the table in the same shape as get_specific_apid_df_from_telemetry_df, time indexed with one column
+        per field. Multi-dimensional fields are given back per row (lists for quaternions and vectors, arrays for
+        matrices) as the DataConverter does."""
+        if fields is None:
+            fields = list(self.columns.keys())
+
+        data = {}
+        for field in fields:
+            values = self.columns[field]
+            if values.ndim == 2:
+                data[field] = values.tolist()
+            elif values.ndim == 3:
+                data[field] = list(values)
+            else:
+                data[field] = values
+
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.time, name='time'), columns=pd.Index(fields, dtype=object))
+
+    def concat(self, other: 'TypedApidTable') -> 'TypedApidTable':
+        """Returns a new table with the rows of both tables, the other table must be of the same apid and fields."""
+        assert self.apid == other.apid, "Only tables of the same apid can be concatenated!"
+        assert self.columns.keys() == other.columns.keys(), "Only tables with the same fields can be concatenated!"
+
+        columns = {field: np.concatenate([values, other.columns[field]]) for field, values in self.columns.items()}
+        return TypedApidTable(self.apid, np.concatenate([self.time, other.time]), columns, self.field_metadata)
+
+    def take(self, rows: np.ndarray) -> 'TypedApidTable':
+        """Returns a new table with the rows given, in that order."""
+        columns = {field: values[rows] for field, values in self.columns.items()}
+        return TypedApidTable(self.apid, self.time[rows], columns, self.field_metadata)
+
+    @staticmethod
+    def concat_tables(tables: list['TypedApidTable']) -> 'TypedApidTable':
+        """Joins tables of the same apid, a field missing in some of them is filled with NaN (NaT for times, None
+        for the other dtypes). When the dtypes do not combine the field becomes an object array."""
+        if len(tables) == 1:
+            return tables[0]
+
+        fields = list(dict.fromkeys(field for apid_table in tables for field in apid_table.columns))
+        field_metadata = {}
+        for apid_table in tables:
+            field_metadata.update(apid_table.field_metadata)
+
+        columns = {}
+        for field in fields:
+            present = [apid_table.columns[field] for apid_table in tables if field in apid_table.columns]
+            if all(values.ndim == 1 and values.dtype.kind in 'iufb' for values in present):
+                missing_value, missing_dtype = np.nan, np.float64
+            elif all(values.ndim == 1 and values.dtype.kind == 'M' for values in present):
+                missing_value, missing_dtype = np.datetime64('NaT'), 'datetime64[ns]'
+            else:
+                missing_value, missing_dtype = None, object
+
+            parts = [apid_table.columns[field] if field in apid_table.columns else np.full(len(apid_table), missing_value, dtype=missing_dtype) for apid_table in tables]
+            try:
+                columns[field] = np.concatenate(parts)
+            except (TypeError, ValueError):
+                columns[field] = np.concatenate([TypedApidTable._to_object_array(values) for values in parts])
+
+        return TypedApidTable(tables[0].apid, np.concatenate([apid_table.time for apid_table in tables]), columns, field_metadata)
+
+    @staticmethod
+    def _to_object_array(values: np.ndarray) -> np.ndarray:
+        object_values = np.empty(len(values), dtype=object)
+        object_values[:] = list(values)
+        return object_values
+
+
+class TypedTelemetryStore:
+    """This class holds decoded telemetry as typed columns. The packet headers are kept in a small typed df
+    (categorical apid, integer counters and datetime64 secondary header) and the fields of each apid in a
+    TypedApidTable, so the bit strings and the per packet catalog dicts of 'data_transformed' are not kept.
+
+    Dumps are added with add_files, which frames the packets and decodes each apid at once with its ApidDecoderPlan
+    straight into the typed columns. add_space_packets_df converts a df already decoded by the TelemetryDataReader.
+    """
+    packets_df: pd.DataFrame
+    apid_tables: dict[str, TypedApidTable]
+    appended_tables: dict[str, list[TypedApidTable]]
+    telemetry_reader: TelemetryDataReader
+
+    def __init__(self) -> None:
+        self.packets_df = pd.DataFrame()
+        self.apid_tables = {}
+        self.appended_tables = {}
+        self.telemetry_reader = TelemetryDataReader()
+
+    def add_file(self, file_name: str, main_dd_df: pd.DataFrame, main_tm_df: pd.DataFrame = None) -> None:
+        """Decodes a telemetry dump file and adds it to the store."""
+        self.add_files([file_name], main_dd_df, main_tm_df=main_tm_df)
+
+    def add_files(self, file_names: list[str], main_dd_df: pd.DataFrame = None, main_tm_df: pd.DataFrame = None, drop_bad_checksums: bool = True,
+                  deduplicator: PacketDeduplicator = None, progress_callback: Callable[[str, int, int], None] = None, catalog_versions=None) -> None:
+        """Decodes many (possibly overlapping) dumps into the store with the same rules as
+        TelemetryDataReader.get_space_packets_df_from_files: packets with a bad checksum are dropped (they skip the
+        deduplicator), packets repeated across or inside the files are removed and the segments are joined. The
+        packets of each apid are then decoded at once by its ApidDecoderPlan, built from main_dd_df or, when a
+        CatalogVersionRegistry is given as catalog_versions, from the catalog version in force at each packet time.
+        progress_callback(stage, done, total) is called with the bytes framed ('framing') and then with the packets
+        decoded ('decoding'), an exception raised by it stops the decode."""
+        from space_packets_pkg.ApidDecoderPlan import ApidDecoderPlan  # ApidDecoderPlan imports this module
+        assert main_dd_df is not None or catalog_versions is not None, "main_dd_df or catalog_versions must be given!"
+
+        packets = self.read_packets(file_names, main_tm_df, drop_bad_checksums, deduplicator, progress_callback)
+        apid_packets = self.join_packets_per_apid(packets)
+
+        total_packets = sum(len(joined_packets) for joined_packets in apid_packets.values())
+        decoded_packets = 0
+        for apid, joined_packets in apid_packets.items():
+            if progress_callback is not None:
+                progress_callback('decoding', decoded_packets, total_packets)
+            decoded_packets += len(joined_packets)
+
+            times = self.telemetry_reader.data_converter.secondary_headers_to_datetime64([secondary_header for secondary_header, _ in joined_packets])
+            data_list = [data for _, data in joined_packets]
+            if catalog_versions is not None:
+                apid_table = catalog_versions.decode_packets(apid, data_list, times)
+            else:
+                apid_dd_df = main_dd_df.query(f"""apid == '{apid}'""")
+                apid_table = None if apid_dd_df.empty else ApidDecoderPlan(apid, apid_dd_df['data_packets'].item()).decode_packets(data_list, times)
+            if apid_table is None:
+                print(f"This apid: {apid} needs to be added to catalog!")
+                continue
+            self.add_apid_table(apid_table)
+
+        if progress_callback is not None:
+            progress_callback('decoding', total_packets, total_packets)
+
+    def read_packets(self, file_names: list[str], main_tm_df: pd.DataFrame = None, drop_bad_checksums: bool = True,
+                     deduplicator: PacketDeduplicator = None, progress_callback: Callable[[str, int, int], None] = None) -> list[bytes]:
+        """Frames the files one at a time, checks the checksums and removes the packets seen before. The headers of
+        the packets kept are added to packets_df."""
+        if deduplicator is None:
+            deduplicator = PacketDeduplicator()
+        file_repo = self.telemetry_reader.file_repo
+        packet_checksum = PacketChecksum()
+        framer = SpacePacketFramer(main_tm_df)
+        file_sizes = [os.path.getsize(file_repo.get_file_path_from_file_name(file_name)) for file_name in file_names]
+
+        packets = []
+        bad_packets = []
+        for i, file_name in enumerate(file_names):
+            if progress_callback is not None:
+                progress_callback('framing', sum(file_sizes[:i]), sum(file_sizes))
+            file_packets = framer.frame_bytes(bytes.fromhex(file_repo.read_telemetry_dump_file(file_name)))
+            valid = packet_checksum.validate_packets(file_packets)
+            bad_packets.extend(packet for packet, is_valid in zip(file_packets, valid) if not is_valid)
+            packets.extend(packet for packet, is_valid in zip(file_packets, valid)
+                           if (not is_valid and not drop_bad_checksums) or (is_valid and not deduplicator.is_duplicate(packet)))
+
+        if len(bad_packets) > 0:
+            print(f"Found {len(bad_packets)} packets with bad checksum: {packet_checksum.count_per_apid(bad_packets)}")
+        report = deduplicator.get_report()
+        if report['duplicate_packets'] > 0:
+            print(f"Removed {report['duplicate_packets']} duplicate packets: {report['duplicates_per_apid']}")
+
+        self.add_packet_headers(framer, packets)
+        return packets
+
+    def join_packets_per_apid(self, packets: list[bytes]) -> dict[str, list[tuple[bytes, bytes]]]:
+        """(secondary_header, data) of the messages of each apid in packet order, segments joined."""
+        framer = SpacePacketFramer()
+        apid_packets = {}
+        for packet in packets:
+            primary_header, secondary_header, data, _ = framer.split_packet(packet)
+            apid = hex(primary_header['apid'])
+            joined = framer.join_segment(apid, primary_header['seq_flags'], secondary_header, data)
+            if joined is not None:
+                apid_packets.setdefault(apid, []).append(joined)
+
+        return apid_packets
+
+    def add_packet_headers(self, framer: SpacePacketFramer, packets: list[bytes]) -> None:
+        split_packets = [framer.split_packet(packet) for packet in packets]
+        primary_headers = [primary_header for primary_header, _, _, _ in split_packets]
+        packets_df = pd.DataFrame({
+            "apid": [hex(primary_header['apid']) for primary_header in primary_headers],
+            "seq_flags": [hex(primary_header['seq_flags']) for primary_header in primary_headers],
+            "seq_count": [primary_header['seq_count'] for primary_header in primary_headers],
+            "pkt_data_length": [primary_header['pkt_data_length'] for primary_header in primary_headers],
+            "secondary_header": self.telemetry_reader.data_converter.secondary_headers_to_datetime64([secondary_header for _, secondary_header, _, _ in split_packets]),
+        })
+        packets_df = pd.concat([self.packets_df, packets_df], ignore_index=True) if not self.packets_df.empty else packets_df
+        self.packets_df = packets_df.astype(PACKET_COLUMNS_DTYPES)
+
+    def add_space_packets_df(self, space_packets_df: pd.DataFrame, main_dd_df: pd.DataFrame) -> None:
+        """Adds the packets of a transformed space packets df (the output of get_space_packets_df_from_file) to the store."""
+        packets_df = space_packets_df[['apid', 'seq_flags', 'seq_count', 'pkt_data_length', 'secondary_header']].copy()
+        packets_df['seq_count'] = packets_df['seq_count'].apply(lambda x: int(x, 2) if isinstance(x, str) else int(x))
+        packets_df['pkt_data_length'] = packets_df['pkt_data_length'].apply(lambda x: int(x, 16))
+        packets_df['secondary_header'] = pd.to_datetime(packets_df['secondary_header'])
+        packets_df = pd.concat([self.packets_df, packets_df], ignore_index=True) if not self.packets_df.empty else packets_df
+        self.packets_df = packets_df.astype(PACKET_COLUMNS_DTYPES)
+
+        for apid in space_packets_df['apid'].unique():
+            self.add_apid_table(self.build_apid_table(apid, space_packets_df.query(f"""apid == '{apid}'"""), main_dd_df))
+
+    def add_apid_table(self, apid_table: TypedApidTable) -> None:
+        """Appends decoded rows of an apid (e.g. rows evicted from an ApidRingBuffer). The tables are only kept in a
+        list here and joined once when the apid is read, so many small appends do not copy the whole apid each time."""
+        if len(apid_table) > 0:
+            self.appended_tables.setdefault(apid_table.apid, []).append(apid_table)
+
+    def get_apid_table(self, apid: str) -> TypedApidTable:
+        """All the rows of the apid, joining the tables appended since the last read."""
+        appended_tables = self.appended_tables.pop(apid, [])
+        if len(appended_tables) > 0:
+            tables = ([self.apid_tables[apid]] if apid in self.apid_tables else []) + appended_tables
+            self.apid_tables[apid] = TypedApidTable.concat_tables(tables)
+
+        assert apid in self.apid_tables, f"The apid {apid} is not in the store!"
+        return self.apid_tables[apid]
+
+    def build_apid_table(self, apid: str, apid_packets_df: pd.DataFrame, main_dd_df: pd.DataFrame) -> TypedApidTable:
+        """Takes the decoded values of 'data_transformed' field by field and stores each field in a typed array.
+        Fields without any value are dropped, as get_specific_apid_df_from_telemetry_df does."""
+        apid_linked_dd = main_dd_df.query(f"""apid == '{apid}'""")['data_packets'].item()
+        column_names = self.telemetry_reader.get_field_column_names(apid_linked_dd)
+        data_transformed = apid_packets_df['data_transformed'].to_list()
+
+        columns = {}
+        field_metadata = {}
+        for field_id, column_name in enumerate(column_names):
+            if column_name is None:
+                continue
+            values = [packet_fields[field_id].get('value') for packet_fields in data_transformed]
+            if all(value is None for value in values):
+                continue
+            field_data = {key: value for key, value in apid_linked_dd[field_id].items() if key != 'value'}
+            columns[column_name] = self.values_to_typed_array(values, field_data)
+            field_metadata[column_name] = field_data
+
+        time = pd.to_datetime(apid_packets_df['secondary_header']).to_numpy(dtype='datetime64[ns]')
+        return TypedApidTable(apid, time, columns, field_metadata)
+
+    def values_to_typed_array(self, values: list, field_data: dict) -> np.ndarray:
+        """Chooses the array dtype from the catalog format and bit length of the field. Values that do not fit the
+        expected dtype (missing values on integer fields, big 'uint8[N]' integers, strings) fall back to
+        float64 or object arrays."""
+        data_format = field_data['format'] if isinstance(field_data['format'], str) else ''
+        has_missing = any(value is None for value in values)
+
+        try:
+            if data_format == 'quaternion' or 'vector' in data_format or 'matrix' in data_format.lower():
+                if has_missing:
+                    return np.array(values, dtype=object)
+                return np.asarray(values, dtype=np.float32)
+            elif data_format in ['float', 'float32']:
+                return np.array([np.nan if value is None else value for value in values], dtype=np.float32)
+            elif data_format == 'GPS time':
+                return pd.to_datetime(values).to_numpy(dtype='datetime64[ns]')
+            elif self._is_integer_format(data_format):
+                if has_missing:
+                    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+                return np.asarray(values, dtype=self._integer_dtype(data_format, field_data['lenght(bits)']))
+            elif 'ADC' in data_format:
+                return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        except (OverflowError, TypeError, ValueError):
+            pass
+
+        return np.array(values, dtype=object)
+
+    def get_apid_df(self, apid: str, fields: list[str] | None = None) -> pd.DataFrame:
+        """Same output as get_specific_apid_df_from_telemetry_df, built from the typed columns."""
+        return self.get_apid_table(apid).to_dataframe(fields)
+
+    def get_apids(self) -> list[str]:
+        return list(dict.fromkeys(list(self.apid_tables.keys()) + list(self.appended_tables.keys())))
+
+    def memory_usage(self) -> int:
+        """Total bytes held by the store, packet headers plus all apid tables."""
+        packets_bytes = int(self.packets_df.memory_usage(deep=True).sum()) if not self.packets_df.empty else 0
+        return packets_bytes + sum(self.get_apid_table(apid).nbytes for apid in self.get_apids())
+
+    def _is_integer_format(self, data_format: str) -> bool:
+        return (data_format.startswith(('uint', 'int')) and '[' not in data_format) or data_format in ['bit', 'bool', 'uchar']
+
+    def _integer_dtype(self, data_format: str, bit_length) -> type:
+        try:
+            bit_length = int(bit_length)
+        except (TypeError, ValueError):
+            bit_length = 64
+
+        signed = data_format.startswith('int')
+        for dtype_bits, unsigned_dtype, signed_dtype in [(8, np.uint8, np.int8), (16, np.uint16, np.int16), (32, np.uint32, np.int32)]:
+            if bit_length <= dtype_bits:
+                return signed_dtype if signed else unsigned_dtype
+
+        return np.int64 if signed else np.uint64
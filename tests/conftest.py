@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from space_packets_pkg.CatalogCache import CatalogCache
+from space_packets_pkg.CatalogDataReader import CatalogDataReader
+from space_packets_pkg.PacketChecksum import PacketChecksum
+
+GPS_WEEK = 2280  # 2023-09-17
+MAIN_SPORT_DOCUMENT_FILE_NAME = 'sport_ttc_20220814.ods'
+
+def build_packet(apid: int, seq_count: int, data: bytes, gps_ms: int = 0, seq_flags: int = 0x3, secondary_header: bool = True) -> bytes:
+    """Telemetry space packet with a good checksum: primary header, GPS secondary header (week and ms) unless
+    secondary_header is False, data and CRC-16."""
+    first_word = (0x0800 if secondary_header else 0) | (apid & 0x7FF)
+    second_word = (seq_flags << 14) | (seq_count & 0x3FFF)
+    body = GPS_WEEK.to_bytes(4, 'big') + gps_ms.to_bytes(4, 'big') if secondary_header else b''
+    body += data
+    pkt_data_length = len(body) + 2 - 1
+    packet = first_word.to_bytes(2, 'big') + second_word.to_bytes(2, 'big') + pkt_data_length.to_bytes(2, 'big') + body + b'\x00\x00'
+    return PacketChecksum().with_checksum(packet)
+
+def build_packet_stream(count: int, apids: tuple[int, ...] = (0x5, 0x6, 0x14), seed: int = 0, period_ms: int = 1000) -> list[bytes]:
+    """count packets of the apids in turn, period_ms apart. Each apid has its own data length and sequence count,
+    which starts at a random value and may wrap, and the data is random."""
+    rng = random.Random(seed)
+    data_lengths = {apid: rng.randrange(8, 64) for apid in apids}
+    seq_counts = {apid: rng.randrange(0x4000) for apid in apids}
+    first_ms = rng.randrange(86400000)
+    packets = []
+    for i in range(count):
+        apid = apids[i % len(apids)]
+        packets.append(build_packet(apid, seq_counts[apid], rng.randbytes(data_lengths[apid]), gps_ms=first_ms + i*period_ms))
+        seq_counts[apid] += 1
+    return packets
+
+def corrupt(packet: bytes, position: int) -> bytes:
+    """The packet with one byte flipped."""
+    return packet[:position] + bytes([packet[position] ^ 0xFF]) + packet[(position+1):]
+
+@pytest.fixture
+def make_packet():
+    return build_packet
+
+@pytest.fixture
+def make_packet_stream():
+    return build_packet_stream
+
+@pytest.fixture
+def corrupt_packet():
+    return corrupt
+
+@pytest.fixture
+def write_dump(tmp_path):
+    """Writes the bytes as an hex dump file in a temporary folder, returns the folder and file name."""
+    def write(data: bytes, file_name: str = 'dump.out') -> tuple[str, str]:
+        with open(tmp_path / file_name, 'w') as f:
+            f.write(data.hex())
+        return str(tmp_path), file_name
+    return write
+
+@pytest.fixture(scope='session')
+def sport_catalog():
+    """(main_tm_df, main_dd_df) of the main SPORT document, read through the catalog cache of the repo."""
+    return CatalogCache(CatalogDataReader()).get_catalog(MAIN_SPORT_DOCUMENT_FILE_NAME)
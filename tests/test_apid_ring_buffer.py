@@ -0,0 +1,49 @@
+import numpy as np
+
+from space_packets_pkg.ApidRingBuffer import ApidRingBuffer
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable
+
+START_TIME = np.datetime64('2024-01-01T00:00:00', 'ns')
+
+def make_table(first: int, last: int) -> TypedApidTable:
+    """Rows first..last-1 of a table with one row per second, the field holds the row number."""
+    rows = np.arange(first, last)
+    times = START_TIME + rows.astype('timedelta64[s]')
+    return TypedApidTable('0x5', times, {'counter': rows.astype(np.int64)}, {})
+
+def test_wrap_keeps_the_last_rows_in_order_and_spills_the_oldest():
+    spilled = []
+    ring_buffer = ApidRingBuffer('0x5', capacity=4, spill_callback=spilled.append)
+    for row in range(7):
+        ring_buffer.append_table(make_table(row, row + 1))
+
+    window = ring_buffer.get_window()
+    assert len(ring_buffer) == 4
+    assert window.columns['counter'].tolist() == [3, 4, 5, 6]
+    assert np.all(np.diff(window.time) > np.timedelta64(0))
+    assert [row for table in spilled for row in table.columns['counter']] == [0, 1, 2]
+
+def test_window_after_wrap_is_a_view():
+    ring_buffer = ApidRingBuffer('0x5', capacity=4)
+    ring_buffer.append_table(make_table(0, 3))
+    ring_buffer.append_table(make_table(3, 6))
+
+    window = ring_buffer.get_window()
+    assert window.columns['counter'].tolist() == [2, 3, 4, 5]
+    assert np.shares_memory(window.columns['counter'], ring_buffer.columns['counter'])
+
+def test_table_larger_than_capacity_spills_the_rows_that_do_not_fit():
+    spilled = []
+    ring_buffer = ApidRingBuffer('0x5', capacity=3, spill_callback=spilled.append)
+    ring_buffer.append_table(make_table(0, 2))
+    ring_buffer.append_table(make_table(2, 8))
+
+    assert ring_buffer.get_window().columns['counter'].tolist() == [5, 6, 7]
+    assert [row for table in spilled for row in table.columns['counter']] == [0, 1, 2, 3, 4]
+
+def test_window_by_time_after_wrap():
+    ring_buffer = ApidRingBuffer('0x5', capacity=4)
+    ring_buffer.append_table(make_table(0, 10))
+
+    window = ring_buffer.get_window(START_TIME + np.timedelta64(7, 's'), START_TIME + np.timedelta64(8, 's'))
+    assert window.columns['counter'].tolist() == [7, 8]
@@ -0,0 +1,65 @@
+import os
+import pickle
+import shutil
+
+from space_packets_pkg.CatalogCache import CatalogCache
+from space_packets_pkg.CatalogDataReader import CatalogDataReader, DOCUMENT_FOLDER_PATH
+from space_packets_pkg.FileRepository import FileRepository
+
+DOCUMENT_FILE_NAME = 'sport_ttc_20220814.ods'
+
+def make_catalog_cache(tmp_path) -> CatalogCache:
+    """Cache of a copy of the main document, both in a temporary folder."""
+    document_folder = tmp_path / 'documents'
+    if not document_folder.exists():
+        document_folder.mkdir()
+        shutil.copy(os.path.join(DOCUMENT_FOLDER_PATH, DOCUMENT_FILE_NAME), document_folder)
+    catalog_reader = CatalogDataReader()
+    catalog_reader.file_repo = FileRepository(str(document_folder))
+    return CatalogCache(catalog_reader, str(tmp_path / 'cache'))
+
+def touch_document(catalog_cache: CatalogCache, seconds_later: int = 10) -> None:
+    document_path = catalog_cache.catalog_reader.file_repo.get_file_path_from_file_name(DOCUMENT_FILE_NAME)
+    stat = os.stat(document_path)
+    os.utime(document_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds_later*10**9))
+
+def test_cache_is_built_once_and_shared(tmp_path, capsys):
+    catalog_cache = make_catalog_cache(tmp_path)
+    assert not catalog_cache.is_fresh(DOCUMENT_FILE_NAME)
+
+    main_tm_df, main_dd_df = catalog_cache.get_catalog(DOCUMENT_FILE_NAME)
+    assert capsys.readouterr().out.count("Building catalog cache") == 1
+    assert not main_tm_df.empty and not main_dd_df.empty
+
+    other_process_cache = make_catalog_cache(tmp_path)
+    assert other_process_cache.warm_in_background(DOCUMENT_FILE_NAME)  # already fresh, nothing to start
+    other_tm_df, other_dd_df = other_process_cache.get_catalog(DOCUMENT_FILE_NAME)
+    assert capsys.readouterr().out == ''
+    assert other_tm_df.equals(main_tm_df) and list(other_dd_df['apid']) == list(main_dd_df['apid'])
+
+def test_changed_document_invalidates_memory_and_folder(tmp_path, capsys):
+    catalog_cache = make_catalog_cache(tmp_path)
+    catalog_cache.get_catalog(DOCUMENT_FILE_NAME)
+    old_signature = catalog_cache.source_signature(DOCUMENT_FILE_NAME)
+
+    touch_document(catalog_cache)
+    assert not catalog_cache.is_fresh(DOCUMENT_FILE_NAME)
+    assert not make_catalog_cache(tmp_path).is_fresh(DOCUMENT_FILE_NAME)
+    capsys.readouterr()
+
+    catalog_cache.get_catalog(DOCUMENT_FILE_NAME)
+    assert "Building catalog cache" in capsys.readouterr().out
+    with open(catalog_cache.cache_path(DOCUMENT_FILE_NAME), 'rb') as f:
+        cached = pickle.load(f)
+    assert cached['signature'] == catalog_cache.source_signature(DOCUMENT_FILE_NAME) != old_signature
+    assert make_catalog_cache(tmp_path).is_fresh(DOCUMENT_FILE_NAME)
+
+def test_cache_of_another_format_is_ignored(tmp_path):
+    catalog_cache = make_catalog_cache(tmp_path)
+    catalog_cache.get_catalog(DOCUMENT_FILE_NAME)
+    with open(catalog_cache.cache_path(DOCUMENT_FILE_NAME), 'rb') as f:
+        cached = pickle.load(f)
+    with open(catalog_cache.cache_path(DOCUMENT_FILE_NAME), 'wb') as f:
+        pickle.dump(dict(cached, format=cached['format'] - 1), f)
+
+    assert not make_catalog_cache(tmp_path).is_fresh(DOCUMENT_FILE_NAME)
@@ -0,0 +1,88 @@
+import pandas as pd
+
+from space_packets_pkg.CatalogSearchIndex import CatalogSearchIndex
+
+def make_field(field: str, unit: str | None, observation: str | None = None) -> dict:
+    return {'field': field, 'unit': unit, 'data_format': None if unit is None else 'UINT', 'observation': observation}
+
+def make_main_dd_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        'apid': ['0x5', '0x14'],
+        'data_name': ['DD_HOU_EPS_1', 'DD_HOU_ADCS'],
+        'data_packets': [
+            [
+                make_field('Output current of 12V bus', 'A'),
+                make_field('Output voltage of 12V bus', 'V'),
+                make_field('BCR output current', 'A', 'Battery charge regulator'),
+                make_field('Battery', None),
+                make_field('Temperature', 'degC'),
+            ],
+            [
+                make_field('Wheel speed', 'rpm', 'Measured by the 12V current sensor of the wheel'),
+                make_field('Epsilon angle', 'deg'),
+            ],
+        ],
+    })
+
+def make_search_index() -> CatalogSearchIndex:
+    return CatalogSearchIndex(make_main_dd_df())
+
+def test_fields_are_indexed_with_their_column_names():
+    entries = make_search_index().entries
+
+    assert entries['field'].tolist() == [
+        'Output current of 12V bus (A)', 'Output voltage of 12V bus (V)', 'BCR output current (A)',
+        'Battery Temperature (degC)', 'Wheel speed (rpm)', 'Epsilon angle (deg)',
+    ]
+
+def test_name_matches_rank_before_observation_matches():
+    results = make_search_index().search('12V current')
+
+    assert results['field'].iloc[0] == 'Output current of 12V bus (A)'
+    assert results['field'].tolist().index('Wheel speed (rpm)') > results['field'].tolist().index('Output current of 12V bus (A)')
+    assert results['score'].is_monotonic_decreasing
+
+def test_prefix_and_typo_queries():
+    search_index = make_search_index()
+
+    assert search_index.search('volt')['field'].iloc[0] == 'Output voltage of 12V bus (V)'
+    assert search_index.search('temprature')['field'].iloc[0] == 'Battery Temperature (degC)'
+
+def test_whole_word_breaks_ties_and_apids_filter():
+    search_index = make_search_index()
+
+    assert search_index.search('eps')['apid'].iloc[0] == '0x5'  # the EPS data name before 'epsilon'
+    assert search_index.search('current', apids=['0x14'])['field'].tolist() == ['Wheel speed (rpm)']
+    assert search_index.search('').empty
+    assert search_index.search('zzzz').empty
+
+class FakeCatalogCache:
+    """Catalog cache whose documents all hold the fields of make_main_dd_df, counting the catalogs read."""
+    def __init__(self) -> None:
+        self.main_dd_df = make_main_dd_df()
+        self.catalogs_read = []
+
+    def source_signature(self, file_name: str) -> tuple:
+        return (file_name, 0, 0)
+
+    def get_catalog(self, file_name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        self.catalogs_read.append(file_name)
+        return pd.DataFrame(), self.main_dd_df
+
+def test_dashboard_keeps_the_recently_used_search_indexes(monkeypatch):
+    import app
+
+    catalog_cache = FakeCatalogCache()
+    monkeypatch.setattr(app, 'get_catalog_cache', lambda: catalog_cache)
+    monkeypatch.setattr(app, 'catalog_search_indexes', app.OrderedDict())
+    monkeypatch.setattr(app, 'MAX_CATALOG_SEARCH_INDEXES', 2)
+
+    first_index = app.get_catalog_search_index('a.ods')
+    app.get_catalog_search_index('b.ods')
+    assert app.get_catalog_search_index('a.ods') is first_index  # a is now the most recently used
+    app.get_catalog_search_index('c.ods')  # drops b
+    app.get_catalog_search_index('a.ods')
+    app.get_catalog_search_index('b.ods')
+
+    assert catalog_cache.catalogs_read == ['a.ods', 'b.ods', 'c.ods', 'b.ods']
+    assert [file_name for file_name, _ in app.catalog_search_indexes] == ['a.ods', 'b.ods']
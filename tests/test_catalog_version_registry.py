@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.CatalogVersionRegistry import CatalogVersionRegistry
+
+OLD_VERSION = 'sport_ttc_20220101.ods'
+NEW_VERSION = 'sport_ttc_20230101.ods'
+
+def make_dd_df(apid_fields: dict[str, list[tuple[str, int, str]]]) -> pd.DataFrame:
+    data_packets = [[{'field': name, 'lenght(bits)': float(bits), 'format': data_format, 'conversion': 'N/A', 'unit': 'N/A'}
+                     for name, bits, data_format in fields] for fields in apid_fields.values()]
+    return pd.DataFrame({'apid': list(apid_fields), 'data_packets': data_packets})
+
+def make_registry(tmp_path, max_plans: int = 256) -> CatalogVersionRegistry:
+    """Two dated documents: the old one reads 'counter' as 8 bits, the new one as 16 bits and adds the apid 0x6.
+    Their sheets are put in the catalog cache as if the documents had been parsed."""
+    catalogs = {
+        OLD_VERSION: make_dd_df({'0x5': [('counter', 8, 'uint8')]}),
+        NEW_VERSION: make_dd_df({'0x5': [('counter', 16, 'uint16')], '0x6': [('mode', 8, 'uint8')]}),
+    }
+    for file_name in [*catalogs, 'sport_ttc_notes.ods', 'sport_ttc_20221399.ods']:
+        (tmp_path / file_name).write_bytes(b'')
+
+    catalog_versions = CatalogVersionRegistry(str(tmp_path), max_plans=max_plans)
+    catalog_cache = catalog_versions.catalog_cache
+    for file_name, main_dd_df in catalogs.items():
+        catalog_cache.catalogs[file_name] = (catalog_cache.source_signature(file_name), (pd.DataFrame(), main_dd_df))
+    return catalog_versions
+
+def test_only_dated_documents_are_versions(tmp_path):
+    assert make_registry(tmp_path).get_version_names() == [OLD_VERSION, NEW_VERSION]
+
+def test_version_in_force_at_each_time(tmp_path):
+    catalog_versions = make_registry(tmp_path)
+    times = np.array(['2021-06-01', '2022-01-01', '2022-12-31T23:59:59.999', '2023-01-01', '2024-05-05', 'NaT'], dtype='datetime64[ns]')
+
+    assert catalog_versions.select_version_indices(times).tolist() == [0, 0, 0, 1, 1, 1]
+    assert catalog_versions.select_version(np.datetime64('2021-06-01')) == OLD_VERSION  # before the first version
+    assert catalog_versions.select_version(np.datetime64('2023-01-01')) == NEW_VERSION  # on the boundary
+    assert catalog_versions.select_version(None) == NEW_VERSION
+
+def test_packets_are_decoded_with_their_version_in_order(tmp_path):
+    catalog_versions = make_registry(tmp_path)
+    times = np.array(['2023-02-01', '2022-06-01', '2023-01-01', '2021-01-01'], dtype='datetime64[ns]')
+    data_list = [b'\x01\x02', b'\x01\x02', b'\x00\x05', b'\x07\x00']
+
+    apid_table = catalog_versions.decode_packets('0x5', data_list, times)
+    assert apid_table.time.tolist() == times.tolist()
+    assert apid_table.columns['counter (N/A)'].tolist() == [0x0102, 0x01, 0x0005, 0x07]
+
+    mode_table = catalog_versions.decode_packets('0x6', [b'\x03', b'\x04'], times[:2])
+    assert mode_table.columns['mode (N/A)'].tolist() == [3]  # the old version does not have the apid
+    assert catalog_versions.decode_packets('0x6', [b'\x04'], times[1:2]) is None
+
+def test_decoder_plans_are_kept_in_a_lru(tmp_path):
+    catalog_versions = make_registry(tmp_path, max_plans=2)
+    old_plan = catalog_versions.get_decoder_plan(OLD_VERSION, '0x5')
+    new_plan = catalog_versions.get_decoder_plan(NEW_VERSION, '0x5')
+    assert catalog_versions.get_decoder_plan(OLD_VERSION, '0x5') is old_plan  # used last, the new one is the oldest now
+
+    catalog_versions.get_decoder_plan(NEW_VERSION, '0x6')
+    assert list(catalog_versions.decoder_plans) == [(OLD_VERSION, '0x5'), (NEW_VERSION, '0x6')]
+    assert catalog_versions.get_decoder_plan(NEW_VERSION, '0x5') is not new_plan
+    assert catalog_versions.get_decoder_plan(OLD_VERSION, '0x6') is None
+    assert len(catalog_versions.decoder_plans) == 2
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from space_packets_pkg.DecodedDataCache import DecodedDataCache
+from space_packets_pkg.DecodeJobQueue import DecodeJobQueue
+
+WAIT_SECONDS = 10
+
+def wait_until_finished(job) -> None:
+    deadline = time.time() + WAIT_SECONDS
+    while not job.is_finished():
+        assert time.time() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+
+def test_identical_submissions_share_one_job():
+    release = threading.Event()
+    calls = []
+
+    def decode(job):
+        calls.append(job.job_id)
+        release.wait(WAIT_SECONDS)
+        return 'result'
+
+    decode_jobs = DecodeJobQueue(max_workers=1)
+    first = decode_jobs.submit('key', decode, 'dump')
+    second = decode_jobs.submit('key', decode, 'dump')
+    other = decode_jobs.submit('other key', decode, 'other dump')
+    assert second is first and first.subscribers == 2
+    assert other is not first
+
+    release.set()
+    wait_until_finished(first)
+    wait_until_finished(other)
+    assert first.status == 'done' and first.result == 'result'
+    assert len(calls) == 2
+
+def test_job_is_cancelled_when_no_subscriber_is_left():
+    started = threading.Event()
+
+    def decode(job):
+        started.set()
+        while True:
+            job.report_progress('decoding', 0, 1)
+
+    decode_jobs = DecodeJobQueue(max_workers=1)
+    job = decode_jobs.submit('key', decode)
+    decode_jobs.submit('key', decode)
+    assert started.wait(WAIT_SECONDS)
+
+    assert not decode_jobs.cancel(job.job_id)  # one subscriber is still waiting
+    assert not job.cancel_event.is_set()
+    assert decode_jobs.cancel(job.job_id)
+    wait_until_finished(job)
+    assert job.status == 'cancelled'
+
+def test_queued_job_is_cancelled_before_it_runs():
+    release = threading.Event()
+    decode_jobs = DecodeJobQueue(max_workers=1)
+    running = decode_jobs.submit('running', lambda job: release.wait(WAIT_SECONDS))
+    queued = decode_jobs.submit('queued', lambda job: 'never')
+
+    assert decode_jobs.cancel(queued.job_id)
+    assert queued.status == 'cancelled'
+    release.set()
+    wait_until_finished(running)
+    assert queued.result is None
+
+def test_failed_decode_keeps_the_error():
+    def decode(job):
+        raise ValueError("bad dump")
+
+    decode_jobs = DecodeJobQueue(max_workers=1)
+    job = decode_jobs.submit('key', decode, 'dump')
+    wait_until_finished(job)
+
+    assert job.status == 'failed'
+    assert 'bad dump' in job.error and job.get_progress()['error'] == job.error
+    assert decode_jobs.submit('key', decode) is not job  # a finished job is not shared
+
+def test_job_waiting_on_another_worker_lock_can_be_cancelled(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path))
+    assert decoded_data_cache._acquire_lock('key')  # another worker of this process is computing the key
+    waiting = threading.Event()
+
+    def decode(job):
+        def progress_callback(stage, done, total):
+            waiting.set()
+            job.report_progress(stage, done, total)
+        return decoded_data_cache.get_or_compute('key', lambda: 'computed', progress_callback)
+
+    decode_jobs = DecodeJobQueue(max_workers=1)
+    job = decode_jobs.submit('key', decode)
+    assert waiting.wait(WAIT_SECONDS)
+    assert job.get_progress()['stage'] == 'waiting'
+
+    assert decode_jobs.cancel(job.job_id)
+    wait_until_finished(job)
+    assert job.status == 'cancelled'
+    assert decoded_data_cache.is_locked('key') and not decoded_data_cache.contains('key')
@@ -0,0 +1,124 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from space_packets_pkg.DecodedDataCache import DecodedDataCache
+
+def write_lock(decoded_data_cache: DecodedDataCache, key: str, host_name: str, pid: int) -> str:
+    """A lock file as another worker leaves it, returns its path."""
+    lock_path = decoded_data_cache._lock_path(key)
+    with open(lock_path, 'w') as f:
+        f.write(f"{host_name} {pid}")
+    return lock_path
+
+def get_dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def test_hit_and_miss(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'rows': [1, 2, 3]}
+
+    assert decoded_data_cache.get_or_compute('key', compute) == {'rows': [1, 2, 3]}
+    assert decoded_data_cache.get_or_compute('key', compute) == {'rows': [1, 2, 3]}
+    assert DecodedDataCache(str(tmp_path)).get_or_compute('key', compute) == {'rows': [1, 2, 3]}  # another worker
+    assert len(calls) == 1
+    assert decoded_data_cache.get_stats() == {'hits': 1, 'misses': 1, 'waits': 0}
+    assert decoded_data_cache.contains('key') and not decoded_data_cache.is_locked('key')
+
+def test_key_changes_with_the_source_files(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path / 'cache'))
+    dump_path = tmp_path / 'dump.out'
+    dump_path.write_text('0800')
+    key = decoded_data_cache.make_key([str(dump_path)], catalog='a.ods')
+
+    assert decoded_data_cache.make_key([str(dump_path)], catalog='a.ods') == key
+    assert decoded_data_cache.make_key([str(dump_path)], catalog='b.ods') != key
+    dump_path.write_text('0800ff')
+    assert decoded_data_cache.make_key([str(dump_path)], catalog='a.ods') != key
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path), max_bytes=10**9)
+    for age, key in enumerate(['newest', 'read', 'oldest']):
+        decoded_data_cache.store(key, bytes(1000))
+        os.utime(decoded_data_cache.entry_path(key), (time.time() - 100*(age + 1),)*2)
+    decoded_data_cache.load('read')  # reading an entry makes it the most recently used
+
+    decoded_data_cache.max_bytes = 2500
+    decoded_data_cache.evict()
+    assert not decoded_data_cache.contains('oldest')
+    assert decoded_data_cache.contains('newest') and decoded_data_cache.contains('read')
+
+    decoded_data_cache.max_bytes = 1500
+    decoded_data_cache.evict()
+    assert [decoded_data_cache.contains(key) for key in ['newest', 'read']] == [False, True]
+
+def test_lock_of_a_dead_process_is_taken_over(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path))
+    write_lock(decoded_data_cache, 'key', socket.gethostname(), get_dead_pid())
+
+    assert decoded_data_cache.get_or_compute('key', lambda: 'computed') == 'computed'
+    assert decoded_data_cache.get_stats()['waits'] == 1
+    assert not decoded_data_cache.is_locked('key')
+
+def test_lock_without_heartbeat_is_taken_over_only_after_the_timeout(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path), lock_timeout=60)
+    lock_path = write_lock(decoded_data_cache, 'key', 'other-host', 1)
+    assert decoded_data_cache._is_lock_owner_alive(lock_path)  # a process on another host can not be checked
+
+    waited = []
+    def progress_callback(stage, done, total):
+        waited.append(stage)
+        if len(waited) == 3:
+            os.utime(lock_path, (time.time() - 61,)*2)  # the owner stops touching its lock
+
+    assert decoded_data_cache.get_or_compute('key', lambda: 'computed', progress_callback) == 'computed'
+    assert waited == ['waiting']*3
+
+def test_live_lock_owner_with_heartbeat_is_waited_for(tmp_path):
+    decoded_data_cache = DecodedDataCache(str(tmp_path), lock_timeout=0.3)
+    other_worker = DecodedDataCache(str(tmp_path), lock_timeout=0.3)
+    computing = threading.Event()
+
+    def slow_compute():
+        computing.set()
+        time.sleep(1.0)  # longer than lock_timeout, the heartbeat keeps the lock fresh
+        return 'from the other worker'
+
+    thread = threading.Thread(target=other_worker.get_or_compute, args=('key', slow_compute))
+    thread.start()
+    assert computing.wait(10)
+    assert decoded_data_cache.get_or_compute('key', lambda: 'computed twice') == 'from the other worker'
+    thread.join()
+
+def test_concurrent_get_or_compute_computes_once(tmp_path):
+    calls = []
+    barrier = threading.Barrier(6)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    def worker():
+        decoded_data_cache = DecodedDataCache(str(tmp_path))
+        barrier.wait()
+        results.append(decoded_data_cache.get_or_compute('key', compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value']*6
+    assert len(calls) == 1
@@ -0,0 +1,25 @@
+from space_packets_pkg.DecoderRegressionHarness import DecoderRegressionHarness, plan_engine
+
+def test_plan_engine_matches_the_golden_files(sport_catalog):
+    harness = DecoderRegressionHarness(*sport_catalog)
+
+    mismatches = harness.compare(plan_engine)
+    assert mismatches.empty, mismatches.to_string()
+
+def test_known_differences_are_still_reported_for_other_dumps(sport_catalog):
+    harness = DecoderRegressionHarness(*sport_catalog)
+    expected = {'0x14': {'time': [], 'columns': {}}}
+    got = {'0x14': {'time': [], 'columns': {}}, '0x15': {'time': [], 'columns': {}}}
+
+    mismatches = harness.compare_outputs('other.out', expected, got)
+    known_differences = harness.load_known_differences()
+    assert [mismatch['kind'] for mismatch in mismatches] == ['extra_apid']
+    assert harness.is_known_difference(mismatches[0], known_differences['bus_housekeeping.out'])
+    assert not harness.is_known_difference(mismatches[0], known_differences.get('other.out', []))
+
+def test_plan_engine_matches_the_reference_on_random_streams(sport_catalog, capsys):
+    harness = DecoderRegressionHarness(*sport_catalog)
+
+    mismatches = harness.fuzz(plan_engine, iterations=3, packets_per_stream=60, seed=100)
+    assert mismatches.empty, mismatches.to_string()
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from space_packets_pkg.DerivedParameterEngine import DerivedParameterEngine
+
+def make_frame(seconds: list[float], **columns) -> pd.DataFrame:
+    times = pd.Timestamp('2024-01-01') + pd.to_timedelta(seconds, unit='s')
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(times, name='time'))
+
+def test_fields_of_other_apids_are_joined_on_the_first_apid_times():
+    apid_frames = {
+        '0x5': make_frame([0, 10, 20, 30], **{'Voltage (V)': [8.0, 8.1, 8.2, 8.3]}),
+        '0x6': make_frame([1, 9, 25], **{'Current (A)': [1.0, 2.0, 3.0]}),
+    }
+    engine = DerivedParameterEngine(tolerance=pd.Timedelta(seconds=6))
+
+    power = engine.evaluate('Power (W)', '[Voltage (V)] * [Current (A)]', apid_frames)
+    assert list(power.index) == list(apid_frames['0x5'].index)
+    # 0 s: no current before it, 10 s: the one of 9 s, 20 s: 9 s is too old, 30 s: the one of 25 s
+    np.testing.assert_allclose(power.to_numpy(), [np.nan, 8.1*2.0, np.nan, 8.3*3.0])
+
+def test_apid_prefix_resolves_fields_with_the_same_name():
+    apid_frames = {
+        '0x5': make_frame([0, 10], **{'Temperature (C)': [20.0, 21.0]}),
+        '0x6': make_frame([0, 10], **{'Temperature (C)': [30.0, 32.0]}),
+    }
+    engine = DerivedParameterEngine()
+
+    values, errors = engine.evaluate_all({
+        'Difference': '[0x6:Temperature (C)] - [0x5:Temperature (C)]',
+        'Ambiguous': '[Temperature (C)] + 1',
+        'Missing': '[Pressure (Pa)] * 2',
+    }, apid_frames)
+    assert values['Difference'].tolist() == [10.0, 11.0]
+    assert 'write it as [apid:Temperature (C)]' in errors['Ambiguous']
+    assert 'is not loaded' in errors['Missing']
+
+def test_only_arithmetic_expressions_are_accepted():
+    engine = DerivedParameterEngine()
+
+    assert list(engine.parse_parameters("# comment\nDouble = 2 * [Voltage (V)]\n")) == ['Double']
+    for text in ["Bad = __import__('os')", "Bad = [Voltage (V)].real", "Bad = 2 + 2", "no separator"]:
+        with pytest.raises(ValueError):
+            engine.parse_parameters(text)
+
+def test_history_rows_of_apids_and_derived_parameters_match_by_time():
+    import app
+
+    voltage_df = make_frame([0, 10, 20], **{'Voltage (V)': [8.0, 8.1, 8.2]})
+    current_df = make_frame([5, 10], **{'Current (A)': [1.0, 2.0]})
+    derived_df = make_frame([0, 10, 20], **{'Power (W)': [np.nan, 16.2, np.nan]})
+    history_dfs = [df.rename_axis('time').reset_index() for df in (voltage_df, current_df, derived_df)]
+
+    history_df = app.merge_history_on_time(history_dfs)
+    assert list(history_df.columns) == ['time', 'Voltage (V)', 'Current (A)', 'Power (W)']
+    assert history_df['time'].is_monotonic_increasing and history_df['time'].is_unique
+    assert len(history_df) == 4
+    row = history_df[history_df['time'] == pd.Timestamp('2024-01-01 00:00:10')].iloc[0]
+    assert (row['Voltage (V)'], row['Current (A)'], row['Power (W)']) == (8.1, 2.0, 16.2)
+    assert app.merge_history_on_time([]).empty
@@ -0,0 +1,46 @@
+import socket
+from datetime import datetime
+
+import numpy as np
+
+from space_packets_pkg.DumpReplayer import DumpReplayer, MAX_REPLAY_GAP_SECONDS
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer
+
+def test_send_delays_follow_the_packet_times(make_packet):
+    gps_ms = [1_000, 3_000, 2_000, 2_500, 2_500 + 60_000]  # a clock reset, then a gap longer than the limit
+    packets = [make_packet(0x5, i, bytes(4), gps_ms=ms) for i, ms in enumerate(gps_ms)]
+    packets.insert(2, make_packet(0x14, 9, bytes(4), secondary_header=False))
+
+    delays = DumpReplayer().get_send_delays(packets, rate=2.0)
+    assert delays.tolist() == [0.0, 1.0, 0.0, 0.0, 0.25, MAX_REPLAY_GAP_SECONDS/2]
+    assert DumpReplayer().get_send_delays(packets, rate=None).tolist() == [0.0]*6
+    assert len(DumpReplayer().get_send_delays([], rate=1.0)) == 0
+
+def test_restamp_rewrites_the_secondary_header_and_keeps_a_valid_checksum(make_packet):
+    replayer = DumpReplayer()
+    packet = make_packet(0x5, 7, bytes(range(10)), gps_ms=1234)
+    emission_time = datetime(2024, 3, 1, 12, 30, 15, 250000)
+
+    restamped = replayer.restamp_packet(packet, emission_time)
+    primary_header, secondary_header, data, _ = SpacePacketFramer().split_packet(restamped)
+    assert restamped[:6] == packet[:6] and data == bytes(range(10))
+    assert replayer.data_converter.secondary_headers_to_datetime64([secondary_header])[0] == np.datetime64(emission_time, 'ns')
+    assert PacketChecksum().is_valid(restamped) and restamped != packet
+
+def test_restamp_leaves_packets_without_secondary_header(make_packet):
+    packet = make_packet(0x14, 1, bytes(6), secondary_header=False)
+    assert DumpReplayer().restamp_packet(packet, datetime(2024, 3, 1)) == packet
+
+def test_replay_reports_through_the_callback_only(make_packet, capsys):
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(5)
+    packets = [make_packet(0x5, i, bytes(8), gps_ms=i*1000) for i in range(3)]
+
+    report = DumpReplayer().replay(packets, f"udp://127.0.0.1:{receiver.getsockname()[1]}", rate=None)
+    received = [receiver.recv(4096) for _ in packets]
+    receiver.close()
+    assert received == packets
+    assert report['packets'] == 3 and report['bytes'] == sum(len(packet) for packet in packets)
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+
+from space_packets_pkg.ApidDecoderPlan import ApidDecoderPlan
+from space_packets_pkg.DataConverter import DataConverter
+
+FLOAT32_PATTERNS = [
+    0x3F800000,  # 1.0
+    0xC0200000,  # -2.5
+    0x7F7FFFFF,  # largest normal
+    0x00800000,  # smallest normal
+    0x00000000,  # 0
+    0x80000000,  # -0
+    0x00000001,  # smallest denormal
+    0x807FFFFF,  # largest negative denormal
+    0x7F800000,  # inf
+    0xFF800000,  # -inf
+    0x7FC00000,  # quiet NaN
+    0x7F800001,  # signaling NaN
+    0xFFFFFFFF,  # negative NaN with all the payload bits
+]
+
+def same_float(expected: float, got) -> bool:
+    got = float(got)
+    if math.isnan(expected):
+        return math.isnan(got)
+    return got == expected and math.copysign(1, got) == math.copysign(1, expected)
+
+def to_binary_str(pattern: int) -> str:
+    return format(pattern, '032b')
+
+def get_expected_values() -> list[float]:
+    data_converter = DataConverter()
+    return [data_converter.binary_to_value(to_binary_str(pattern), 'float') for pattern in FLOAT32_PATTERNS]
+
+def test_float32_words_to_array_matches_binary_to_value():
+    expected = get_expected_values()
+    values = DataConverter().float32_words_to_array(np.array(FLOAT32_PATTERNS, dtype=np.uint32))
+
+    assert values.dtype == np.float32
+    assert all(same_float(expected_value, value) for expected_value, value in zip(expected, values))
+    with np.errstate(invalid='raise'):
+        values.astype(np.float64)  # no signaling NaN is left
+
+def test_float32_fields_to_array_matches_binary_to_value():
+    data_converter = DataConverter()
+    field_bytes = np.frombuffer(np.array(FLOAT32_PATTERNS[:12], dtype='>u4').tobytes(), dtype=np.uint8).reshape(4, 12)
+    expected = [data_converter.binary_to_value(''.join(to_binary_str(pattern) for pattern in FLOAT32_PATTERNS[i:i+3]), 'vector3')
+                for i in range(0, 12, 3)]
+
+    values = data_converter.float32_fields_to_array(field_bytes, (3,))
+    assert values.shape == (4, 3)
+    assert all(same_float(expected_value, value) for expected_row, row in zip(expected, values) for expected_value, value in zip(expected_row, row))
+
+def test_decoder_plan_float_fields_match_binary_to_value():
+    apid_linked_dd = [
+        {'field': 'value', 'lenght(bits)': 32.0, 'format': 'float', 'conversion': 'N/A', 'unit': 'N/A'},
+        {'field': 'pair', 'lenght(bits)': 64.0, 'format': 'vector2', 'conversion': 'N/A', 'unit': 'N/A'},
+    ]
+    data_list = [pattern.to_bytes(4, 'big') + FLOAT32_PATTERNS[-1 - i].to_bytes(4, 'big') + pattern.to_bytes(4, 'big')
+                 for i, pattern in enumerate(FLOAT32_PATTERNS)]
+    times = np.full(len(data_list), np.datetime64('2024-01-01T00:00:00', 'ns'))
+
+    apid_table = ApidDecoderPlan('0x5', apid_linked_dd).decode_packets(data_list, times)
+    expected = get_expected_values()
+    assert all(same_float(expected_value, value) for expected_value, value in zip(expected, apid_table.columns['value (N/A)']))
+    assert all(same_float(expected[-1 - i], pair[0]) and same_float(expected[i], pair[1]) for i, pair in enumerate(apid_table.columns['pair (N/A)']))
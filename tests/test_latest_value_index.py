@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.LatestValueIndex import LatestValueIndex
+
+T0 = pd.Timestamp('2024-01-01 00:00:00')
+T1 = pd.Timestamp('2024-01-01 00:00:01')
+T2 = pd.Timestamp('2024-01-01 00:00:02')
+
+def test_only_newer_or_equal_times_replace_a_value():
+    latest_values = LatestValueIndex()
+    latest_values.update('0x5', 'current', T1, 1.0)
+    latest_values.update('0x5', 'current', T0, 0.0)  # older packet arriving late
+    assert latest_values.latest_values[('0x5', 'current')] == (T1, 1.0)
+
+    latest_values.update('0x5', 'current', T1, 1.5)
+    latest_values.update('0x5', 'current', T2, 2.0)
+    assert latest_values.latest_values[('0x5', 'current')] == (T2, 2.0)
+
+def test_nat_times_never_replace_a_timed_value():
+    latest_values = LatestValueIndex()
+    latest_values.update('0x5', 'current', pd.NaT, 0.0)
+    latest_values.update('0x5', 'current', T0, 1.0)  # a timed value replaces one without time
+    latest_values.update('0x5', 'current', pd.NaT, 2.0)
+    assert latest_values.latest_values[('0x5', 'current')] == (T0, 1.0)
+
+def test_update_from_apid_df_takes_the_last_valid_row_of_each_field():
+    fields_apid_df = pd.DataFrame({
+        'current': [3.0, 1.0, np.nan],
+        'voltage': [np.nan, np.nan, np.nan],
+        'mode': ['a', 'c', 'b'],
+    }, index=pd.DatetimeIndex([T2, T0, T1], name='time'))
+    latest_values = LatestValueIndex()
+    latest_values.update_from_apid_df('0x5', fields_apid_df)
+    latest_values.update_from_packet('0x5', T0, {'voltage': np.nan, 'mode': 'old'})
+
+    assert latest_values.get_snapshot_df({'0x5': ['current', 'voltage', 'mode']}).values.tolist() == [
+        ['current', 3.0, T2],
+        ['mode', 'a', T2],
+    ]
+
+def test_records_round_trip():
+    latest_values = LatestValueIndex()
+    latest_values.update('0x5', 'current', T1, np.float32(1.5))
+    latest_values.update('0x5', 'vector', T1, np.array([1.0, 2.0, 3.0]))
+    latest_values.update('0x14', 'mode', pd.NaT, 'safe')
+    latest_values.update('0x14', 'flag', T2, None)
+
+    records = latest_values.to_records()
+    assert records == [
+        ['0x5', 'current', T1.isoformat(), 1.5],
+        ['0x5', 'vector', T1.isoformat(), [1.0, 2.0, 3.0]],
+        ['0x14', 'mode', None, 'safe'],
+        ['0x14', 'flag', T2.isoformat(), None],
+    ]
+    rebuilt = LatestValueIndex.from_records(records)
+    assert rebuilt.to_records() == records
+    assert pd.isna(rebuilt.latest_values[('0x14', 'mode')][0])
+    assert rebuilt.to_current_state_dict(['0x14']) == {'0x14': {'mode': {'time': None, 'value': 'safe'}, 'flag': {'time': T2.isoformat(), 'value': None}}}
+
+def test_current_state_without_live_telemetry_needs_a_file():
+    import app
+
+    response = app.app.server.test_client().get('/api/current-state?apid=0x5')
+    assert response.status_code == 400
+    assert 'file is required' in response.get_json()['error']
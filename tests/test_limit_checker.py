@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.LimitChecker import LimitChecker, LIMIT_INTERVAL_COLUMNS
+
+TIMES = pd.date_range('2024-01-01', periods=6, freq='s', name='time')
+
+def make_limits_df(limits: dict) -> pd.DataFrame:
+    return pd.DataFrame.from_dict(limits, orient='index', columns=['nominal_minimum', 'nominal_maximum']).astype(float)
+
+def test_missing_limits_and_samples_are_not_violations():
+    fields_df = pd.DataFrame({
+        'only_min': [0.0, 5.0, 100.0, np.nan, -1.0, 2.0],
+        'only_max': [0.0, 5.0, 100.0, np.nan, -1.0, 2.0],
+        'no_limits': [1e9, -1e9, 0.0, 0.0, 0.0, 0.0],
+        'not_checked': [1e9, -1e9, 0.0, 0.0, 0.0, 0.0],
+    }, index=TIMES)
+    limits_df = make_limits_df({'only_min': (1.0, np.nan), 'only_max': (np.nan, 10.0), 'no_limits': (np.nan, np.nan)})
+
+    summary_df, intervals_df = LimitChecker().check_limits(fields_df, limits_df)
+    summary = summary_df.set_index('Field')
+    assert list(summary.index) == ['only_min', 'only_max', 'no_limits']
+    assert summary.loc['only_min', ['Samples', 'Below Min', 'Above Max', 'Violations']].tolist() == [5, 2, 0, 2]
+    assert summary.loc['only_max', ['Samples', 'Below Min', 'Above Max', 'Violations']].tolist() == [5, 0, 1, 1]
+    assert summary.loc['no_limits', 'Violations'] == 0
+    assert pd.isna(summary.loc['no_limits', 'First Violation']) and pd.isna(summary.loc['no_limits', 'Last Violation'])
+    assert summary.loc['only_min', 'First Violation'] == TIMES[0]
+    assert summary.loc['only_min', 'Last Violation'] == TIMES[4]
+    assert intervals_df[['Field', 'Samples']].values.tolist() == [['only_min', 1], ['only_min', 1], ['only_max', 1]]
+
+def test_back_to_back_violations_are_one_interval_and_the_last_row_closes_it():
+    fields_df = pd.DataFrame({
+        'current': [20.0, -20.0, 20.0, 0.0, 0.0, 20.0],  # above, below, above: one run of three
+        'voltage': [0.0, 0.0, 0.0, 0.0, 9.0, 9.0],  # a run that ends on the last row
+    }, index=TIMES)
+    limits_df = make_limits_df({'current': (-10.0, 10.0), 'voltage': (0.0, 5.0)})
+
+    _, intervals_df = LimitChecker().check_limits(fields_df, limits_df)
+    assert list(intervals_df.columns) == LIMIT_INTERVAL_COLUMNS
+    assert intervals_df.values.tolist() == [
+        ['current', TIMES[0], TIMES[2], 3],
+        ['current', TIMES[5], TIMES[5], 1],
+        ['voltage', TIMES[4], TIMES[5], 2],
+    ]
+
+def test_get_violation_intervals_df_of_a_matrix():
+    violations = np.array([
+        [True, False],
+        [True, True],
+        [False, True],
+        [True, True],
+    ])
+    times = TIMES[:4].to_numpy()
+
+    intervals_df = LimitChecker().get_violation_intervals_df(violations, ['a', 'b'], times)
+    assert intervals_df[['Field', 'Samples']].values.tolist() == [['a', 2], ['a', 1], ['b', 3]]
+    assert intervals_df['Start'].tolist() == [TIMES[0], TIMES[3], TIMES[1]]
+    assert intervals_df['End'].tolist() == [TIMES[1], TIMES[3], TIMES[3]]
+
+def test_no_checked_fields_gives_empty_frames():
+    fields_df = pd.DataFrame({'current': [1.0]}, index=TIMES[:1])
+
+    summary_df, intervals_df = LimitChecker().check_limits(fields_df, make_limits_df({}))
+    assert summary_df.empty and intervals_df.empty
+    assert list(intervals_df.columns) == LIMIT_INTERVAL_COLUMNS
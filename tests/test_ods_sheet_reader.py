@@ -0,0 +1,55 @@
+import zipfile
+
+from space_packets_pkg.OdsSheetReader import OdsSheetReader
+
+CONTENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">
+<office:body><office:spreadsheet>
+<table:table table:name="TM_0x5">
+ <table:table-row>
+  <table:table-cell office:value-type="string"><text:p>name</text:p></table:table-cell>
+  <table:table-cell office:value-type="string"><text:p>a<text:s text:c="2"/>b</text:p></table:table-cell>
+  <table:table-cell table:number-columns-repeated="1000"/>
+ </table:table-row>
+ <table:table-row table:number-rows-repeated="2">
+  <table:table-cell office:value-type="float" office:value="7"/>
+  <table:table-cell/>
+  <table:table-cell office:value-type="boolean" office:boolean-value="true" table:number-columns-repeated="2"/>
+ </table:table-row>
+ <table:table-row table:number-rows-repeated="1048000"><table:table-cell table:number-columns-repeated="1024"/></table:table-row>
+</table:table>
+<table:table table:name="DD_0x5">
+ <table:table-row><table:table-cell office:value-type="date" office:date-value="2024-01-01T00:00:00"/></table:table-row>
+</table:table>
+<table:table table:name="Notes">
+ <table:table-row><table:table-cell office:value-type="string"><text:p>first</text:p><text:p>second</text:p></table:table-cell></table:table-row>
+</table:table>
+</office:spreadsheet></office:body></office:document-content>
+"""
+
+def write_document(tmp_path) -> str:
+    file_path = str(tmp_path / 'document.ods')
+    with zipfile.ZipFile(file_path, 'w') as ods_zip:
+        ods_zip.writestr('mimetype', 'application/vnd.oasis.opendocument.spreadsheet')
+        ods_zip.writestr('content.xml', CONTENT_XML)
+    return file_path
+
+def test_repeated_cells_and_rows_are_expanded_without_the_padding(tmp_path):
+    sheets = OdsSheetReader().read_sheets(write_document(tmp_path), sheet_names=['TM_0x5'])
+
+    assert list(sheets) == ['TM_0x5']
+    assert sheets['TM_0x5'].tolist() == [
+        ['name', 'a  b', None, None],
+        [7.0, None, True, True],
+        [7.0, None, True, True],
+    ]
+
+def test_sheets_by_name_prefix_and_names(tmp_path):
+    file_path = write_document(tmp_path)
+    reader = OdsSheetReader()
+
+    assert reader.get_sheet_names(file_path) == ['TM_0x5', 'DD_0x5', 'Notes']
+    assert list(reader.read_sheets(file_path, starts_with='DD_')) == ['DD_0x5']
+    sheets = reader.read_sheets(file_path, sheet_names=['Notes'], starts_with='DD_')
+    assert sheets['DD_0x5'].tolist() == [['2024-01-01T00:00:00']]
+    assert sheets['Notes'].tolist() == [['first\nsecond']]
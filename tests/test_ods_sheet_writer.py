@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.OdsSheetReader import OdsSheetReader
+from space_packets_pkg.OdsSheetWriter import OdsSheetWriter
+from space_packets_pkg.TelemetryExporter import TelemetryExporter
+
+def test_round_trip_of_the_cell_types(tmp_path):
+    file_path = str(tmp_path / 'round_trip.ods')
+    df = pd.DataFrame({
+        'time': pd.to_datetime(['2024-01-01 00:00:00.5', '2024-01-01 00:00:01.0'], format='ISO8601'),
+        'current (A)': [1.5, np.nan],
+        'mode': ['safe <&> "mode"', None],
+        'enabled': [True, False],
+        'counter': [np.int64(4), np.int64(-2)],
+    })
+    OdsSheetWriter(file_path).write_df(df, 'Telemetry')
+
+    sheets = OdsSheetReader().read_sheets(file_path)
+    assert sheets['Telemetry'].tolist() == [
+        ['time', 'current (A)', 'mode', 'enabled', 'counter'],
+        ['2024-01-01T00:00:00.500000', 1.5, 'safe <&> "mode"', True, 4.0],
+        ['2024-01-01T00:00:01', None, None, False, -2.0],
+    ]
+
+def test_non_finite_numbers_and_missing_times_are_empty_cells(tmp_path):
+    file_path = str(tmp_path / 'non_finite.ods')
+    df = pd.DataFrame({'a': [np.inf, -np.inf, np.nan, 1.0], 'b': [pd.NaT, pd.NaT, pd.NaT, pd.Timestamp('2024-01-02')]})
+    OdsSheetWriter(file_path).write_df(df)
+
+    assert OdsSheetReader().read_sheets(file_path)['Sheet1'].tolist() == [
+        ['a', 'b'],
+        [None, None],
+        [None, None],
+        [None, None],
+        [1.0, '2024-01-02T00:00:00'],
+    ]
+
+def test_rows_written_in_blocks_and_sheets(tmp_path):
+    file_path = str(tmp_path / 'blocks.ods')
+    writer = OdsSheetWriter(file_path)
+    writer.open()
+    writer.start_sheet('First')
+    writer.write_header(['value'])
+    for block in range(3):
+        writer.write_rows(pd.DataFrame({'value': [float(2*block), float(2*block + 1)]}))
+    writer.start_sheet('Second')
+    writer.write_header(['other'])
+    writer.close()
+
+    sheets = OdsSheetReader().read_sheets(file_path)
+    assert sheets['First'][:, 0].tolist() == ['value', 0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert sheets['Second'].tolist() == [['other']]
+
+def test_file_repository_round_trip(tmp_path):
+    (tmp_path / 'catalog.ods').touch()  # dump_file only writes over files of the repository
+    file_repo = FileRepository(str(tmp_path))
+    df = pd.DataFrame({'apid': ['0x5', '0x6'], 'length': [12.0, 30.0]})
+    file_repo.dump_file('catalog.ods', df)
+
+    read_df = file_repo.read_ods_document_by_sheet('catalog.ods', 'Sheet1')
+    assert read_df.values.tolist() == [['apid', 'length'], ['0x5', 12.0], ['0x6', 30.0]]
+
+def test_exported_chunks_round_trip(tmp_path):
+    file_path = str(tmp_path / 'export.ods')
+    chunks = [
+        pd.DataFrame({'time': pd.to_datetime(['2024-01-01 00:00:00']), 'apid': ['0x5'], 'value': [np.nan]}),
+        pd.DataFrame({'time': pd.to_datetime(['2024-01-01 00:00:01']), 'apid': ['0x5'], 'value': [2.5]}),
+    ]
+
+    assert TelemetryExporter().export(chunks, file_path) == 2
+    assert OdsSheetReader().read_sheets(file_path)['Telemetry'].tolist() == [
+        ['time', 'apid', 'value'],
+        ['2024-01-01T00:00:00', '0x5', None],
+        ['2024-01-01T00:00:01', '0x5', 2.5],
+    ]
@@ -0,0 +1,45 @@
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.TypedTelemetryStore import TypedTelemetryStore
+
+def test_crc16_ccitt_check_value():
+    assert PacketChecksum().crc16(b'123456789') == 0x29B1
+
+def test_corrupt_packets_are_rejected(make_packet, corrupt_packet):
+    packet_checksum = PacketChecksum()
+    packet = make_packet(0x5, 1, bytes(range(20)))
+
+    assert packet_checksum.is_valid(packet)
+    assert not packet_checksum.is_valid(corrupt_packet(packet, 10))
+    assert not packet_checksum.is_valid(corrupt_packet(packet, len(packet) - 1))
+    assert not packet_checksum.is_valid(b'\x00\x01')
+
+def test_validate_packets_matches_is_valid(make_packet, corrupt_packet):
+    packet_checksum = PacketChecksum()
+    packets = [
+        make_packet(0x5, 1, bytes(20)),
+        corrupt_packet(make_packet(0x5, 2, bytes(20)), 15),
+        make_packet(0x6, 3, bytes(range(50))),
+        corrupt_packet(make_packet(0x6, 4, bytes(range(50))), 6),
+        make_packet(0x14, 5, b'', secondary_header=False),
+        b'',
+    ]
+
+    valid = packet_checksum.validate_packets(packets)
+    assert valid.tolist() == [True, False, True, False, True, False]
+    assert valid.tolist() == [packet_checksum.is_valid(packet) for packet in packets]
+
+def test_store_drops_packets_with_bad_checksum(make_packet_stream, corrupt_packet, write_dump):
+    packets = make_packet_stream(5, seed=3)
+    packets[2] = corrupt_packet(packets[2], 20)
+    folder, file_name = write_dump(b''.join(packets))
+
+    typed_store = TypedTelemetryStore()
+    typed_store.telemetry_reader.file_repo = FileRepository(folder)
+    kept_packets = typed_store.read_packets([file_name])
+    assert kept_packets == packets[:2] + packets[3:]
+    assert typed_store.packets_df['seq_count'].tolist() == [int.from_bytes(packet[2:4], 'big') & 0x3FFF for packet in kept_packets]
+
+    typed_store = TypedTelemetryStore()
+    typed_store.telemetry_reader.file_repo = FileRepository(folder)
+    assert typed_store.read_packets([file_name], drop_bad_checksums=False) == packets
@@ -0,0 +1,43 @@
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.PacketDeduplicator import PacketDeduplicator
+from space_packets_pkg.TypedTelemetryStore import TypedTelemetryStore
+
+def test_packets_repeated_in_the_list_are_removed(make_packet_stream):
+    packets = make_packet_stream(4, apids=(0x5, 0x6))
+    deduplicator = PacketDeduplicator()
+
+    assert deduplicator.filter_packets(packets + packets[1:3]) == packets
+    assert deduplicator.get_report()['duplicates_per_apid'] == {'0x5': 1, '0x6': 1}
+
+def test_same_sequence_count_at_another_time_is_kept(make_packet):
+    deduplicator = PacketDeduplicator()
+    packets = [make_packet(0x5, 7, bytes(8), gps_ms=0), make_packet(0x5, 7, bytes(8), gps_ms=5000), make_packet(0x6, 7, bytes(8), gps_ms=0)]
+
+    assert deduplicator.filter_packets(packets) == packets
+
+def test_packets_without_secondary_header_compare_their_content(make_packet):
+    deduplicator = PacketDeduplicator()
+    first = make_packet(0x15, 3, b'\x01'*8, seq_flags=0x0, secondary_header=False)
+    same_count_other_data = make_packet(0x15, 3, b'\x02'*8, seq_flags=0x0, secondary_header=False)
+
+    assert deduplicator.filter_packets([first, same_count_other_data, first]) == [first, same_count_other_data]
+
+def test_only_the_last_max_keys_are_remembered(make_packet_stream):
+    deduplicator = PacketDeduplicator(max_keys=2)
+    packets = make_packet_stream(3, seed=1)
+    deduplicator.filter_packets(packets)
+
+    assert deduplicator.filter_packets([packets[0]]) == [packets[0]]
+    assert deduplicator.filter_packets([packets[2]]) == []
+    assert deduplicator.get_report()['forgotten_keys'] == 2
+
+def test_overlapping_dumps_are_read_once(make_packet_stream, write_dump):
+    packets = make_packet_stream(6, apids=(0x5,), seed=2)
+    folder, first_file = write_dump(b''.join(packets[:4]), 'first.out')
+    _, second_file = write_dump(b''.join(packets[2:]), 'second.out')
+
+    typed_store = TypedTelemetryStore()
+    typed_store.telemetry_reader.file_repo = FileRepository(folder)
+    assert typed_store.read_packets([first_file, second_file]) == packets
+    first_seq_count = int.from_bytes(packets[0][2:4], 'big') & 0x3FFF
+    assert typed_store.packets_df['seq_count'].tolist() == [(first_seq_count + i) & 0x3FFF for i in range(6)]
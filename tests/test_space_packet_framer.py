@@ -0,0 +1,80 @@
+import pandas as pd
+
+from space_packets_pkg.FileRepository import FileRepository
+from space_packets_pkg.PacketChecksum import PacketChecksum
+from space_packets_pkg.SpacePacketFramer import SpacePacketFramer
+
+DUMP_PACKET_COUNTS = {  # every packet of the dumps of the repo, with good checksums
+    'adcs_housekeeping_only.out': 330,
+    'bus_housekeeping.out': 470,
+    'bus_operational.out': 29,
+    'hk_eps_only.out': 81,
+    'hk_vur_inst_only.out': 14,
+}
+
+def test_consecutive_packets_are_framed(make_packet_stream):
+    packets = make_packet_stream(6, seed=1)
+    framer = SpacePacketFramer()
+
+    assert framer.frame_bytes(b''.join(packets)) == packets
+    assert framer.resync_count == 0 and framer.skipped_bytes == 0
+
+def test_resync_after_garbage_between_packets(make_packet_stream):
+    packets = make_packet_stream(6, seed=2)
+    data = b''.join(packets[:3]) + b'\xFF'*11 + b''.join(packets[3:])
+    framer = SpacePacketFramer()
+
+    assert framer.frame_bytes(data) == packets
+    assert framer.resync_count > 0
+
+def test_corrupt_length_only_costs_that_packet(make_packet_stream):
+    packets = make_packet_stream(6, seed=3)
+    bad_length = packets[2][:4] + (len(packets[2]) + 30).to_bytes(2, 'big') + packets[2][6:]
+    framer = SpacePacketFramer()
+
+    assert framer.frame_bytes(b''.join(packets[:2]) + bad_length + b''.join(packets[3:])) == packets[:2] + packets[3:]
+    assert framer.resync_count > 0
+
+def test_corrupt_length_repaired_with_the_catalog_length(make_packet_stream):
+    packets = make_packet_stream(6, seed=4)
+    pkt_data_length = len(packets[2]) - 7
+    bad_length = packets[2][:4] + (pkt_data_length + 30).to_bytes(2, 'big') + packets[2][6:]
+    data_lengths = {hex(int.from_bytes(packet[:2], 'big') & 0x7FF): hex(len(packet) - 7) for packet in packets}
+    main_tm_df = pd.DataFrame({'apid': list(data_lengths), 'pkt_data_length': list(data_lengths.values())})
+    framer = SpacePacketFramer(main_tm_df)
+
+    assert framer.frame_bytes(b''.join(packets[:2]) + bad_length + b''.join(packets[3:])) == packets
+    assert framer.repaired_packets == 1
+
+def test_chunked_feed_resyncs_like_a_whole_dump(make_packet_stream):
+    packets = make_packet_stream(6, seed=5)
+    data = b'\xFF'*5 + b''.join(packets[:3]) + b'\xFF'*3 + b''.join(packets[3:])
+    framer = SpacePacketFramer()
+
+    framed_packets = []
+    for start in range(0, len(data), 7):
+        framed_packets.extend(framer.feed(data[start:(start+7)]))
+    framed_packets.extend(framer.feed(b'', final=True))
+    assert framed_packets == packets
+
+def test_truncated_last_packet_is_skipped(make_packet_stream):
+    packets = make_packet_stream(6, seed=6)
+    framer = SpacePacketFramer()
+
+    assert framer.frame_bytes(b''.join(packets) + packets[0][:10]) == packets
+    assert framer.skipped_bytes == 10
+
+def test_dumps_of_the_repo_are_framed_whole(sport_catalog):
+    main_tm_df, _ = sport_catalog
+    telemetry_repo = FileRepository('decoded_satcs_dump')
+    packet_checksum = PacketChecksum()
+
+    for file_name, packet_count in DUMP_PACKET_COUNTS.items():
+        data = bytes.fromhex(telemetry_repo.read_telemetry_dump_file(file_name))
+        framer = SpacePacketFramer(main_tm_df)
+        packets = framer.frame_bytes(data)
+
+        assert len(packets) == packet_count, file_name
+        assert packet_checksum.validate_packets(packets).all(), file_name
+        assert b''.join(packets) == data, file_name
+        assert (framer.resync_count, framer.skipped_bytes, framer.repaired_packets) == (0, 0, 0), file_name
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TelemetryExporter import TelemetryExporter
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable, TypedTelemetryStore
+
+START_TIME = np.datetime64('2024-01-01T00:00:00', 'ns')
+
+def make_store(rng: np.random.Generator) -> TypedTelemetryStore:
+    """Three apids with times out of order, repeated across the apids and a few NaT, one vector field."""
+    typed_store = TypedTelemetryStore()
+    for apid, n_rows in [('0x5', 37), ('0x6', 23), ('0x14', 11)]:
+        time = START_TIME + rng.integers(0, 30, size=n_rows).astype('timedelta64[s]')
+        time[rng.integers(0, n_rows, size=2)] = np.datetime64('NaT')
+        columns = {f'{apid} counter': np.arange(n_rows, dtype=np.uint16), 'shared (V)': rng.random(n_rows).astype(np.float32)}
+        if apid == '0x14':
+            columns['vector'] = rng.random((n_rows, 3)).astype(np.float32)
+        typed_store.add_apid_table(TypedApidTable(apid, time, columns, {}))
+    return typed_store
+
+def get_full_frame(typed_store: TypedTelemetryStore, apid_fields: dict, columns: list[str], start=None, end=None) -> pd.DataFrame:
+    """The whole selection as one frame sorted by time, the export before it was streamed."""
+    apid_dfs = []
+    for apid, fields in apid_fields.items():
+        apid_df = typed_store.get_apid_df(apid, fields)
+        if start is not None:
+            apid_df = apid_df[apid_df.index >= start]
+        if end is not None:
+            apid_df = apid_df[apid_df.index <= end]
+        apid_df = apid_df.rename_axis('time').reset_index()
+        apid_df.insert(1, 'apid', apid)
+        apid_dfs.append(apid_df)
+    return pd.concat(apid_dfs, ignore_index=True).sort_values('time', kind='stable', ignore_index=True).reindex(columns=columns)
+
+def test_chunks_are_the_full_frame_merged_on_time():
+    typed_store = make_store(np.random.default_rng(0))
+    apid_fields = {'0x6': None, '0x5': ['shared (V)', '0x5 counter'], '0x14': None}
+    telemetry_exporter = TelemetryExporter(chunk_rows=7)
+    columns = ['time', 'apid', 'shared (V)', '0x5 counter', '0x6 counter', '0x14 counter', 'vector']
+
+    chunks = list(telemetry_exporter.iter_store_chunks(typed_store, apid_fields, columns, None, None))
+    assert all(len(chunk) <= 7 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), get_full_frame(typed_store, apid_fields, columns))
+
+def test_chunks_within_start_and_end():
+    typed_store = make_store(np.random.default_rng(1))
+    apid_fields = {'0x5': None, '0x14': ['vector']}
+    start, end = pd.Timestamp('2024-01-01 00:00:05'), pd.Timestamp('2024-01-01 00:00:20')
+    telemetry_exporter = TelemetryExporter(chunk_rows=4)
+    columns = ['time', 'apid', '0x5 counter', 'shared (V)', 'vector']
+
+    chunks = pd.concat(telemetry_exporter.iter_store_chunks(typed_store, apid_fields, columns, start, end), ignore_index=True)
+    pd.testing.assert_frame_equal(chunks, get_full_frame(typed_store, apid_fields, columns, start, end))
+    assert chunks['time'].between(start, end).all()
+
+def test_empty_selection_still_gives_the_header():
+    chunks = list(TelemetryExporter().iter_chunks([TypedTelemetryStore()], pd.DataFrame(), {}, None, None))
+    assert len(chunks) == 1
+    assert chunks[0].empty and list(chunks[0].columns) == ['time', 'apid']
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.TimeSegmentIndex import TimeSegmentIndex
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable
+
+START_TIME = np.datetime64('2024-01-01T00:00:00', 'ns')
+RESET_TIME = np.datetime64('1980-01-06T00:00:10', 'ns')  # clock restarted at the GPS epoch
+
+def at(seconds: float) -> np.datetime64:
+    return START_TIME + np.timedelta64(int(seconds*1e9), 'ns')
+
+def make_apid_tables() -> list[TypedApidTable]:
+    """Two passes an hour apart, 0x5 has a packet with a reset clock and 0x6 a backward jump of its clock."""
+    times_0x5 = np.array([at(0), at(10), RESET_TIME, at(20), at(3600), at(3610)], dtype='datetime64[ns]')
+    times_0x6 = np.array([at(5), at(3605), at(3602), np.datetime64('NaT')], dtype='datetime64[ns]')
+    return [
+        TypedApidTable('0x5', times_0x5, {'counter': np.arange(len(times_0x5))}, {}),
+        TypedApidTable('0x6', times_0x6, {'counter': np.arange(len(times_0x6))}, {}),
+    ]
+
+def test_segments_split_at_the_gaps():
+    time_segments = TimeSegmentIndex.from_apid_tables(make_apid_tables())
+    segments = time_segments.segments
+
+    assert segments['packets'].tolist() == [4, 4]
+    assert segments['start'].tolist() == [pd.Timestamp(at(0)), pd.Timestamp(at(3600))]
+    assert segments['end'].tolist() == [pd.Timestamp(at(20)), pd.Timestamp(at(3610))]
+    assert segments['apids'].tolist() == [['0x5', '0x6'], ['0x5', '0x6']]
+    assert time_segments.get_segment_bounds(1) == (pd.Timestamp(at(3600)), pd.Timestamp(at(3610)))
+
+def test_segment_rows_are_sorted_by_time():
+    time_segments = TimeSegmentIndex.from_apid_tables(make_apid_tables())
+
+    rows = time_segments.get_segment_rows(1)
+    assert np.all(np.diff(time_segments.times[rows]) >= np.timedelta64(0))
+    assert time_segments.times[time_segments.get_segment_rows(1, '0x6')].tolist() == [at(3602).item(), at(3605).item()]
+
+def test_invalid_clocks_are_masked_per_apid():
+    time_segments = TimeSegmentIndex.from_apid_tables(make_apid_tables())
+
+    assert time_segments.get_valid_mask('0x5').tolist() == [True, True, False, True, True, True]
+    assert time_segments.get_valid_mask('0x6').tolist() == [True, True, True, False]
+    assert time_segments.get_invalid_rows().tolist() == [2, 9]
+
+def test_find_segment_and_gaps():
+    time_segments = TimeSegmentIndex.from_apid_tables(make_apid_tables())
+
+    assert time_segments.find_segment(pd.Timestamp(at(12))) == 0
+    assert time_segments.find_segment(pd.Timestamp(at(3610))) == 1
+    assert time_segments.find_segment(pd.Timestamp(at(1800))) is None
+    assert time_segments.find_segment(pd.Timestamp(at(-1))) is None
+
+def test_apid_coverage_and_clock_jumps():
+    time_segments = TimeSegmentIndex.from_apid_tables(make_apid_tables())
+
+    assert time_segments.jumps['apid'].tolist() == ['0x5', '0x6']
+    coverage = time_segments.get_apid_coverage().set_index('apid')
+    assert coverage.loc['0x5', ['packets', 'invalid_clock', 'segments']].tolist() == [6, 1, 2]
+    assert coverage.loc['0x5', 'covered_s'] == 30.0
+    assert coverage.loc['0x5', 'median_period_s'] == 10.0
+    assert coverage.loc['0x6', ['packets', 'invalid_clock', 'clock_jumps']].tolist() == [4, 1, 1]
+
+def test_empty_index():
+    time_segments = TimeSegmentIndex.from_apid_tables([])
+
+    assert time_segments.segments.empty
+    assert time_segments.find_segment(pd.Timestamp(at(0))) is None
+
+def test_dashboard_segment_mask():
+    import app
+
+    times = pd.DatetimeIndex([at(0), at(10), at(3600)])
+    assert app.get_segment_mask(times, None).tolist() == [True, True, True]
+    assert app.get_segment_mask(times, [pd.Timestamp(at(0)), pd.Timestamp(at(20))]).tolist() == [True, True, False]
+
+def test_dashboard_segment_label_keeps_the_end_date_across_midnight():
+    import app
+
+    start = pd.Timestamp('2024-01-01 23:59:00')
+    assert app.format_segment_label(0, start, pd.Timestamp('2024-01-01 23:59:50'), 6) == \
+        "Segment 1: 2024-01-01 23:59:00 to 23:59:50 (6 packets)"
+    assert app.format_segment_label(1, start, pd.Timestamp('2024-01-02 00:00:40'), 11) == \
+        "Segment 2: 2024-01-01 23:59:00 to 2024-01-02 00:00:40 (11 packets)"
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from space_packets_pkg.ApidDecoderPlan import ApidDecoderPlan
+from space_packets_pkg.DataConverter import DataConverter
+from space_packets_pkg.DecoderRegressionHarness import DecoderRegressionHarness
+from space_packets_pkg.TelemetryDataReader import TelemetryDataReader
+from space_packets_pkg.TypedTelemetryStore import TypedApidTable, TypedTelemetryStore
+
+def make_field(name: str, bits, data_format: str) -> dict:
+    return {'field': name, 'lenght(bits)': bits, 'format': data_format, 'nominal_minimum': 'N/A', 'nominal_maximum': 'N/A',
+            'conversion': 'N/A', 'unit': 'N/A', 'observation': None}
+
+def test_add_files_matches_the_reference_decode(sport_catalog):
+    main_tm_df, main_dd_df = sport_catalog
+    telemetry_reader = TelemetryDataReader()
+    space_packets_df = telemetry_reader.get_space_packets_df_from_file('bus_housekeeping.out', main_dd_df, main_tm_df=main_tm_df)
+    expected = {apid: telemetry_reader.get_specific_apid_df_from_telemetry_df(apid, space_packets_df, main_dd_df)
+                for apid in space_packets_df['apid'].unique()}
+
+    typed_store = TypedTelemetryStore()
+    typed_store.add_files(['bus_housekeeping.out'], main_dd_df, main_tm_df=main_tm_df)
+    converted_store = TypedTelemetryStore()
+    converted_store.add_space_packets_df(space_packets_df, main_dd_df)
+
+    harness = DecoderRegressionHarness(main_tm_df, main_dd_df)
+    canonical_expected = harness.canonicalize(expected)
+    for store in [typed_store, converted_store]:
+        got = harness.canonicalize({apid: store.get_apid_df(apid) for apid in expected})
+        assert harness.compare_outputs('bus_housekeeping.out', canonical_expected, got) == []
+    assert len(converted_store.packets_df) == len(space_packets_df)
+    assert len(typed_store.packets_df) == 470  # every framed packet, the segments before they are joined
+
+def test_dtype_follows_the_catalog_format():
+    typed_store = TypedTelemetryStore()
+    typed_arrays = {
+        'uint12': typed_store.values_to_typed_array([1, 4095], make_field('a', 12.0, 'uint16')),
+        'int32': typed_store.values_to_typed_array([-5, 7], make_field('b', 32.0, 'int32')),
+        'missing': typed_store.values_to_typed_array([1, None], make_field('c', 8.0, 'uint8')),
+        'bit': typed_store.values_to_typed_array([0, 15], make_field('d', 4.0, 'bit')),
+        'float': typed_store.values_to_typed_array([1.5, None], make_field('e', 32.0, 'float')),
+        'vector': typed_store.values_to_typed_array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], make_field('f', 96.0, 'vector3')),
+        'gps': typed_store.values_to_typed_array([pd.Timestamp('2024-01-01'), None], make_field('g', 64.0, 'GPS time')),
+        'bitfield': typed_store.values_to_typed_array(['0101', '1111'], make_field('h', 4.0, 'bitfield')),
+    }
+
+    assert {name: (values.dtype, values.shape) for name, values in typed_arrays.items()} == {
+        'uint12': (np.uint16, (2,)),
+        'int32': (np.int32, (2,)),
+        'missing': (np.float64, (2,)),
+        'bit': (np.uint8, (2,)),
+        'float': (np.float32, (2,)),
+        'vector': (np.float32, (2, 3)),
+        'gps': (np.dtype('datetime64[ns]'), (2,)),
+        'bitfield': (object, (2,)),
+    }
+    assert np.isnan(typed_arrays['missing'][1]) and np.isnat(typed_arrays['gps'][1])
+
+def test_multi_bit_bit_fields_are_read_as_binary():
+    apid_linked_dd = [make_field('stowed', 1.0, 'bit'), make_field('unused bits', 4.0, 'bit'), make_field('padding', 3.0, 'bit')]
+    data_list = [bytes([0b1_1010_000]), bytes([0b0_0111_101])]
+    times = np.array(['2024-01-01T00:00:00', '2024-01-01T00:00:01'], dtype='datetime64[ns]')
+
+    apid_table = ApidDecoderPlan('0x288', apid_linked_dd).decode_packets(data_list, times)
+    assert apid_table.columns['unused bits (N/A)'].tolist() == [0b1010, 0b0111]
+    assert apid_table.columns['padding (N/A)'].tolist() == [0, 0b101]
+    assert DataConverter().binary_to_value('1010', 'bit') == 10
+
+def test_to_dataframe_shape():
+    times = np.array(['2024-01-01T00:00:00', '2024-01-01T00:00:01'], dtype='datetime64[ns]')
+    apid_table = TypedApidTable('0x14', times, {
+        'counter': np.array([1, 2], dtype=np.uint16),
+        'vector': np.arange(6, dtype=np.float32).reshape(2, 3),
+        'matrix': np.arange(8, dtype=np.float32).reshape(2, 2, 2),
+    }, {})
+
+    df = apid_table.to_dataframe()
+    assert df.shape == (2, 3) and df.index.name == 'time' and list(df.columns) == ['counter', 'vector', 'matrix']
+    assert df['counter'].dtype == np.uint16
+    assert df['vector'].iloc[1] == [3.0, 4.0, 5.0]
+    assert isinstance(df['matrix'].iloc[0], np.ndarray) and df['matrix'].iloc[0].shape == (2, 2)
+    assert list(apid_table.to_dataframe(['vector']).columns) == ['vector']